@@ -0,0 +1,114 @@
+"""Offline crawler benchmark: sequential fetches against the concurrent crawler.
+
+Builds the fixture catalogue in a temporary directory, serves it from a
+separate process with a simulated network latency, then crawls it with 1
+worker and with a thread pool. Checks that every run finds the same pages
+and books, and reports pages/sec. A run injects 503 errors to exercise
+the retries, and the last runs crawl twice through the HTTP cache:
+once cold, then warm with revalidation (304) and with fresh entries.
+
+Usage:
+    python bench_crawler.py [--latency 0.1] [--workers 1 4 8 16] [--per-host 8]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from crawler import Crawler
+from fixtures import build_site
+from http_cache import HTTPCache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def fixture_server(site, latency, fail_every=0, max_age=0, port=None):
+    # Separate process: the server must not compete with the crawler for the GIL
+    port = port or free_port()
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "fixtures.py"), "--serve", site, "--port", str(port),
+         "--latency", str(latency), "--fail-every", str(fail_every), "--max-age", str(max_age)],
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("fixture server did not start")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def crawl(base_url, workers, per_host, backoff=0.0, cache=None):
+    pages, report = Crawler([base_url], workers=workers, per_host=min(workers, per_host),
+                            backoff=backoff, cache=cache).crawl()
+    # Keyed by path so that runs against different ports compare equal
+    return {urlsplit(url).path: books for url, books in pages.items()}, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawler benchmark")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated delay per response, in seconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--per-host", type=int, default=8)
+    parser.add_argument("--books", type=int, default=45, help="Books per category")
+    parser.add_argument("--fail-every", type=int, default=7, help="503 on every Nth request in the last run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as site:
+        # catalogue/page-1.html is not linked: the home page stands for it
+        expected_pages = build_site(site, args.books) - 1
+        reference = None
+        print(f"{'workers':>7} | {'pages':>5} | {'books':>5} | {'seconds':>8} | {'pages/sec':>9}")
+        with fixture_server(site, args.latency) as base_url:
+            for workers in args.workers:
+                pages, report = crawl(base_url, workers, args.per_host)
+                print(f"{workers:>7} | {report.pages:>5} | {report.books:>5} | "
+                      f"{report.elapsed:>8.2f} | {report.pages_per_sec:>9.1f}")
+                assert report.pages == expected_pages and not report.failed, report.failed
+                if reference is None:
+                    reference = pages
+                assert pages == reference, "runs disagree"
+
+        with fixture_server(site, args.latency, args.fail_every) as base_url:
+            pages, report = crawl(base_url, max(args.workers), args.per_host, backoff=0.01)
+        print(f"\nWith a 503 every {args.fail_every} requests: {report.pages} pages, "
+              f"{report.retries} retries, {len(report.failed)} failed")
+        assert pages == reference and not report.failed, "retried run disagrees"
+
+        print(f"\n{'cache run':>16} | {'seconds':>8} | {'pages/sec':>9} | {'hit ratio':>9} | {'bytes saved':>11}")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HTTPCache(cache_dir)
+            # Same port for every run: cached entries are keyed by URL
+            port = free_port()
+            for name, max_age in (("cold", 0), ("warm, 304", 0), ("warm, max-age", 3600), ("fresh", 3600)):
+                cache.stats = dict.fromkeys(cache.stats, 0)
+                with fixture_server(site, args.latency, max_age=max_age, port=port) as base_url:
+                    pages, report = crawl(base_url, max(args.workers), args.per_host, cache=cache)
+                print(f"{name:>16} | {report.elapsed:>8.2f} | {report.pages_per_sec:>9.1f} | "
+                      f"{cache.hit_ratio():>9.1%} | {cache.stats['bytes_saved']:>11,}")
+                assert pages == reference and not report.failed, "cached run disagrees"
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Parser benchmark: every backend against the original parse_books.
+
+Parses the saved fixture pages (plus a page of edge cases: missing title
+attribute, mis-decoded "Â£", thousands separator, missing or unreadable
+price, comments) with the original BeautifulSoup/html.parser function and
+with each backend of parsers.py. Fails unless every backend yields exactly
+the same books, product links and crawl links, then reports the time per page.
+
+Usage:
+    python bench_parser.py [--repeat 5]
+"""
+import argparse
+import html
+import os
+import re
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+from crawler import extract_links
+from fixtures import build_site
+from parsers import PARSERS, get_parser, lxml
+
+EDGE_CASES = """<html><head><meta charset="utf-8"></head><body>
+<div class="page-header action"><h1> Science <small>fiction</small></h1></div>
+<div class="side_categories"><ul><li><a href="../travel_2/index.html">Travel</a></li></ul></div>
+<ol>
+<li><article class="product_pod"><h3><a href="a/index.html">No <b>title</b> attribute</a></h3>
+  <div class="product_price"><p class="price_color">Â£51.77</p></div></article></li>
+<li><article class="product_pod other"><h3><a href="b/index.html" title="Tom &amp; Jerry &pound;">T</a></h3>
+  <p class="price_color big">&amp;pound;1,234.50</p></article></li>
+<li><article class="product_pod"><h3><a href="c/index.html" title="">  <!-- hidden --> Spaced
+  out </a></h3></article></li>
+<li><article class="product_pod"><h3><a href="d/index.html" title="Free">Free</a></h3>
+  <p class="price_color">Free</p></article></li>
+<li><article class="product_pod"><h3><a href="e/index.html" title="Dots">Dots</a></h3>
+  <p class="price_color">£1.2.3</p></article></li>
+</ol>
+<ul class="pager"><li class="current">
+    Page 1 of 3
+</li><li class="next"><a href="page-2.html">next</a></li></ul>
+</body></html>"""
+
+
+def legacy_parse_books(html_text: str):
+    # parse_books as it was before the parser backends, kept verbatim as the reference
+    soup = BeautifulSoup(html_text, "html.parser")
+    books = []
+
+    for article in soup.select("article.product_pod"):
+        # Title
+        a = article.find("h3").find("a")
+        title = a.get("title") or a.get_text(strip=True)
+
+        # Price
+        price_tag = article.select_one("p.price_color")
+        price_text = price_tag.get_text(strip=True) if price_tag else ""
+        price = 0.0
+        if price_text:
+            cleaned = html.unescape(price_text)
+            m = re.search(r"[\d\.,]+", cleaned)
+            if m:
+                num = m.group(0).replace(",", "")
+                try:
+                    price = float(num)
+                except ValueError:
+                    price = 0.0
+
+        books.append((title, price))
+    return books
+
+
+def load_pages(books_per_category):
+    with tempfile.TemporaryDirectory() as site:
+        build_site(site, books_per_category)
+        pages = {}
+        for root, _, files in os.walk(site):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8") as f:
+                    pages[os.path.relpath(path, site)] = f.read()
+    pages["edge-cases.html"] = EDGE_CASES
+    return pages
+
+
+def per_page(function, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            function(page)
+        best = min(best, (time.perf_counter() - start) / len(pages))
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser backends benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--books", type=int, default=45, help="Books per category in the fixture catalogue")
+    args = parser.parse_args()
+
+    pages = load_pages(args.books)
+    expected = {name: legacy_parse_books(page) for name, page in pages.items()}
+    reference = get_parser("soup")
+    expected_links = {name: extract_links(reference, reference.parse(page), "http://h/" + name)
+                      for name, page in pages.items()}
+    expected_products = {name: list(reference.products(reference.parse(page))) for name, page in pages.items()}
+    expected_categories = {name: reference.category(reference.parse(page)) for name, page in pages.items()}
+
+    backends = [name for name in PARSERS if name != "lxml" or lxml is not None]
+    print(f"{len(pages)} pages, {sum(map(len, expected.values()))} books")
+    print(f"{'parser':>10} | {'ms/page':>8} | {'speedup':>7} | identical")
+    baseline = per_page(legacy_parse_books, pages.values(), args.repeat)
+    print(f"{'original':>10} | {baseline:>8.2f} | {1:>6.1f}x | reference")
+
+    for name in backends:
+        backend = get_parser(name)
+        for page_name, page in pages.items():
+            document = backend.parse(page)
+            books = backend.books(document)
+            assert not isinstance(books, list), f"{name}: books must be a generator"
+            assert list(books) == expected[page_name], f"{name} differs on {page_name}"
+            assert list(backend.products(document)) == expected_products[page_name], f"{name} products differ"
+            assert backend.category(document) == expected_categories[page_name], f"{name} category differs"
+            links = extract_links(backend, document, "http://h/" + page_name)
+            assert links == expected_links[page_name], f"{name} links differ on {page_name}"
+
+        elapsed = per_page(lambda page: list(backend.books(backend.parse(page))), pages.values(), args.repeat)
+        print(f"{name:>10} | {elapsed:>8.2f} | {baseline / elapsed:>6.1f}x | yes")
+
+
+if __name__ == "__main__":
+    main()
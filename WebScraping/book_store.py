@@ -0,0 +1,179 @@
+"""Incremental SQLite store for scraped books, with price history across runs.
+
+Books are upserted by product URL in batches as they stream from the
+parser, so memory does not grow with the catalogue. A price is appended to
+the history only when it differs from the last known one. Each run keeps
+running totals (count, total cost, accepted/rejected at the threshold),
+updated as books arrive, so the summary never re-scans the books.
+"""
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    price REAL NOT NULL,
+    category TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_run INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    url TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    price REAL NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_books_last_run ON books(last_run);
+CREATE INDEX IF NOT EXISTS idx_price_history_url ON price_history(url, seen_at);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT,
+    threshold REAL NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    books INTEGER NOT NULL DEFAULT 0,
+    total_cost REAL NOT NULL DEFAULT 0,
+    accepted INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    new_books INTEGER NOT NULL DEFAULT 0,
+    price_changes INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class BookTotals:
+    """Running summary of a stream of prices, updated one book at a time"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.books = 0
+        self.total_cost = 0.0
+        self.accepted = 0
+        self.new_books = 0
+        self.price_changes = 0
+
+    @property
+    def rejected(self) -> int:
+        return self.books - self.accepted
+
+    def add(self, price: float):
+        self.books += 1
+        self.total_cost += price
+        if price <= self.threshold:
+            self.accepted += 1
+
+
+class BookStore:
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # Stores created before the category column
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(books)")}
+        if "category" not in columns:
+            self._db.execute("ALTER TABLE books ADD COLUMN category TEXT")
+        self._batch = {}
+        self.run_id = None
+        self.totals = None
+
+    def start_run(self, threshold: float, source: str = None) -> int:
+        self.totals = BookTotals(threshold)
+        with self._db:
+            self.run_id = self._db.execute(
+                "INSERT INTO runs (source, threshold, started_at) VALUES (?, ?, ?)",
+                (source, threshold, time.time())
+            ).lastrowid
+        return self.run_id
+
+    def add(self, url: str, title: str, price: float, category: str = None):
+        """Queue one book; written with the next batch"""
+        # A book listed on several pages counts once per run (first listing
+        # wins); its category comes from whichever listing names one
+        queued = self._batch.get(url)
+        if queued is None:
+            self._batch[url] = (title, price, category)
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+        elif category and queued[2] is None:
+            self._batch[url] = queued[:2] + (category,)
+
+    def add_many(self, products):
+        for product in products:
+            self.add(*product)
+
+    def flush(self):
+        """Upsert the queued books in one transaction and update the running totals"""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, {}
+        now = time.time()
+        urls = list(batch)
+        known = {}
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            known.update((url, (price, last_run)) for url, price, last_run in self._db.execute(
+                f"SELECT url, price, last_run FROM books WHERE url IN ({','.join('?' * len(chunk))})", chunk
+            ))
+
+        history = []
+        for url, (title, price, _) in batch.items():
+            previous = known.get(url)
+            if previous is not None and previous[1] == self.run_id:
+                continue  # already counted in an earlier batch of this run
+            self.totals.add(price)
+            if previous is None:
+                self.totals.new_books += 1
+                history.append((url, self.run_id, price, now))
+            elif previous[0] != price:
+                self.totals.price_changes += 1
+                history.append((url, self.run_id, price, now))
+
+        with self._db:
+            self._db.executemany("""
+                INSERT INTO books (url, title, price, category, first_seen, last_seen, last_run)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    price = CASE WHEN books.last_run = excluded.last_run THEN books.price ELSE excluded.price END,
+                    category = COALESCE(excluded.category, books.category),
+                    last_seen = excluded.last_seen,
+                    last_run = excluded.last_run
+            """, [(url, title, price, category, now, now, self.run_id)
+                  for url, (title, price, category) in batch.items()])
+            self._db.executemany("INSERT INTO price_history (url, run_id, price, seen_at) VALUES (?, ?, ?, ?)", history)
+            self._save_totals()
+
+    def _save_totals(self, finished: bool = False):
+        totals = self.totals
+        self._db.execute("""
+            UPDATE runs SET books = ?, total_cost = ?, accepted = ?, rejected = ?,
+                            new_books = ?, price_changes = ?, finished_at = ?
+            WHERE id = ?
+        """, (totals.books, totals.total_cost, totals.accepted, totals.rejected,
+              totals.new_books, totals.price_changes, time.time() if finished else None, self.run_id))
+
+    def finish_run(self) -> BookTotals:
+        self.flush()
+        with self._db:
+            self._save_totals(finished=True)
+        return self.totals
+
+    def iter_books(self):
+        """(title, price) of the books seen in the current run, oldest books first, streamed"""
+        yield from self._db.execute(
+            "SELECT title, price FROM books WHERE last_run = ? ORDER BY first_seen, rowid", (self.run_id,)
+        )
+
+    def price_history(self, url: str):
+        """[(seen_at, price)] of a book, oldest first"""
+        return self._db.execute(
+            "SELECT seen_at, price FROM price_history WHERE url = ? ORDER BY seen_at, rowid", (url,)
+        ).fetchall()
+
+    def close(self):
+        self._db.close()
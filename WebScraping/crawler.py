@@ -0,0 +1,193 @@
+"""Concurrent crawler for books.toscrape-style catalogues.
+
+Starting from one or more listing pages, follows the category links of the
+sidebar and the pagination links, and parses the books of every
+listing page. Pages are fetched by a bounded thread pool sharing one
+keep-alive requests.Session, with a concurrency limit per host, retries
+with exponential backoff and URL deduplication.
+
+Usage:
+    python crawler.py https://books.toscrape.com/ --workers 8 --per-host 4
+"""
+import argparse
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import requests
+from parsers import PARSERS, get_parser
+from webscraping import TIMEOUT, fetch_page, make_session
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+CrawlReport = namedtuple("CrawlReport", ["pages", "books", "failed", "retries", "elapsed", "pages_per_sec"])
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for deduplication (no fragment, lowercase scheme/host)"""
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    return parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()).geturl()
+
+
+# "Page 1 of 45" in the pager, and the page number in a "next" link
+PAGE_COUNT = re.compile(r"Page\s+(\d+)\s+of\s+(\d+)")
+PAGE_NUMBER = re.compile(r"page-(\d+)\.html$")
+
+
+def extract_links(parser, document, base_url: str):
+    """Category links of the sidebar and the pagination links of a listing page
+
+    Following "next" alone fetches a listing one page at a time. On its
+    first page, the pager ("Page 1 of N") and the "next" link give every
+    other page URL at once, so the whole listing is fetched concurrently.
+    """
+    categories, href, pager_text = parser.links(document)
+    links = [urljoin(base_url, category) for category in categories]
+    if href is None:
+        return links
+
+    links.append(urljoin(base_url, href))
+    count = PAGE_COUNT.search(pager_text)
+    number = PAGE_NUMBER.search(href)
+    if count and number and count.group(1) == "1":
+        for page in range(int(number.group(1)) + 1, int(count.group(2)) + 1):
+            links.append(urljoin(base_url, PAGE_NUMBER.sub(f"page-{page}.html", href)))
+    return links
+
+
+class Crawler:
+    def __init__(self, start_urls, workers: int = 8, per_host: int = 4, retries: int = 3,
+                 backoff: float = 0.5, timeout: float = TIMEOUT, session=None, max_pages: int = 0, cache=None, parser=None):
+        self.start_urls = [normalize_url(url) for url in start_urls]
+        self.workers = workers
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.cache = cache
+        self.parser = get_parser(parser)
+        self.session = session or make_session(pool_size=workers)
+        # Only the hosts of the start URLs are crawled
+        self.hosts = {urlsplit(url).netloc for url in self.start_urls}
+
+        self._host_limits = {}
+        self._lock = threading.Lock()
+        self._retry_count = 0
+        self.report = None
+
+    def _host_limit(self, host):
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def fetch(self, url: str) -> str:
+        """Fetch one page, retrying transient errors with exponential backoff and jitter"""
+        limit = self._host_limit(urlsplit(url).netloc)
+        for attempt in range(self.retries + 1):
+            try:
+                with limit:
+                    return fetch_page(url, session=self.session, timeout=self.timeout, cache=self.cache)
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    raise
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            with self._lock:
+                self._retry_count += 1
+            # The slot is released while waiting so other pages of the host proceed
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def _visit(self, url):
+        # Parsing is CPU-bound and holds the GIL: each page is parsed only once
+        document = self.parser.parse(self.fetch(url))
+        links = [normalize_url(link) for link in extract_links(self.parser, document, url)]
+        category = self.parser.category(document)
+        products = [(urljoin(url, href), title, price, category)
+                    for href, title, price in self.parser.products(document)]
+        return products, [link for link in links if urlsplit(link).netloc in self.hosts]
+
+    def iter_pages(self):
+        """Yield (page url, [(product url, title, price, category)]) as pages complete
+
+        Nothing is kept once a page has been yielded; self.report is set when
+        the crawl is over.
+        """
+        page_count, book_count, failed = 0, 0, {}
+        seen = set(self.start_urls)
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawler") as pool:
+            pending = {pool.submit(self._visit, url): url for url in self.start_urls}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        products, links = future.result()
+                    except Exception as e:
+                        failed[url] = str(e)
+                        continue
+                    for link in links:
+                        if link in seen or (self.max_pages and len(seen) >= self.max_pages):
+                            continue
+                        seen.add(link)
+                        pending[pool.submit(self._visit, link)] = link
+                    page_count += 1
+                    book_count += len(products)
+                    yield url, products
+
+        elapsed = time.perf_counter() - started
+        self.report = CrawlReport(
+            pages=page_count,
+            books=book_count,
+            failed=failed,
+            retries=self._retry_count,
+            elapsed=elapsed,
+            pages_per_sec=page_count / elapsed if elapsed else 0.0,
+        )
+
+    def crawl(self):
+        """Crawl from the start URLs; returns ({url: [(title, price)]}, CrawlReport)"""
+        pages = {url: [(title, price) for _, title, price, _ in products] for url, products in self.iter_pages()}
+        return pages, self.report
+
+
+def print_report(report: CrawlReport):
+    print(f"\nCrawl:")
+    print(f"Pages       : {report.pages} ({len(report.failed)} failed, {report.retries} retries)")
+    print(f"Books seen  : {report.books}")
+    print(f"Elapsed     : {report.elapsed:.2f} s")
+    print(f"Throughput  : {report.pages_per_sec:.1f} pages/sec")
+    for url, error in sorted(report.failed.items()):
+        print(f"  failed {url}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl a books catalogue concurrently")
+    parser.add_argument("start", nargs="+", help="Listing page(s) to start from")
+    parser.add_argument("--workers", type=int, default=8, help="Size of the thread pool")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent requests per host")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=0.5, help="First retry delay, in seconds")
+    parser.add_argument("--max-pages", type=int, default=0, help="Stop discovering pages after N (0 = no limit)")
+    parser.add_argument("--parser", choices=sorted(PARSERS), help="HTML parser backend (default: lxml if installed)")
+    args = parser.parse_args()
+
+    crawler = Crawler(args.start, workers=args.workers, per_host=args.per_host, retries=args.retries,
+                      backoff=args.backoff, max_pages=args.max_pages, parser=args.parser)
+    _, report = crawler.crawl()
+    print_report(report)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+"""Offline books.toscrape-style catalogue and a local HTTP server to crawl it.
+
+build_site() writes saved pages with the same markup as the real site
+(sidebar category links, paginated product pods, "next" links), and
+serve_fixtures() serves them on 127.0.0.1 with ETag / Last-Modified
+validators, optional latency and injected 503 errors, so the crawler and
+its HTTP cache can be exercised without network.
+
+Usage:
+    python fixtures.py --build /tmp/books-site
+    python fixtures.py --serve /tmp/books-site --port 8000 --latency 0.05
+"""
+import argparse
+import functools
+import os
+import posixpath
+import random
+import re
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+PER_PAGE = 20
+CATEGORIES = ["Travel", "Mystery", "Historical Fiction", "Science", "Poetry",
+              "Philosophy", "Fantasy", "Romance", "Business", "Music"]
+RATINGS = ["One", "Two", "Three", "Four", "Five"]
+SAVED_TITLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books.txt")
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def catalogue_books(books_per_category: int = 45, seed: int = 42):
+    """Deterministic (category, title, price, slug) list; titles start with books.txt"""
+    rng = random.Random(seed)
+    titles = []
+    if os.path.exists(SAVED_TITLES):
+        with open(SAVED_TITLES, encoding="utf-8") as f:
+            titles = [line.rsplit("|", 1)[-1].strip() for line in f if "|" in line]
+
+    books = []
+    for category in CATEGORIES:
+        for _ in range(books_per_category):
+            number = len(books) + 1
+            title = titles[number - 1] if number <= len(titles) else f"{category} Book {number}"
+            price = round(rng.uniform(10, 60), 2)
+            books.append((category, title, price, f"{slugify(title)}_{number}"))
+    return books
+
+
+def _category_path(index: int, category: str) -> str:
+    return f"catalogue/category/books/{slugify(category).replace('-', '_')}_{index + 2}/index.html"
+
+
+def _page_name(path: str, page: int) -> str:
+    # Page 1 is the listing itself, then page-2.html, page-3.html... next to it
+    return path if page == 1 else posixpath.join(posixpath.dirname(path), f"page-{page}.html")
+
+
+def _link(from_path: str, to_path: str) -> str:
+    return posixpath.relpath(to_path, posixpath.dirname(from_path) or ".")
+
+
+def _listing(path, title, books, page, pages, first_page_path):
+    sidebar = "\n".join(
+        f'<li><a href="{_link(path, _category_path(i, name))}">\n  {name}\n</a></li>'
+        for i, name in enumerate(CATEGORIES)
+    )
+    pods = "\n".join(f"""<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3">
+<article class="product_pod">
+  <div class="image_container"><a href="{_link(path, f'catalogue/{slug}/index.html')}"><img src="{_link(path, 'media/cache/thumb.jpg')}" alt="{title_}" class="thumbnail"></a></div>
+  <p class="star-rating {RATINGS[number % 5]}"><i class="icon-star"></i></p>
+  <h3><a href="{_link(path, f'catalogue/{slug}/index.html')}" title="{title_}">{title_[:30]}</a></h3>
+  <div class="product_price">
+    <p class="price_color">&pound;{price:.2f}</p>
+    <p class="instock availability"><i class="icon-ok"></i> In stock</p>
+  </div>
+</article>
+</li>""" for number, (_, title_, price, slug) in enumerate(books))
+
+    pager = [f'<li class="current">Page {page} of {pages}</li>']
+    if page > 1:
+        pager.insert(0, f'<li class="previous"><a href="{_link(path, _page_name(first_page_path, page - 1))}">previous</a></li>')
+    if page < pages:
+        pager.append(f'<li class="next"><a href="{_link(path, _page_name(first_page_path, page + 1))}">next</a></li>')
+
+    return f"""<!DOCTYPE html>
+<html lang="en-us">
+<head><meta charset="utf-8"><title>{title} | Books to Scrape - Sandbox</title></head>
+<body id="default" class="default">
+<div class="container-fluid page">
+<div class="page_inner">
+<ul class="breadcrumb"><li><a href="{_link(path, 'index.html')}">Home</a></li><li class="active">{title}</li></ul>
+<div class="row">
+<aside class="sidebar col-sm-4 col-md-3">
+<div class="side_categories">
+<ul class="nav nav-list">
+<li><a href="{_link(path, 'catalogue/category/books_1/index.html')}">Books</a>
+<ul>
+{sidebar}
+</ul>
+</li>
+</ul>
+</div>
+</aside>
+<div class="col-sm-8 col-md-9">
+<div class="page-header action"><h1>{title}</h1></div>
+<section>
+<ol class="row">
+{pods}
+</ol>
+<div><ul class="pager">
+{chr(10).join(pager)}
+</ul></div>
+</section>
+</div>
+</div>
+</div>
+</div>
+</body>
+</html>
+"""
+
+
+def _write_listing(directory, first_page_path, title, books):
+    pages = max(1, -(-len(books) // PER_PAGE))
+    for page in range(1, pages + 1):
+        path = _page_name(first_page_path, page)
+        chunk = books[(page - 1) * PER_PAGE:page * PER_PAGE]
+        target = os.path.join(directory, *path.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(_listing(path, title, chunk, page, pages, first_page_path))
+    return pages
+
+
+def build_site(directory: str, books_per_category: int = 45, seed: int = 42) -> int:
+    """Write the whole catalogue under `directory`; returns the number of listing pages"""
+    books = catalogue_books(books_per_category, seed)
+    # "All products" lives in catalogue/page-N.html; the home page repeats page 1
+    pages = _write_listing(directory, "catalogue/page-1.html", "All products", books)
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_listing("index.html", "All products", books[:PER_PAGE], 1, pages, "catalogue/page-1.html"))
+    pages += 1
+    pages += _write_listing(directory, "catalogue/category/books_1/index.html", "Books", books)
+    for index, category in enumerate(CATEGORIES):
+        category_books = [book for book in books if book[0] == category]
+        pages += _write_listing(directory, _category_path(index, category), category, category_books)
+    return pages
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Static handler with simulated latency and every Nth response failing with 503
+
+    Files carry an ETag (mtime and size) and Cache-Control: max-age=N;
+    If-None-Match is answered with 304 (If-Modified-Since is handled by
+    SimpleHTTPRequestHandler).
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: without this, keep-alive
+    # responses wait for the delayed ACK (~40 ms each)
+    disable_nagle_algorithm = True
+    latency = 0.0
+    fail_every = 0
+    max_age = 0
+    _count = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        with self._lock:
+            FixtureHandler._count += 1
+            count = FixtureHandler._count
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and count % self.fail_every == 0:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        path = self.translate_path(self.path)
+        self._etag = None
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            self._etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            if self._etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                self.end_headers()
+                return
+        super().do_GET()
+
+    def end_headers(self):
+        if getattr(self, "_etag", None):
+            self.send_header("ETag", self._etag)
+            self.send_header("Cache-Control", f"max-age={self.max_age}")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(directory: str, port: int = 0, latency: float = 0.0, fail_every: int = 0, max_age: int = 0):
+    """Serve `directory` in a background thread; returns (server, base_url)"""
+    handler = type("Handler", (FixtureHandler,), {"latency": latency, "fail_every": fail_every, "max_age": max_age})
+    server = ThreadingHTTPServer(("127.0.0.1", port), functools.partial(handler, directory=directory))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline books catalogue for the crawler")
+    parser.add_argument("--build", metavar="DIR", help="Write the saved pages to DIR")
+    parser.add_argument("--serve", metavar="DIR", help="Serve DIR over HTTP")
+    parser.add_argument("--books", type=int, default=45, help="Books per category")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay per response, in seconds")
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer 503 to every Nth request")
+    parser.add_argument("--max-age", type=int, default=0, help="Cache-Control max-age of the pages, in seconds")
+    args = parser.parse_args()
+
+    if args.build:
+        pages = build_site(args.build, args.books)
+        print(f"{pages} listing pages written to {args.build}")
+    if args.serve:
+        server, base_url = serve_fixtures(args.serve, args.port, args.latency, args.fail_every, args.max_age)
+        print(f"Serving {args.serve} on {base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""On-disk HTTP cache with conditional revalidation for fetch_page.
+
+Bodies are stored gzip-compressed next to a small SQLite index holding
+their ETag, Last-Modified, freshness lifetime and size. A fresh entry
+(Cache-Control max-age not yet elapsed) is read locally; a stale one is
+revalidated with If-None-Match / If-Modified-Since, and a 304 answer
+reuses the stored body. When the stored bodies exceed `max_bytes`, the
+least recently used entries are evicted.
+"""
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from email.utils import formatdate
+
+import requests
+
+MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+def freshness(headers) -> float:
+    """Seconds the response may be reused without revalidation (0 = always revalidate)"""
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-cache" in cache_control:
+        return 0.0
+    match = MAX_AGE.search(cache_control)
+    return float(match.group(1)) if match else 0.0
+
+
+class HTTPCache:
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                encoding TEXT,
+                stored_at REAL NOT NULL,
+                max_age REAL NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+        self.stats = {"requests": 0, "fresh": 0, "revalidated": 0, "misses": 0,
+                      "bytes_downloaded": 0, "bytes_saved": 0, "evicted": 0}
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".gz")
+
+    def _count(self, **amounts):
+        with self._lock:
+            for key, amount in amounts.items():
+                self.stats[key] += amount
+
+    def _lookup(self, url):
+        with self._lock:
+            return self._db.execute(
+                "SELECT etag, last_modified, encoding, stored_at, max_age, size FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _read(self, url, encoding):
+        with gzip.open(self._path(url), "rb") as f:
+            return f.read().decode(encoding or "utf-8", errors="replace")
+
+    def _touch(self, url, max_age=None):
+        now = time.time()
+        with self._lock:
+            if max_age is None:
+                self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, url))
+            else:
+                self._db.execute("UPDATE entries SET last_access = ?, stored_at = ?, max_age = ? WHERE url = ?",
+                                 (now, now, max_age, url))
+            self._db.commit()
+
+    def _store(self, url, response):
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        max_age = freshness(response.headers)
+        if "no-store" in cache_control or not (etag or last_modified or max_age):
+            return
+
+        path = self._path(url)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(temporary, "wb", compresslevel=6) as f:
+            f.write(response.content)
+        os.replace(temporary, path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, response.encoding, now, max_age,
+                 len(response.content), os.path.getsize(path), now)
+            )
+            self._db.commit()
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the stored bodies fit in max_bytes"""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(stored_size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for url, stored_size in self._db.execute("SELECT url, stored_size FROM entries ORDER BY last_access"):
+                if total <= self.max_bytes:
+                    break
+                victims.append(url)
+                total -= stored_size
+            self._db.executemany("DELETE FROM entries WHERE url = ?", [(url,) for url in victims])
+            self._db.commit()
+            self.stats["evicted"] += len(victims)
+        for url in victims:
+            try:
+                os.remove(self._path(url))
+            except FileNotFoundError:
+                pass
+
+    def get(self, url: str, session=None, timeout: float = None) -> str:
+        """Body of `url`, from the cache when fresh or confirmed by a 304"""
+        self._count(requests=1)
+        entry = self._lookup(url)
+        headers = {}
+        if entry:
+            etag, last_modified, encoding, stored_at, max_age, size = entry
+            if time.time() - stored_at < max_age and os.path.exists(self._path(url)):
+                try:
+                    body = self._read(url, encoding)
+                except OSError:
+                    body = None
+                if body is not None:
+                    self._touch(url)
+                    self._count(fresh=1, bytes_saved=size)
+                    return body
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            elif not etag:
+                headers["If-Modified-Since"] = formatdate(stored_at, usegmt=True)
+
+        response = (session or requests).get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry:
+            try:
+                body = self._read(url, entry[2])
+            except OSError:
+                # Body evicted or lost meanwhile: fetch it again without validators
+                response = (session or requests).get(url, timeout=timeout)
+            else:
+                self._touch(url, freshness(response.headers) or entry[4])
+                self._count(revalidated=1, bytes_saved=entry[5])
+                return body
+
+        response.raise_for_status()
+        self._count(misses=1, bytes_downloaded=len(response.content))
+        self._store(url, response)
+        return response.text
+
+    def hit_ratio(self) -> float:
+        hits = self.stats["fresh"] + self.stats["revalidated"]
+        return hits / self.stats["requests"] if self.stats["requests"] else 0.0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def print_cache_summary(cache: HTTPCache):
+    stats = cache.stats
+    print(f"\nHTTP cache:")
+    print(f"Requests    : {stats['requests']} ({stats['fresh']} fresh, {stats['revalidated']} not modified, "
+          f"{stats['misses']} downloaded)")
+    print(f"Hit ratio   : {cache.hit_ratio():.1%}")
+    print(f"Bytes saved : {stats['bytes_saved']:,} ({stats['bytes_downloaded']:,} downloaded)")
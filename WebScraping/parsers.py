@@ -0,0 +1,143 @@
+"""Book listing parsers with interchangeable backends.
+
+Every backend parses a listing page once into a document, then yields the
+(title, price) books of its product pods (or (href, title, price)
+products) and gives the category named by its heading and the links the
+crawler follows. All backends produce the same output as the original full
+BeautifulSoup/html.parser walk, which is kept as the "soup" reference.
+
+- "lxml": libxml2 parser and XPath, much faster (optional dependency).
+- "strainer": html.parser limited by a SoupStrainer to the product pods,
+  the category sidebar and the pager; used when lxml is not installed.
+- "soup": the original full-tree parse, for comparison.
+"""
+import html
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Listing headings that are not a category of their own
+GENERAL_LISTINGS = {"All products", "Books"}
+
+# First run of digits, dots and commas in the price text ("£51.77", "Â£1,234.50")
+PRICE = re.compile(r"[\d\.,]+")
+
+
+def parse_price(price_text: str) -> float:
+    """Price of a "p.price_color" text, 0.0 when missing or unreadable"""
+    if not price_text:
+        return 0.0
+    match = PRICE.search(html.unescape(price_text))
+    if not match:
+        return 0.0
+    try:
+        return float(match.group(0).replace(",", ""))
+    except ValueError:
+        return 0.0
+
+
+class SoupParser:
+    name = "soup"
+    features = "html.parser"
+
+    def parse(self, html_text: str):
+        return BeautifulSoup(html_text, self.features)
+
+    def books(self, document):
+        for _, title, price in self.products(document):
+            yield title, price
+
+    def products(self, document):
+        """(product page href, title, price) of each product pod"""
+        for article in document.select("article.product_pod"):
+            a = article.find("h3").find("a")
+            title = a.get("title") or a.get_text(strip=True)
+            price_tag = article.select_one("p.price_color")
+            yield a.get("href"), title, parse_price(price_tag.get_text(strip=True) if price_tag else "")
+
+    def links(self, document):
+        """(category hrefs, "next" href or None, pager text such as "Page 1 of 45")"""
+        categories = [a["href"] for a in document.select("div.side_categories a[href]")]
+        next_link = document.select_one("li.next a[href]")
+        current = document.select_one("li.current")
+        return categories, next_link["href"] if next_link else None, current.get_text() if current else ""
+
+    def category(self, document):
+        """Category named by the listing heading, None for the general listings"""
+        heading = document.select_one("div.page-header h1")
+        name = heading.get_text(strip=True) if heading else ""
+        return name if name and name not in GENERAL_LISTINGS else None
+
+
+STRAINED_CLASSES = {"product_pod", "side_categories", "pager", "page-header"}
+
+
+def _strained(class_value):
+    # The raw class attribute is seen while parsing ("product_pod other")
+    return class_value is not None and not STRAINED_CLASSES.isdisjoint(class_value.split())
+
+
+class StrainerParser(SoupParser):
+    name = "strainer"
+    # Only these subtrees are built; the rest of the page is skipped
+    only = SoupStrainer(attrs={"class": _strained})
+
+    def parse(self, html_text: str):
+        return BeautifulSoup(html_text, self.features, parse_only=self.only)
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlParser:
+    name = "lxml"
+    PODS = f"//article[{_has_class('product_pod')}]"
+    PRICE_TAG = f".//p[{_has_class('price_color')}]"
+    CATEGORIES = f"//div[{_has_class('side_categories')}]//a[@href]"
+    NEXT = f"//li[{_has_class('next')}]//a[@href]"
+    CURRENT = f"//li[{_has_class('current')}]"
+    HEADING = f"//div[{_has_class('page-header')}]//h1"
+
+    def parse(self, html_text: str):
+        return lxml.html.fromstring(html_text)
+
+    def books(self, document):
+        for _, title, price in self.products(document):
+            yield title, price
+
+    def products(self, document):
+        for article in document.xpath(self.PODS):
+            a = article.find(".//h3").find(".//a")
+            title = a.get("title") or "".join(text.strip() for text in a.itertext())
+            price_tags = article.xpath(self.PRICE_TAG)
+            price_text = "".join(text.strip() for text in price_tags[0].itertext()) if price_tags else ""
+            yield a.get("href"), title, parse_price(price_text)
+
+    def links(self, document):
+        categories = [a.get("href") for a in document.xpath(self.CATEGORIES)]
+        next_links = document.xpath(self.NEXT)
+        current = document.xpath(self.CURRENT)
+        return (categories, next_links[0].get("href") if next_links else None,
+                current[0].text_content() if current else "")
+
+    def category(self, document):
+        headings = document.xpath(self.HEADING)
+        name = "".join(text.strip() for text in headings[0].itertext()) if headings else ""
+        return name if name and name not in GENERAL_LISTINGS else None
+
+
+PARSERS = {parser.name: parser for parser in (SoupParser, StrainerParser, LxmlParser)}
+DEFAULT_PARSER = "lxml" if lxml is not None else "strainer"
+
+
+def get_parser(name: str = None):
+    name = name or DEFAULT_PARSER
+    if name == "lxml" and lxml is None:
+        raise ValueError("The lxml parser requires lxml (pip install lxml)")
+    return PARSERS[name]()
@@ -1,70 +1,138 @@
+import argparse
 import requests
-from bs4 import BeautifulSoup
-import html
-import re
+from requests.adapters import HTTPAdapter
+from http_cache import HTTPCache, print_cache_summary
+from parsers import PARSERS, get_parser
+from book_store import BookStore, BookTotals
+from urllib.parse import urljoin
 
 URL = "https://books.toscrape.com/catalogue/category/books/science_22/index.html"
 OUTFILE = "books.txt"
 THRESHOLD = 20.0  # price threshold for rejection
-print("threshold:", THRESHOLD)
+TIMEOUT = 10.0  # seconds, per request
+CACHE_DIR = ".http_cache"
+CACHE_MAX_BYTES = 50 * 1024 * 1024
 
-def fetch_page(url: str) -> str:
-    response = requests.get(url)
+def make_session(pool_size: int = 10) -> requests.Session:
+    # Keep-alive connections reused across requests (and threads, in crawl mode)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_page(url: str, session=None, timeout: float = TIMEOUT, cache=None) -> str:
+    if cache is not None:
+        # Served locally when fresh, revalidated with a conditional GET otherwise
+        return cache.get(url, session=session, timeout=timeout)
+    response = (session or requests).get(url, timeout=timeout)
     response.raise_for_status()
     return response.text
 
-def parse_books(html_text: str):
-    soup = BeautifulSoup(html_text, "html.parser")
-    books = []
-
-    for article in soup.select("article.product_pod"):
-        # Title
-        a = article.find("h3").find("a")
-        title = a.get("title") or a.get_text(strip=True)
-
-        # Price
-        price_tag = article.select_one("p.price_color")
-        price_text = price_tag.get_text(strip=True) if price_tag else ""
-        price = 0.0
-        if price_text:
-            cleaned = html.unescape(price_text)
-            m = re.search(r"[\d\.,]+", cleaned)
-            if m:
-                num = m.group(0).replace(",", "")
-                try:
-                    price = float(num)
-                except ValueError:
-                    price = 0.0
-        
-        books.append((title, price))
-    return books
+def parse_books(html_text: str, parser: str = None):
+    # Generator of (title, price); lxml backend when installed (see parsers.py)
+    book_parser = get_parser(parser)
+    yield from book_parser.books(book_parser.parse(html_text))
+
+def parse_products(html_text: str, base_url: str, parser: str = None):
+    # Generator of (product url, title, price, category), for the incremental store
+    book_parser = get_parser(parser)
+    document = book_parser.parse(html_text)
+    category = book_parser.category(document)
+    for href, title, price in book_parser.products(document):
+        yield urljoin(base_url, href), title, price, category
 
 def save_books_to_file(books, threshold):
+    # Streams: `books` may be any iterable, e.g. BookStore.iter_books()
     with open(OUTFILE, "w", encoding="utf-8") as f:
         for title, price in books:
             status = "Accepted" if price <= threshold else "Rejected"
             f.write(f"{status:9} | £{price:7.2f} | {title}\n")
 
 def print_summary(books, threshold):
-    total_cost = sum(price for _, price in books)
-    accepted = sum(1 for _, price in books if price <= threshold)
-    rejected = len(books) - accepted
+    totals = BookTotals(threshold)
+    for _, price in books:
+        totals.add(price)
+    print_totals(totals)
 
+def print_totals(totals: BookTotals):
     print(f"\nSummary:")
-    print(f"Total books : {len(books)}")
-    print(f"Total cost  : £{total_cost:.2f}")
-    print(f"Accepted    : {accepted}")
-    print(f"Rejected    : {rejected}")
+    print(f"Total books : {totals.books}")
+    print(f"Total cost  : £{totals.total_cost:.2f}")
+    print(f"Accepted    : {totals.accepted}")
+    print(f"Rejected    : {totals.rejected}")
+
+def crawl_books(start_url: str, workers: int, cache=None, parser: str = None):
+    # Follows category and pagination links; a book listed on several pages is kept
+    # once, keyed by its product URL like BookStore.add (first listing wins)
+    from crawler import Crawler, print_report
+
+    crawler = Crawler([start_url], workers=workers, cache=cache, parser=parser)
+    books = {}
+    for _, products in crawler.iter_pages():
+        for url, title, price, _ in products:
+            books.setdefault(url, (title, price))
+    print_report(crawler.report)
+    return list(books.values())
+
+def store_books(store: BookStore, args, cache=None) -> BookTotals:
+    # Incremental mode: books go to the store in batches as pages are parsed
+    from crawler import Crawler, print_report
+
+    store.start_run(THRESHOLD, args.url)
+    if args.crawl:
+        crawler = Crawler([args.url], workers=args.workers, cache=cache, parser=args.parser)
+        for _, products in crawler.iter_pages():
+            store.add_many(products)
+        print_report(crawler.report)
+    else:
+        store.add_many(parse_products(fetch_page(args.url, cache=cache), args.url, args.parser))
+    return store.finish_run()
+
+def run_incremental(args, cache=None):
+    # books.txt is exported from the store; the summary comes from the running totals
+    store = BookStore(args.store)
+    try:
+        totals = store_books(store, args, cache)
+        save_books_to_file(store.iter_books(), THRESHOLD)
+    finally:
+        store.close()
+    print(f"\nBooks stored in '{args.store}' and exported to '{OUTFILE}'")
+    print_totals(totals)
+    print(f"New books   : {totals.new_books}")
+    print(f"New prices  : {totals.price_changes}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Scrape book prices")
+    parser.add_argument("--url", default=URL, help="Listing page to scrape (or to start crawling from)")
+    parser.add_argument("--crawl", action="store_true", help="Follow category and pagination links concurrently")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests in crawl mode")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="On-disk HTTP cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Always download pages in full")
+    parser.add_argument("--parser", choices=sorted(PARSERS), help="HTML parser backend (default: lxml if installed)")
+    parser.add_argument("--store", metavar="DB", help="Upsert books into this SQLite file and keep their price history")
+    args = parser.parse_args()
+    print("threshold:", THRESHOLD)
+
+    cache = None if args.no_cache else HTTPCache(args.cache_dir, CACHE_MAX_BYTES)
     try:
-        html_content = fetch_page(URL)
-        books = parse_books(html_content)
-        save_books_to_file(books, THRESHOLD)
-        print(f"\nBooks saved to '{OUTFILE}'")
-        print_summary(books, THRESHOLD)
+        if args.store:
+            run_incremental(args, cache)
+        else:
+            if args.crawl:
+                books = crawl_books(args.url, args.workers, cache, args.parser)
+            else:
+                books = list(parse_books(fetch_page(args.url, cache=cache), args.parser))
+            save_books_to_file(books, THRESHOLD)
+            print(f"\nBooks saved to '{OUTFILE}'")
+            print_summary(books, THRESHOLD)
+        if cache is not None:
+            print_cache_summary(cache)
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        if cache is not None:
+            cache.close()
 
 if __name__ == "__main__":
     main()
@@ -1,166 +1,156 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 import re
+from collections import namedtuple
 from datetime import datetime
 import logging
+import atexit
+import os
+import time
 import uuid
+from matcher import TOKEN_PATTERN, tokenize
+from common_words import is_common_word
+from knowledge import KnowledgeStore
+from catalogue import CatalogueStore, default_source, format_answer, parse_question, reply_language
+from cache import ResponseCache
+from export import EXPORT_FORMATS, parse_export_cursor, stream_export
+from retention import RetentionJob
+from log_config import MESSAGE_LOGGER, configure_logging
+import metrics
 from database import (
     init_database, 
     save_conversation, 
-    get_conversation_history, 
+    save_conversations,
+    ConversationWriter,
+    CONNECTIONS,
+    DATABASE_NAME,
+    get_conversation_page,
     get_statistics,
     search_conversations
 )
 
 app = Flask(__name__)
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('chatbot.log'),
-        logging.StreamHandler()
-    ]
-)
+# Mode de résolution des intentions : 'first' (premier motif trouvé) ou 'ranked' (score)
+MATCH_MODE = os.environ.get('CHATBOT_MATCH_MODE', 'first')
+# Confiance minimale en mode 'ranked' avant de répondre par défaut
+MIN_MATCH_CONFIDENCE = float(os.environ.get('CHATBOT_MIN_CONFIDENCE', '0.5'))
+# Cache des réponses : nombre d'entrées (0 = désactivé) et durée de vie en secondes (0 = illimitée)
+RESPONSE_CACHE_SIZE = int(os.environ.get('CHATBOT_CACHE_SIZE', '1024'))
+RESPONSE_CACHE_TTL = float(os.environ.get('CHATBOT_CACHE_TTL', '300'))
+# Écriture des conversations en arrière-plan par lots (0 = écriture synchrone)
+ASYNC_WRITES = os.environ.get('CHATBOT_ASYNC_WRITES', '1') == '1'
+WRITER_QUEUE_SIZE = int(os.environ.get('CHATBOT_WRITER_QUEUE_SIZE', '10000'))
+WRITER_BATCH_SIZE = int(os.environ.get('CHATBOT_WRITER_BATCH_SIZE', '200'))
+WRITER_FLUSH_INTERVAL = float(os.environ.get('CHATBOT_WRITER_FLUSH_INTERVAL', '0.5'))
+# Politique quand la file est pleine : 'block' (attente bornée) ou 'drop'
+WRITER_POLICY = os.environ.get('CHATBOT_WRITER_POLICY', 'block')
+# Source de la base de connaissances : fichier JSON/YAML ou 'db' (tables de la base)
+KB_SOURCE = os.environ.get('CHATBOT_KB_SOURCE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base.json'))
+# Instantané compilé (pickle) pour un démarrage rapide ; désactivé si vide
+KB_SNAPSHOT = os.environ.get('CHATBOT_KB_SNAPSHOT') or None
+# Intervalle de vérification de la source en secondes (0 = pas de rechargement à chaud)
+KB_RELOAD_INTERVAL = float(os.environ.get('CHATBOT_KB_RELOAD_INTERVAL', '5'))
+# Correction orthographique quand aucune intention n'est reconnue : distance
+# d'édition maximale (0 = désactivée) et longueur minimale des mots corrigés
+FUZZY_MAX_DISTANCE = int(os.environ.get('CHATBOT_FUZZY_MAX_DISTANCE', '2'))
+FUZZY_MIN_LENGTH = int(os.environ.get('CHATBOT_FUZZY_MIN_LENGTH', '4'))
+# Catalogue de livres extrait par WebScraping/ (books.db ou books.txt) ; désactivé si vide
+CATALOGUE_SOURCE = os.environ.get('CHATBOT_CATALOGUE_SOURCE', default_source(os.path.dirname(os.path.abspath(__file__))))
+# Intervalle de vérification d'un nouveau passage du scraper en secondes (0 = jamais)
+CATALOGUE_RELOAD_INTERVAL = float(os.environ.get('CHATBOT_CATALOGUE_RELOAD_INTERVAL', '30'))
+# Nombre maximal de messages acceptés par /chat/batch
+MAX_BATCH_SIZE = int(os.environ.get('CHATBOT_MAX_BATCH_SIZE', '100'))
+# Rétention des conversations (0 = désactivée), intervalle en secondes, archive optionnelle
+RETENTION_DAYS = int(os.environ.get('CHATBOT_RETENTION_DAYS', '0'))
+RETENTION_INTERVAL = float(os.environ.get('CHATBOT_RETENTION_INTERVAL', '3600'))
+RETENTION_BATCH_SIZE = int(os.environ.get('CHATBOT_RETENTION_BATCH_SIZE', '500'))
+RETENTION_ARCHIVE_DIR = os.environ.get('CHATBOT_RETENTION_ARCHIVE_DIR') or None
+
+# Configuration du logging : file + thread d'écriture (JSON, rotation, échantillonnage)
+configure_logging()
+MESSAGE_LOG = logging.getLogger(MESSAGE_LOGGER)
 
 # Initialisation de la base de données au démarrage
 init_database()
-
-# Base de connaissances améliorée avec synonymes et variations
-KNOWLEDGE_BASE = {
-    'greeting': {
-        'patterns': ['hello', 'hi', 'hey', 'bonjour', 'salut', 'good morning', 'good evening'],
-        'responses': {
-            'en': 'Hello! 👋 How can I help you today?',
-            'fr': 'Bonjour ! 👋 Comment puis-je vous aider ?'
-        }
-    },
-    'name': {
-        'patterns': ['name', 'who are you', 'your name', 'nom', 'qui es-tu', 'qui êtes-vous'],
-        'responses': {
-            'en': 'My name is Hotel Assistant 🤖. I\'m here to help you with hotel information.',
-            'fr': 'Je m\'appelle Assistant Hôtel 🤖. Je suis là pour vous aider avec les informations de l\'hôtel.'
-        }
-    },
-    'age': {
-        'patterns': ['old', 'age', 'âge', 'quel âge'],
-        'responses': {
-            'en': 'I\'m a virtual assistant, so I don\'t have an age! 😊',
-            'fr': 'Je suis un assistant virtuel, donc je n\'ai pas d\'âge ! 😊'
-        }
-    },
-    'availability': {
-        'patterns': ['available', 'rooms', 'vacancy', 'chambres', 'disponible', 'libre'],
-        'responses': {
-            'en': 'Yes! 🛏️ We have 5 rooms available right now.',
-            'fr': 'Oui ! 🛏️ Nous avons 5 chambres disponibles en ce moment.'
-        }
-    },
-    'checkin': {
-        'patterns': ['check-in', 'check in', 'arrival', 'arrivée', 'heure d\'arrivée'],
-        'responses': {
-            'en': 'Check-in time is at 12:00 PM (noon) 🕐',
-            'fr': 'L\'heure d\'arrivée est à 12h00 (midi) 🕐'
-        }
-    },
-    'checkout': {
-        'patterns': ['check-out', 'check out', 'departure', 'départ', 'heure de départ'],
-        'responses': {
-            'en': 'Check-out time is at 11:00 AM 🕚',
-            'fr': 'L\'heure de départ est à 11h00 🕚'
-        }
-    },
-    'price': {
-        'patterns': ['price', 'cost', 'rent', 'charge', 'fee', 'prix', 'coût', 'tarif', 'combien'],
-        'responses': {
-            'en': '💰 Our room rate is ₹1,500 for 24 hours.',
-            'fr': '💰 Le tarif de notre chambre est de ₹1,500 pour 24 heures.'
-        }
-    },
-    'tourism': {
-        'patterns': ['tourist', 'attractions', 'visit', 'places', 'see', 'touristique', 'visiter', 'lieu'],
-        'responses': {
-            'en': '🗺️ Nearby attractions include: Taj Mahal, India Gate, Lotus Temple, and many more amazing places!',
-            'fr': '🗺️ Les attractions à proximité incluent : Taj Mahal, India Gate, Lotus Temple, et bien d\'autres lieux magnifiques !'
-        }
-    },
-    'cab': {
-        'patterns': ['cab', 'taxi', 'transport', 'car'],
-        'responses': {
-            'en': '🚕 Yes, we provide taxi service at ₹12/KM.',
-            'fr': '🚕 Oui, nous fournissons un service de taxi à ₹12/KM.'
-        }
-    },
-    'food': {
-        'patterns': ['food', 'restaurant', 'meal', 'dining', 'eat', 'nourriture', 'restaurant', 'repas', 'manger'],
-        'responses': {
-            'en': '🍽️ Yes, we have an excellent restaurant with diverse cuisine!',
-            'fr': '🍽️ Oui, nous avons un excellent restaurant avec une cuisine variée !'
-        }
-    },
-    'wifi': {
-        'patterns': ['wifi', 'internet', 'connection'],
-        'responses': {
-            'en': '📶 Yes, free high-speed WiFi is available throughout the hotel.',
-            'fr': '📶 Oui, le WiFi haut débit gratuit est disponible dans tout l\'hôtel.'
-        }
-    },
-    'payment': {
-        'patterns': ['payment', 'pay', 'methods', 'paiement', 'payer', 'moyens'],
-        'responses': {
-            'en': '💳 We accept UPI and Cash payments.',
-            'fr': '💳 Nous acceptons les paiements UPI et en espèces.'
-        }
-    },
-    'cancellation': {
-        'patterns': ['cancel', 'refund', 'annulation', 'remboursement'],
-        'responses': {
-            'en': '✅ We offer free cancellation!',
-            'fr': '✅ Nous offrons une annulation gratuite !'
-        }
-    },
-    'parking': {
-        'patterns': ['parking', 'park', 'car park', 'stationnement'],
-        'responses': {
-            'en': '🚗 Yes, free parking is available right in front of your room.',
-            'fr': '🚗 Oui, un parking gratuit est disponible juste devant votre chambre.'
-        }
-    },
-    'goodbye': {
-        'patterns': ['bye', 'goodbye', 'see you', 'au revoir', 'à bientôt', 'adieu'],
-        'responses': {
-            'en': '👋 Goodbye! Have a great day! Feel free to come back anytime.',
-            'fr': '👋 Au revoir ! Bonne journée ! N\'hésitez pas à revenir quand vous voulez.'
-        }
-    },
-    'thanks': {
-        'patterns': ['thank', 'thanks', 'merci', 'thank you'],
-        'responses': {
-            'en': '😊 You\'re welcome! Happy to help!',
-            'fr': '😊 Je vous en prie ! Ravi de vous aider !'
-        }
-    },
-    'help': {
-        'patterns': ['help', 'aide', 'assist', 'support'],
-        'responses': {
-            'en': 'I can help you with: room availability, prices, check-in/out times, services (WiFi, parking, food, taxi), tourist places, and payment methods. What would you like to know?',
-            'fr': 'Je peux vous aider avec : disponibilité des chambres, prix, horaires d\'arrivée/départ, services (WiFi, parking, nourriture, taxi), lieux touristiques et moyens de paiement. Que voulez-vous savoir ?'
-        }
-    }
-}
-
-# Mots français courants pour la détection de langue
-FRENCH_WORDS = [
-    'bonjour', 'merci', 'oui', 'non', 'salut', 'aide', 'comment', 'quoi', 
-    'où', 'quand', 'pourquoi', 'combien', 'quel', 'quelle', 'est-ce', 
-    'chambres', 'prix', 'disponible', 'heure'
-]
+atexit.register(CONNECTIONS.close_all)
+
+# Écrivain de conversations en arrière-plan, vidé proprement à l'arrêt
+CONVERSATION_WRITER = None
+if ASYNC_WRITES:
+    CONVERSATION_WRITER = ConversationWriter(
+        max_queue_size=WRITER_QUEUE_SIZE,
+        batch_size=WRITER_BATCH_SIZE,
+        flush_interval=WRITER_FLUSH_INTERVAL,
+        policy=WRITER_POLICY
+    ).start()
+    atexit.register(CONVERSATION_WRITER.stop)
+
+# Tâche de rétention périodique : suppression par lots, archive et compactage
+RETENTION_JOB = None
+if RETENTION_DAYS > 0:
+    RETENTION_JOB = RetentionJob(
+        retention_days=RETENTION_DAYS,
+        interval=RETENTION_INTERVAL,
+        batch_size=RETENTION_BATCH_SIZE,
+        archive_dir=RETENTION_ARCHIVE_DIR,
+        # Un seul passage à la fois quand plusieurs workers importent app.py
+        lock_path=DATABASE_NAME + '.retention.lock'
+    ).start(initial_delay=60)
+    atexit.register(RETENTION_JOB.stop)
+
+# Cache des réponses indexé sur (version de la base, texte normalisé, langue)
+RESPONSE_CACHE = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+# Base de connaissances compilée, rechargée à chaud quand sa source change
+KNOWLEDGE = KnowledgeStore(
+    KB_SOURCE,
+    snapshot_path=KB_SNAPSHOT,
+    on_swap=lambda snapshot: RESPONSE_CACHE.clear(),
+    fuzzy_distance=FUZZY_MAX_DISTANCE
+)
+KNOWLEDGE.load()
+KNOWLEDGE.start(KB_RELOAD_INTERVAL)
+atexit.register(KNOWLEDGE.stop)
+
+# Index en mémoire du catalogue, reconstruit quand un passage du scraper se termine
+CATALOGUE = None
+if CATALOGUE_SOURCE:
+    CATALOGUE = CatalogueStore(CATALOGUE_SOURCE)
+    CATALOGUE.load()
+    CATALOGUE.start(CATALOGUE_RELOAD_INTERVAL)
+    atexit.register(CATALOGUE.stop)
+
+def reload_knowledge_base(knowledge_base=None):
+    """Recharge la base depuis sa source, ou publie les intentions fournies
+
+    Le nouvel instantané est compilé en entier avant d'être publié ; le
+    cache des réponses est alors invalidé.
+    """
+    if knowledge_base is None:
+        return KNOWLEDGE.load()
+    
+    current = KNOWLEDGE.current()
+    return KNOWLEDGE.swap({
+        'default_language': current.default_language,
+        'lexicons': current.lexicons,
+        'default_responses': current.default_responses,
+        'intents': knowledge_base
+    }, source='reload_knowledge_base')
+
+# Résultat de l'analyse d'un message, réutilisé par la détection et la correspondance
+MessageAnalysis = namedtuple('MessageAnalysis', ['normalized', 'language', 'tokens'])
+
+@metrics.stage('language_detection')
+def analyze_message(user_input, knowledge=None):
+    """Normalise le message, le découpe une seule fois et détecte sa langue"""
+    knowledge = knowledge or KNOWLEDGE.current()
+    normalized = normalize_text(user_input)
+    detection = knowledge.detector.detect(normalized)
+    return MessageAnalysis(normalized, detection.language, detection.tokens)
 
 def detect_language(text):
-    """Détecte si le texte est en français ou anglais"""
-    text_lower = text.lower()
-    french_count = sum(1 for word in FRENCH_WORDS if word in text_lower)
-    return 'fr' if french_count > 0 else 'en'
+    """Détecte la langue du texte (français ou anglais par défaut)"""
+    return analyze_message(text).language
 
 def normalize_text(text):
     """Normalise le texte pour la comparaison"""
@@ -169,42 +159,168 @@ def normalize_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
-def find_best_match(user_input):
-    """Trouve la meilleure correspondance dans la base de connaissances"""
-    normalized_input = normalize_text(user_input)
+def find_best_match(user_input, ranked=False, top_k=3, analysis=None, knowledge=None):
+    """Trouve la meilleure correspondance dans la base de connaissances
+
+    En mode classé, renvoie la liste des top_k (catégorie, confiance).
+    Une analyse déjà calculée par analyze_message évite de re-découper le texte.
+    """
+    knowledge = knowledge or KNOWLEDGE.current()
+    normalized_input = analysis.normalized if analysis else normalize_text(user_input)
+    if ranked:
+        tokens = analysis.tokens if analysis else tokenize(normalized_input)
+        return knowledge.token_index.rank(tokens, top_k)
+    return knowledge.matcher.match(normalized_input)
+
+def resolve_category(user_input, analysis=None, knowledge=None):
+    """Choisit la catégorie selon le mode de résolution configuré"""
+    if MATCH_MODE != 'ranked':
+        return find_best_match(user_input, analysis=analysis, knowledge=knowledge)
+
+    candidates = find_best_match(user_input, ranked=True, top_k=1, analysis=analysis, knowledge=knowledge)
+    if candidates and candidates[0][1] >= MIN_MATCH_CONFIDENCE:
+        return candidates[0][0]
+    return None
+
+def fuzzy_distance_for(word):
+    """Distance tolérée selon la longueur du mot : 1 jusqu'à 7 lettres, puis 2"""
+    return min(FUZZY_MAX_DISTANCE, max(1, len(word) // 4))
+
+def correct_message(analysis, knowledge=None):
+    """Corrige les mots inconnus d'après le vocabulaire des motifs
+
+    Le vocabulaire de la langue du message est consulté en premier, puis
+    celui de la langue par défaut. Les mots courants (« went », « sent »)
+    ne sont jamais corrigés, et un mot n'est remplacé que si un seul mot du
+    vocabulaire est le plus proche. Renvoie une nouvelle analyse, ou None si
+    aucun mot n'a été corrigé.
+    """
+    knowledge = knowledge or KNOWLEDGE.current()
+    indexes = [
+        knowledge.fuzzy[language]
+        for language in dict.fromkeys((analysis.language, knowledge.default_language))
+        if language in knowledge.fuzzy
+    ]
+    if not indexes:
+        return None
     
-    for category, data in KNOWLEDGE_BASE.items():
-        for pattern in data['patterns']:
-            if pattern in normalized_input:
-                return category
+    corrections = {}
+    for token in analysis.tokens:
+        if token in corrections or len(token) < FUZZY_MIN_LENGTH or not token.isalpha():
+            continue
+        if is_common_word(token) or any(token in index for index in indexes):
+            continue
+        for index in indexes:
+            found = index.lookup(token, fuzzy_distance_for(token), unique=True)
+            if found:
+                corrections[token] = found[0]
+                break
+    if not corrections:
+        return None
     
-    return None
+    normalized = TOKEN_PATTERN.sub(lambda match: corrections.get(match.group(), match.group()), analysis.normalized)
+    tokens = [corrections.get(token, token) for token in analysis.tokens]
+    return MessageAnalysis(normalized, analysis.language, tokens)
+
+@metrics.stage('matching')
+def generate_response(user_input, analysis, knowledge=None):
+    """Calcule (réponse, correspondance) sans cache ni sauvegarde à partir de l'analyse du message
+
+    La correspondance vaut 'exact', 'fuzzy' (trouvée après correction
+    orthographique), 'corrected' (mots corrigés mais toujours sans
+    intention) ou None (réponse par défaut sans correction possible).
+    """
+    knowledge = knowledge or KNOWLEDGE.current()
+    lang = analysis.language
+    category = resolve_category(user_input, analysis, knowledge)
+    match = 'exact' if category else None
+    
+    # Repli tolérant aux fautes de frappe, seulement si la correspondance exacte échoue
+    if not category and knowledge.fuzzy:
+        corrected = correct_message(analysis, knowledge)
+        if corrected:
+            category = resolve_category(corrected.normalized, corrected, knowledge)
+            match = 'fuzzy' if category else 'corrected'
+    
+    if category:
+        responses = knowledge.intents[category]['responses']
+        MESSAGE_LOG.info("Réponse trouvée (catégorie: %s, %s)", category, match, extra={'category': category})
+        return responses.get(lang, responses[knowledge.default_language]), match
+    
+    MESSAGE_LOG.warning("Aucune correspondance trouvée pour : %s", user_input, extra={'language': lang})
+    default_responses = knowledge.default_responses
+    return default_responses.get(lang, default_responses[knowledge.default_language]), match
+
+@metrics.stage('catalogue')
+def answer_catalogue_question(user_input, analysis):
+    """Répond depuis le catalogue aux questions sur les livres, sinon renvoie None
+
+    Une question ambiguë (« book » seul) sans résultat est laissée à la
+    base de connaissances.
+    """
+    index = CATALOGUE.current() if CATALOGUE else None
+    if not index:
+        return None
+    parsed = parse_question(user_input, analysis.tokens, index)
+    if parsed is None:
+        return None
+    query, certain = parsed
+    total, book_ids = index.search(query)
+    if not total and not certain:
+        return None
+    return format_answer(index, query, total, book_ids, reply_language(analysis.tokens, analysis.language))
+
+def resolve_message(user_input):
+    """Renvoie (réponse, langue) en passant par le cache des réponses"""
+    # Un seul instantané de la base pour toute la requête, même pendant un rechargement
+    knowledge = KNOWLEDGE.current()
+    
+    # Analyse unique : normalisation, jetons et détection de la langue
+    analysis = analyze_message(user_input, knowledge)
+    lang = analysis.language
+    MESSAGE_LOG.info("Langue détectée : %s", lang, extra={'language': lang})
+    
+    # Questions sur les livres : l'index du catalogue répond sans passer par le cache
+    answer = answer_catalogue_question(user_input, analysis)
+    if answer is not None:
+        return answer, lang
+    
+    cache_key = (knowledge.version, analysis.normalized, lang)
+    cached = RESPONSE_CACHE.get(cache_key)
+    if cached is None:
+        cached = generate_response(user_input, analysis, knowledge)
+        RESPONSE_CACHE.put(cache_key, cached)
+    
+    response, match = cached
+    # Toujours compté (exposé aussi par /api/stats), seulement quand une
+    # correction a été faite ; la correspondance en cache compte aussi
+    if match in ('fuzzy', 'corrected'):
+        metrics.FUZZY_ATTEMPTS.inc(lang)
+        if match == 'fuzzy':
+            metrics.FUZZY_RESCUES.inc(lang)
+    if match not in ('exact', 'fuzzy') and metrics.ENABLED:
+        metrics.UNMATCHED.inc(lang)
+    
+    return response, lang
+
+@metrics.stage('persistence')
+def persist_conversation(user_input, response, lang, session_id=None):
+    """Sauvegarde une conversation, en file d'écriture ou directement"""
+    if CONVERSATION_WRITER:
+        CONVERSATION_WRITER.submit(user_input, response, lang, session_id)
+    else:
+        save_conversation(user_input, response, lang, session_id)
 
+@metrics.stage('chatbot')
 def chatBot(user_input, session_id=None):
     """Fonction principale du chatbot avec NLP amélioré"""
     try:
-        logging.info(f"Question reçue : {user_input}")
-        
-        # Détection de la langue
-        lang = detect_language(user_input)
-        logging.info(f"Langue détectée : {lang}")
-        
-        # Recherche de la meilleure correspondance
-        category = find_best_match(user_input)
-        
-        if category:
-            response = KNOWLEDGE_BASE[category]['responses'][lang]
-            logging.info(f"Réponse trouvée (catégorie: {category})")
-        else:
-            default_responses = {
-                'en': "I'm sorry, I don't have information about that. 😔 You can ask me about: rooms, prices, check-in/out, WiFi, parking, food, taxi, or tourist places.",
-                'fr': "Désolé, je n'ai pas d'informations à ce sujet. 😔 Vous pouvez me poser des questions sur : chambres, prix, arrivée/départ, WiFi, parking, nourriture, taxi ou lieux touristiques."
-            }
-            logging.warning(f"Aucune correspondance trouvée pour : {user_input}")
-            response = default_responses[lang]
-        
-        # Sauvegarder la conversation dans la base de données
-        save_conversation(user_input, response, lang, session_id)
+        MESSAGE_LOG.info("Question reçue : %s", user_input, extra={'session_id': session_id})
+        
+        response, lang = resolve_message(user_input)
+        
+        # Sauvegarder la conversation dans la base de données (y compris sur un succès du cache)
+        persist_conversation(user_input, response, lang, session_id)
         
         return response
         
@@ -212,12 +328,90 @@ def chatBot(user_input, session_id=None):
         logging.error(f"Erreur dans chatBot : {str(e)}")
         return "Sorry, an error occurred. Please try again. / Désolé, une erreur s'est produite. Veuillez réessayer."
 
+def chatBotBatch(items):
+    """Résout une liste de (message, session_id) et les sauvegarde en une transaction
+
+    Renvoie (résultats, sauvegardé) : un résultat par message, avec la
+    réponse ou l'erreur propre à ce message.
+    """
+    results = []
+    records = []
+    
+    for user_input, session_id in items:
+        try:
+            response, lang = resolve_message(user_input)
+        except Exception as e:
+            logging.error(f"Erreur dans chatBotBatch : {str(e)}")
+            results.append({'error': 'Internal error', 'session_id': session_id})
+            continue
+        
+        results.append({'reply': response, 'session_id': session_id})
+        records.append((user_input, response, lang, session_id, None))
+    
+    # Une seule transaction pour tout le lot, quel que soit le mode d'écriture
+    persisted = True
+    try:
+        save_conversations(records)
+    except Exception as e:
+        persisted = False
+        logging.error(f"❌ Erreur lors de la sauvegarde d'un lot de {len(records)} conversations : {str(e)}")
+    
+    return results, persisted
+
+def collect_statistics():
+    """Statistiques de la base complétées par l'état du cache, de l'écrivain et de la rétention"""
+    stats = get_statistics()
+    stats['response_cache'] = RESPONSE_CACHE.stats()
+    stats['knowledge_base'] = KNOWLEDGE.stats()
+    if CATALOGUE:
+        stats['catalogue'] = CATALOGUE.stats()
+    attempts = metrics.FUZZY_ATTEMPTS.total()
+    rescues = metrics.FUZZY_RESCUES.total()
+    stats['fuzzy_matching'] = {
+        'max_distance': FUZZY_MAX_DISTANCE,
+        'attempts': attempts,
+        'rescues': rescues,
+        'rescue_rate': round(rescues / attempts, 4) if attempts else 0.0
+    }
+    if CONVERSATION_WRITER:
+        stats['conversation_writer'] = CONVERSATION_WRITER.stats()
+    if RETENTION_JOB:
+        stats['retention'] = RETENTION_JOB.last_report
+    return stats
+
+# Sérialisation JSON de la réponse de /chat, mesurée comme une étape
+serialize_reply = metrics.stage('serialization')(jsonify)
+
+# Durée et code de chaque requête ; rien n'est enregistré si les métriques sont désactivées
+if metrics.ENABLED:
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            metrics.observe_request(request.endpoint or 'unknown', response.status_code, time.perf_counter() - started)
+        return response
+
 @app.route("/")
 def index():
     """Page d'accueil"""
     logging.info("Page d'accueil chargée")
     return render_template("index.html")
 
+def session_id_from(value):
+    """Identifiant de session fourni, ou un nouvel identifiant s'il est absent ; None s'il n'est pas une chaîne"""
+    if value is None or value == '':
+        return str(uuid.uuid4())
+    return value if isinstance(value, str) else None
+
+INVALID_SESSION_ID = {
+    'error': 'session_id must be a string',
+    'reply': 'Invalid session. / Session invalide.'
+}
+
 @app.route("/chat", methods=["POST"])
 def chat():
     """Endpoint API pour le chat"""
@@ -232,7 +426,10 @@ def chat():
             }), 400
         
         user_message = data.get("message", "").strip()
-        session_id = data.get("session_id", str(uuid.uuid4()))
+        session_id = session_id_from(data.get("session_id"))
+        if session_id is None:
+            logging.warning("Requête invalide : session_id n'est pas une chaîne")
+            return jsonify(INVALID_SESSION_ID), 400
         
         if not user_message:
             logging.warning("Message vide reçu")
@@ -244,9 +441,9 @@ def chat():
         # Génération de la réponse
         bot_reply = chatBot(user_message, session_id)
         
-        logging.info(f"Réponse envoyée : {bot_reply[:50]}...")
+        MESSAGE_LOG.info("Réponse envoyée : %.50s...", bot_reply, extra={'session_id': session_id})
         
-        return jsonify({
+        return serialize_reply({
             'reply': bot_reply,
             'timestamp': datetime.now().isoformat(),
             'session_id': session_id
@@ -259,30 +456,128 @@ def chat():
             'reply': 'An error occurred. Please try again. / Une erreur s\'est produite. Veuillez réessayer.'
         }), 500
 
+@app.route("/chat/batch", methods=["POST"])
+def chat_batch():
+    """Endpoint API pour plusieurs messages en une requête
+
+    Accepte une liste [{"message": ..., "session_id": ...}] (ou un objet
+    {"messages": [...]}) ; les messages invalides sont signalés un par un
+    sans faire échouer le lot.
+    """
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('messages') if isinstance(data, dict) else data
+        
+        if not isinstance(items, list) or not items:
+            logging.warning("Requête batch invalide : liste de messages manquante")
+            return jsonify({'error': 'A non-empty list of messages is required'}), 400
+        
+        if len(items) > MAX_BATCH_SIZE:
+            logging.warning(f"Lot trop grand : {len(items)} messages")
+            return jsonify({
+                'error': f'Too many messages (maximum {MAX_BATCH_SIZE})',
+                'max_batch_size': MAX_BATCH_SIZE
+            }), 413
+        
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            message = item.get('message') if isinstance(item, dict) else None
+            if not isinstance(message, str) or not message.strip():
+                results[index] = {'index': index, 'error': 'Message is required'}
+                continue
+            session_id = session_id_from(item.get('session_id'))
+            if session_id is None:
+                results[index] = {'index': index, 'error': INVALID_SESSION_ID['error']}
+                continue
+            valid.append((index, message.strip(), session_id))
+        
+        resolved, persisted = chatBotBatch([(message, session_id) for _, message, session_id in valid])
+        for (index, _, _), result in zip(valid, resolved):
+            results[index] = {'index': index, **result}
+        
+        failed = sum('error' in result for result in results)
+        logging.info(f"Lot traité : {len(items) - failed} réponses, {failed} erreurs")
+        
+        return jsonify({
+            'results': results,
+            'processed': len(items) - failed,
+            'failed': failed,
+            'persisted': persisted,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        logging.error(f"Erreur dans /chat/batch : {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route("/api/history", methods=["GET"])
 def get_history():
-    """Récupère l'historique des conversations"""
+    """Récupère l'historique des conversations, page par page"""
     try:
         limit = request.args.get('limit', 50, type=int)
-        history = get_conversation_history(limit)
+        
+        try:
+            page = get_conversation_page(
+                limit,
+                cursor=request.args.get('cursor'),
+                session_id=request.args.get('session_id'),
+                language=request.args.get('language'),
+                since=request.args.get('since'),
+                until=request.args.get('until')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'history': history,
-            'count': len(history)
+            'history': page['items'],
+            'count': len(page['items']),
+            'next_cursor': page['next_cursor']
         })
         
     except Exception as e:
         logging.error(f"Erreur dans /api/history : {str(e)}")
         return jsonify({'error': 'Failed to retrieve history'}), 500
 
+@app.route("/api/export", methods=["GET"])
+def export_conversations():
+    """Exporte les conversations en flux (NDJSON ou CSV, gzip optionnel)"""
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        compress = request.args.get('gzip', '0') in ('1', 'true')
+        
+        try:
+            chunks = stream_export(
+                export_format,
+                compress,
+                since=request.args.get('since'),
+                until=request.args.get('until'),
+                session_id=request.args.get('session_id'),
+                after_id=parse_export_cursor(request.args.get('cursor'))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        filename = f"conversations.{export_format}" + ('.gz' if compress else '')
+        mimetype = 'application/gzip' if compress else EXPORT_FORMATS[export_format]
+        
+        logging.info(f"📤 Export des conversations démarré ({filename})")
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+        
+    except Exception as e:
+        logging.error(f"Erreur dans /api/export : {str(e)}")
+        return jsonify({'error': 'Export failed'}), 500
+
 @app.route("/api/stats", methods=["GET"])
 def get_stats():
     """Récupère les statistiques d'utilisation"""
     try:
-        stats = get_statistics()
-        
         return jsonify({
-            'statistics': stats,
+            'statistics': collect_statistics(),
             'generated_at': datetime.now().isoformat()
         })
         
@@ -290,6 +585,25 @@ def get_stats():
         logging.error(f"Erreur dans /api/stats : {str(e)}")
         return jsonify({'error': 'Failed to retrieve statistics'}), 500
 
+@app.route("/api/health", methods=["GET"])
+def health():
+    """État de la base de données et du gestionnaire de connexions"""
+    database = CONNECTIONS.health()
+    status_code = 200 if database['status'] == 'ok' else 503
+    
+    return jsonify({
+        'status': database['status'],
+        'database': database,
+        'checked_at': datetime.now().isoformat()
+    }), status_code
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Métriques au format texte Prometheus"""
+    if not metrics.ENABLED:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route("/api/search", methods=["GET"])
 def search():
     """Recherche dans les conversations"""
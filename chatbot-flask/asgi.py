@@ -0,0 +1,260 @@
+"""Mode de service asynchrone (ASGI) du chatbot.
+
+Les routes /chat, /api/history, /api/stats, /api/search, /api/health et
+/metrics sont
+servies par Starlette avec la même base de connaissances, le même matcher et
+le même cache que app.py (un seul import, aucune copie). La résolution des
+messages, purement en mémoire, s'exécute sur la boucle d'événements ; les
+accès SQLite passent par un pool de threads borné pour ne jamais la bloquer.
+L'export et /chat/batch restent servis par le mode Flask.
+
+Production (depuis chatbot-flask/) :
+    uvicorn asgi:application --host 0.0.0.0 --port 8000 --workers 4
+    python asgi.py
+
+Chaque worker importe app.py : il a sa propre base de connaissances en
+mémoire (et ses rechargements), son cache et son écrivain de conversations,
+qui se partagent les fichiers SQLite (WAL, busy_timeout). La tâche de
+rétention ne tourne que dans le worker qui détient le verrou
+chatbot.db.retention.lock.
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+import app as chatbot
+import metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Threads dédiés aux accès SQLite (une connexion par thread)
+DB_WORKERS = int(os.environ.get('CHATBOT_DB_WORKERS', '8'))
+# Point d'entrée de production
+ASGI_HOST = os.environ.get('CHATBOT_HOST', '0.0.0.0')
+ASGI_PORT = int(os.environ.get('CHATBOT_PORT', '8000'))
+ASGI_WORKERS = int(os.environ.get('CHATBOT_WORKERS', '1'))
+
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix='chatbot-db')
+
+
+serialize_reply = metrics.stage('serialization')(JSONResponse)
+
+
+async def run_db(function, *args, **kwargs):
+    """Exécute un appel bloquant à la base dans le pool de threads"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(DB_EXECUTOR, partial(function, *args, **kwargs))
+
+
+def query_int(request, name, default):
+    """Paramètre entier de la requête, valeur par défaut s'il est absent ou invalide"""
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+async def index(request):
+    """Page d'accueil"""
+    return FileResponse(os.path.join(BASE_DIR, 'templates', 'index.html'))
+
+
+async def chat(request):
+    """Endpoint API pour le chat"""
+    try:
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+
+        if not isinstance(data, dict) or 'message' not in data:
+            logging.warning("Requête invalide : message manquant")
+            return JSONResponse({
+                'error': 'Message is required',
+                'reply': 'Please send a message. / Veuillez envoyer un message.'
+            }, status_code=400)
+
+        user_message = str(data.get('message') or '').strip()
+        session_id = chatbot.session_id_from(data.get('session_id'))
+        if session_id is None:
+            logging.warning("Requête invalide : session_id n'est pas une chaîne")
+            return JSONResponse(chatbot.INVALID_SESSION_ID, status_code=400)
+
+        if not user_message:
+            logging.warning("Message vide reçu")
+            return JSONResponse({
+                'error': 'Empty message',
+                'reply': 'Please send a non-empty message. / Veuillez envoyer un message non vide.'
+            }, status_code=400)
+
+        # Résolution sur la boucle (calcul en mémoire), sauvegarde dans le pool
+        chatbot.MESSAGE_LOG.info("Question reçue : %s", user_message, extra={'session_id': session_id})
+        bot_reply, lang = chatbot.resolve_message(user_message)
+        await run_db(chatbot.persist_conversation, user_message, bot_reply, lang, session_id)
+
+        return serialize_reply({
+            'reply': bot_reply,
+            'timestamp': datetime.now().isoformat(),
+            'session_id': session_id
+        })
+
+    except Exception as e:
+        logging.error(f"Erreur dans /chat : {str(e)}")
+        return JSONResponse({
+            'error': 'Internal server error',
+            'reply': 'An error occurred. Please try again. / Une erreur s\'est produite. Veuillez réessayer.'
+        }, status_code=500)
+
+
+async def get_history(request):
+    """Récupère l'historique des conversations, page par page"""
+    try:
+        try:
+            page = await run_db(
+                chatbot.get_conversation_page,
+                query_int(request, 'limit', 50),
+                cursor=request.query_params.get('cursor'),
+                session_id=request.query_params.get('session_id'),
+                language=request.query_params.get('language'),
+                since=request.query_params.get('since'),
+                until=request.query_params.get('until')
+            )
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        return JSONResponse({
+            'history': page['items'],
+            'count': len(page['items']),
+            'next_cursor': page['next_cursor']
+        })
+
+    except Exception as e:
+        logging.error(f"Erreur dans /api/history : {str(e)}")
+        return JSONResponse({'error': 'Failed to retrieve history'}, status_code=500)
+
+
+async def get_stats(request):
+    """Récupère les statistiques d'utilisation"""
+    try:
+        return JSONResponse({
+            'statistics': await run_db(chatbot.collect_statistics),
+            'generated_at': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        logging.error(f"Erreur dans /api/stats : {str(e)}")
+        return JSONResponse({'error': 'Failed to retrieve statistics'}, status_code=500)
+
+
+async def health(request):
+    """État de la base de données et du gestionnaire de connexions"""
+    database = await run_db(chatbot.CONNECTIONS.health)
+    status_code = 200 if database['status'] == 'ok' else 503
+
+    return JSONResponse({
+        'status': database['status'],
+        'database': database,
+        'checked_at': datetime.now().isoformat()
+    }, status_code=status_code)
+
+
+async def search(request):
+    """Recherche dans les conversations"""
+    try:
+        keyword = request.query_params.get('q', '')
+        limit = query_int(request, 'limit', 20)
+
+        if not keyword:
+            return JSONResponse({'error': 'Search keyword is required'}, status_code=400)
+
+        results = await run_db(chatbot.search_conversations, keyword, limit)
+
+        return JSONResponse({
+            'results': results,
+            'count': len(results),
+            'keyword': keyword
+        })
+
+    except Exception as e:
+        logging.error(f"Erreur dans /api/search : {str(e)}")
+        return JSONResponse({'error': 'Search failed'}, status_code=500)
+
+
+async def get_metrics(request):
+    """Métriques au format texte Prometheus"""
+    if not metrics.ENABLED:
+        return JSONResponse({'error': 'Metrics are disabled'}, status_code=404)
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """Compte chaque requête HTTP et mesure sa durée, par route"""
+
+    def __init__(self, app, endpoints):
+        self.app = app
+        self.endpoints = endpoints
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            path = scope['path']
+            endpoint = 'static' if path.startswith('/static/') else self.endpoints.get(path, 'unknown')
+            metrics.observe_request(endpoint, status, time.perf_counter() - started)
+
+
+@asynccontextmanager
+async def lifespan(application):
+    logging.info("🚀 Démarrage du chatbot en mode ASGI...")
+    yield
+    # Les sauvegardes en cours se terminent avant l'arrêt de l'écrivain (atexit)
+    DB_EXECUTOR.shutdown(wait=True)
+
+
+routes = [
+    Route('/', index),
+    Route('/chat', chat, methods=['POST']),
+    Route('/api/history', get_history, methods=['GET']),
+    Route('/api/stats', get_stats, methods=['GET']),
+    Route('/api/health', health, methods=['GET']),
+    Route('/api/search', search, methods=['GET']),
+    Route('/metrics', get_metrics, methods=['GET']),
+    Mount('/static', StaticFiles(directory=os.path.join(BASE_DIR, 'static')), name='static'),
+]
+
+# Mêmes noms de routes que le mode Flask dans les étiquettes des métriques
+endpoints = {route.path: route.endpoint.__name__ for route in routes if isinstance(route, Route)}
+
+application = Starlette(
+    routes=routes,
+    middleware=[Middleware(MetricsMiddleware, endpoints=endpoints)] if metrics.ENABLED else [],
+    lifespan=lifespan
+)
+
+
+if __name__ == "__main__":
+    uvicorn.run('asgi:application', host=ASGI_HOST, port=ASGI_PORT, workers=ASGI_WORKERS)
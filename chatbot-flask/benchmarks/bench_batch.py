@@ -0,0 +1,69 @@
+"""Benchmark : N appels à /chat contre des appels groupés à /chat/batch.
+
+Passe par le client de test Flask (analyse JSON, routage, sauvegarde
+synchrone) pour comparer le coût par message vu d'une intégration.
+
+Utilisation (depuis chatbot-flask/) :
+    python benchmarks/bench_batch.py [messages] [taille de lot]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+MESSAGES = [
+    "hello", "bonjour", "what are your opening hours?", "quels sont vos horaires ?",
+    "how much is a room", "je voudrais réserver une chambre", "wifi password", "merci beaucoup"
+]
+
+
+def run_single(client, messages):
+    start = time.perf_counter()
+    for index, message in enumerate(messages):
+        response = client.post('/chat', json={'message': message, 'session_id': f'single-{index % 20}'})
+        assert response.status_code == 200
+    return time.perf_counter() - start
+
+
+def run_batch(client, messages, batch_size):
+    start = time.perf_counter()
+    for offset in range(0, len(messages), batch_size):
+        items = [
+            {'message': message, 'session_id': f'batch-{index % 20}'}
+            for index, message in enumerate(messages[offset:offset + batch_size])
+        ]
+        response = client.post('/chat/batch', json=items)
+        assert response.status_code == 200 and response.get_json()['failed'] == 0
+    return time.perf_counter() - start
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    messages = [MESSAGES[i % len(MESSAGES)] for i in range(total)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Base et journal dans un dossier temporaire, sauvegardes synchrones
+        os.chdir(tmp)
+        os.environ['CHATBOT_ASYNC_WRITES'] = '0'
+        os.environ['CHATBOT_MAX_BATCH_SIZE'] = str(batch_size)
+        import app
+        logging.disable(logging.WARNING)
+        client = app.app.test_client()
+
+        single = run_single(client, messages)
+        batch = run_batch(client, messages, batch_size)
+
+        print(f"{total} messages, lots de {batch_size}")
+        print(f"  /chat        : {total / single:10.0f} messages/s ({single:.3f} s)")
+        print(f"  /chat/batch  : {total / batch:10.0f} messages/s ({batch:.3f} s)")
+        print(f"  speedup      : {single / batch:10.1f}x")
+        app.CONNECTIONS.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Micro-benchmark : questions sur le catalogue contre un parcours linéaire des livres.
+
+Construit un catalogue synthétique, vérifie que CatalogueIndex.search donne
+les mêmes livres qu'un parcours complet et que les messages de l'hôtel
+(« I want to book ») ne sont pas pris pour des questions sur les livres,
+puis mesure p50/p99 par type de question. Échoue si un p99 dépasse 1 ms.
+
+Utilisation (depuis chatbot-flask/) :
+    python benchmarks/bench_catalogue.py [--books 100000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalogue import CatalogueIndex, CatalogueQuery, parse_question
+from matcher import tokenize
+
+CATEGORIES = ['Science', 'Poetry', 'Travel', 'Mystery', 'Historical Fiction', 'Music', 'Business', 'Romance']
+QUERIES = 300
+MAX_P99_MS = 1.0
+
+# Messages laissés à la base de connaissances, et questions sur le catalogue
+HOTEL_MESSAGES = [
+    "I want to book", "what's the price to book", "how do I book?", "I want to book a room",
+    "can I book a table for tonight?", "Je voudrais réserver une chambre", "book", "how much to book it",
+]
+CATALOGUE_MESSAGES = [
+    "books under £20", "What is the cheapest science book?", "livres entre 10 et 15 £",
+    "le livre de poésie le plus cher", "book under 12.50", "any mystery book", "show me books",
+]
+
+
+def random_word(rng, min_len=3, max_len=9):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+def build_books(count, rng):
+    """Titres de 1 à 6 mots tirés d'un vocabulaire de 20 000 mots, prix de £1 à £100"""
+    vocabulary = [random_word(rng) for _ in range(20000)]
+    return [
+        (' '.join(rng.choice(vocabulary).capitalize() for _ in range(rng.randint(1, 6))),
+         round(rng.uniform(1, 100), 2), rng.choice(CATEGORIES), f'catalogue/book_{number}/index.html')
+        for number in range(count)
+    ], vocabulary
+
+
+def linear_search(books, query):
+    """Référence : parcours de tous les livres, triés comme l'index"""
+    low = query.min_price if query.min_price is not None else float('-inf')
+    high = query.max_price if query.max_price is not None else float('inf')
+    matches = []
+    for title, price, category, _ in sorted(books, key=lambda book: (book[1], book[0])):
+        if not low <= price <= high or query.category not in (None, category):
+            continue
+        words = tokenize(title.lower())
+        *exact, last = query.title_tokens or [None]
+        if any(token not in words for token in exact):
+            continue
+        if last is not None and not any(word == last or word.startswith(last) for word in words):
+            continue
+        matches.append(title)
+    shown = matches[::-1][:query.limit] if query.descending else matches[:query.limit]
+    return len(matches), shown
+
+
+def build_queries(books, vocabulary, rng):
+    """Questions par type : prix, moins cher par catégorie, titre exact et préfixe du dernier mot"""
+    def title_words():
+        return tokenize(rng.choice(books)[0].lower())
+
+    return {
+        'under_price': [CatalogueQuery(None, rng.uniform(5, 60), None, False, [], 5) for _ in range(QUERIES)],
+        'price_range': [CatalogueQuery(low, low + rng.uniform(1, 10), None, False, [], 5)
+                        for low in (rng.uniform(1, 90) for _ in range(QUERIES))],
+        'cheapest_in_category': [CatalogueQuery(None, None, rng.choice(CATEGORIES), rng.random() < 0.5, [], 1)
+                                 for _ in range(QUERIES)],
+        'title_words': [CatalogueQuery(None, None, None, False, title_words()[:2], 5) for _ in range(QUERIES)],
+        'title_prefix': [CatalogueQuery(None, rng.choice([None, 50.0]), None, False,
+                                        [word[:3] for word in title_words()[-1:]], 5) for _ in range(QUERIES)],
+        'unknown_title': [CatalogueQuery(None, None, None, False, [random_word(rng, 10, 12)], 5)
+                          for _ in range(QUERIES)],
+    }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index du catalogue")
+    parser.add_argument('--books', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    books, vocabulary = build_books(args.books, rng)
+    start = time.perf_counter()
+    index = CatalogueIndex(books)
+    print(f"{len(index)} livres indexés en {time.perf_counter() - start:.2f} s "
+          f"({index.stats()['title_tokens']} mots de titre)")
+
+    for message in HOTEL_MESSAGES + CATALOGUE_MESSAGES:
+        tokens = tokenize(message.lower())
+        parsed = parse_question(message, tokens, index)
+        assert (parsed is None) == (message in HOTEL_MESSAGES), message
+
+    queries = build_queries(books, vocabulary, rng)
+    for name, group in queries.items():
+        for query in group[:5]:
+            total, ids = index.search(query)
+            assert (total, [index.titles[book_id] for book_id in ids]) == linear_search(books, query), (name, query)
+
+    print(f"{'question':>22} | {'p50 (µs)':>9} | {'p99 (µs)':>9}")
+    slowest = 0.0
+    for name, group in queries.items():
+        timings = []
+        for query in group:
+            start = time.perf_counter()
+            index.search(query)
+            timings.append((time.perf_counter() - start) * 1e6)
+        p99 = percentile(timings, 0.99)
+        slowest = max(slowest, p99)
+        print(f"{name:>22} | {percentile(timings, 0.5):>9.1f} | {p99:>9.1f}")
+
+    assert slowest < MAX_P99_MS * 1000, f"p99 de {slowest:.0f} µs au-delà de {MAX_P99_MS} ms"
+
+
+if __name__ == "__main__":
+    main()
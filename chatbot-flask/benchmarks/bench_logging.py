@@ -0,0 +1,85 @@
+"""Benchmark : coût de la journalisation dans le thread de requête.
+
+Compare l'ancienne configuration (FileHandler synchrone, texte) au pipeline
+de log_config (file + QueueListener, JSON), avec et sans échantillonnage.
+Chaque « requête » émet les journaux par message du chemin /chat.
+
+Utilisation (depuis chatbot-flask/) :
+    python benchmarks/bench_logging.py [requêtes par thread] [threads]
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['CHATBOT_LOG_CONSOLE'] = '0'
+import log_config
+
+
+def simulate_request(log, index):
+    """Journaux émis par /chat pour un message"""
+    session_id = f"session-{index % 50}"
+    log.info("Question reçue : %s", f"what is the price of room {index}?", extra={'session_id': session_id})
+    log.info("Langue détectée : %s", 'en', extra={'language': 'en'})
+    log.info("Réponse trouvée (catégorie: %s)", 'price', extra={'category': 'price'})
+    log.info("💾 Conversation sauvegardée : %.30s...", "what is the price of room", extra={'session_id': session_id})
+    log.info("Réponse envoyée : %.50s...", "Our rooms start at 80 EUR per night.", extra={'session_id': session_id})
+
+
+def run(requests, threads):
+    """Latences par requête (s) vues des threads, et durée totale"""
+    log = logging.getLogger(log_config.MESSAGE_LOGGER)
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        local = []
+        for index in range(requests):
+            start = time.perf_counter()
+            simulate_request(log, worker_id * requests + index)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sorted(latencies), time.perf_counter() - start
+
+
+def report(name, latencies, elapsed):
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{name:28} | {p50:8.1f} | {p99:8.1f} | {len(latencies) / elapsed:10.0f}")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    root = logging.getLogger()
+
+    print(f"{'configuration':28} | {'p50 µs':>8} | {'p99 µs':>8} | {'req/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        handler = logging.FileHandler(os.path.join(tmp, 'legacy.log'))
+        handler.setFormatter(logging.Formatter(log_config.TEXT_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        report('FileHandler (legacy)', *run(requests, threads))
+        root.removeHandler(handler)
+        handler.close()
+
+        for rate in (1.0, log_config.LOG_SAMPLE_RATE):
+            log_config.configure_logging(sample_rate=rate, path=os.path.join(tmp, f'pipeline-{rate}.log'))
+            report(f'QueueListener, sample={rate}', *run(requests, threads))
+            log_config.stop_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Micro-benchmark : automate PatternMatcher contre l'ancien parcours linéaire.
+
+Utilisation (depuis chatbot-flask/) :
+    python benchmarks/bench_matcher.py
+"""
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import PatternMatcher
+
+SIZES = [10, 1000, 50000]
+PATTERNS_PER_CATEGORY = 10
+MESSAGES = 200
+
+
+def legacy_find_best_match(knowledge_base, normalized_input):
+    """Ancien parcours : une recherche de sous-chaîne par motif"""
+    for category, data in knowledge_base.items():
+        for pattern in data['patterns']:
+            if pattern in normalized_input:
+                return category
+    return None
+
+
+def random_word(rng, min_len=4, max_len=10):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+def build_knowledge_base(size, rng):
+    """Génère une base synthétique de `size` motifs"""
+    knowledge_base = {}
+    for index in range(0, size, PATTERNS_PER_CATEGORY):
+        count = min(PATTERNS_PER_CATEGORY, size - index)
+        knowledge_base[f'category_{index}'] = {
+            'patterns': [random_word(rng) for _ in range(count)],
+            'responses': {'en': '', 'fr': ''}
+        }
+    return knowledge_base
+
+
+def build_messages(knowledge_base, rng):
+    """Mélange de messages avec et sans correspondance"""
+    all_patterns = [p for data in knowledge_base.values() for p in data['patterns']]
+    messages = []
+    for _ in range(MESSAGES):
+        words = [random_word(rng) for _ in range(rng.randint(3, 12))]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(all_patterns))
+        messages.append(' '.join(words))
+    return messages
+
+
+def run(size, rng):
+    knowledge_base = build_knowledge_base(size, rng)
+    messages = build_messages(knowledge_base, rng)
+    matcher = PatternMatcher(knowledge_base)
+
+    for message in messages:
+        expected = legacy_find_best_match(knowledge_base, message)
+        assert matcher.match(message) == expected, message
+
+    repeat = max(1, 20000 // size)
+    legacy = timeit.timeit(
+        lambda: [legacy_find_best_match(knowledge_base, m) for m in messages], number=repeat
+    )
+    compiled = timeit.timeit(lambda: [matcher.match(m) for m in messages], number=repeat)
+
+    calls = repeat * len(messages)
+    return {
+        'patterns': size,
+        'legacy_us': legacy / calls * 1e6,
+        'compiled_us': compiled / calls * 1e6,
+    }
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'patterns':>10} | {'legacy (µs)':>12} | {'compiled (µs)':>13} | {'speedup':>8}")
+    for size in SIZES:
+        result = run(size, rng)
+        speedup = result['legacy_us'] / result['compiled_us']
+        print(f"{result['patterns']:>10} | {result['legacy_us']:>12.2f} | "
+              f"{result['compiled_us']:>13.2f} | {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark : sauvegarde synchrone contre écrivain de conversations par lots.
+
+Simule des workers qui traitent des requêtes /chat en parallèle et mesure
+le nombre de requêtes par seconde vu du chemin de requête.
+
+Utilisation (depuis chatbot-flask/) :
+    python benchmarks/bench_writer.py [requêtes] [threads]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+def run_workers(total, threads, handle):
+    """Lance `threads` workers qui se partagent `total` requêtes"""
+    per_worker = total // threads
+
+    def worker(worker_id):
+        for index in range(per_worker):
+            handle(f"message {worker_id}-{index}", "reply", 'en', f"session-{worker_id}")
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return per_worker * threads, time.perf_counter() - start
+
+
+def count_rows():
+    conn = database.sqlite3.connect(database.DATABASE_NAME)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM conversations').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, 'sync.db')
+        database.init_database()
+        done, elapsed = run_workers(total, threads, database.save_conversation)
+        assert count_rows() == done
+        print(f"synchronous save_conversation : {done / elapsed:10.0f} req/s")
+
+        database.DATABASE_NAME = os.path.join(tmp, 'writer.db')
+        database.init_database()
+        writer = database.ConversationWriter().start()
+        done, elapsed = run_workers(total, threads, writer.submit)
+        print(f"ConversationWriter.submit     : {done / elapsed:10.0f} req/s")
+
+        start = time.perf_counter()
+        writer.stop()
+        print(f"  drain on shutdown           : {time.perf_counter() - start:10.3f} s")
+        assert count_rows() == done, writer.stats()
+        print(f"  writer stats                : {writer.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Test de charge : serveur Flask multithread contre mode ASGI (uvicorn).
+
+Chaque serveur est lancé dans un sous-processus sur une base temporaire,
+puis `concurrency` clients ouvrent chacun des connexions successives vers
+/chat pendant `duration` secondes, en rejouant le mélange réaliste de
+workload.py. Mesure le débit, les latences p50/p95/p99 et les erreurs
+(connexions refusées, réinitialisées ou expirées) ; --output écrit les
+résultats en JSON, comparables avec `suite.py --compare`.
+
+Utilisation (depuis chatbot-flask/) :
+    python benchmarks/load_test.py [--concurrency 10 100 500] [--duration 5] [--sync-writes]
+    python benchmarks/load_test.py --servers asgi --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from results import write_results
+from workload import messages
+
+SERVERS = {
+    'threaded': [sys.executable, '-c', 'import sys, app; app.app.run(port=int(sys.argv[1]), threaded=True)'],
+    'asgi': [sys.executable, '-m', 'uvicorn', 'asgi:application', '--log-level', 'warning', '--port'],
+}
+
+MESSAGES = messages(1000)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+async def post_chat(port, message, timeout):
+    """Une requête POST /chat sur une nouvelle connexion ; renvoie le code HTTP"""
+    body = json.dumps({'message': message, 'session_id': 'load-test'}).encode('utf-8')
+    request = (
+        f"POST /chat HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    ).encode('ascii') + body
+
+    reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+    try:
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+        return int(response.split(b' ', 2)[1])
+    finally:
+        writer.close()
+
+
+async def run_load(port, concurrency, duration, timeout):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client(client_id):
+        nonlocal errors
+        index = client_id
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await post_chat(port, MESSAGES[index % len(MESSAGES)], timeout)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+            index += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    """Percentile par rang le plus proche sur des valeurs triées"""
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    p95_ms = percentile(latencies, 0.95) * 1000
+    return {
+        'value': round(p95_ms, 3),
+        'unit': 'ms (p95)',
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(p95_ms, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge des modes de service")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--sync-writes', action='store_true', help="Sauvegarde synchrone dans la requête")
+    parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=sorted(SERVERS, reverse=True))
+    parser.add_argument('--output', help="Fichier JSON des résultats")
+    args = parser.parse_args()
+    results = {}
+
+    env = dict(os.environ, PYTHONPATH=APP_DIR, CHATBOT_ASYNC_WRITES='0' if args.sync_writes else '1')
+    print(f"{'server':>9} | {'clients':>7} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'errors':>6}")
+
+    for name in args.servers:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = subprocess.Popen(
+                SERVERS[name] + [str(port)], cwd=tmp, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                wait_for_port(port)
+                for concurrency in args.concurrency:
+                    result = summarize(*asyncio.run(run_load(port, concurrency, args.duration, args.timeout)))
+                    results[f'load.{name}.c{concurrency}'] = result
+                    print(f"{name:>9} | {concurrency:>7} | {result['rps']:>8.0f} | {result['p50_ms']:>8.1f} | "
+                          f"{result['p95_ms']:>8.1f} | {result['p99_ms']:>8.1f} | {result['errors']:>6}")
+            finally:
+                server.terminate()
+                server.wait(timeout=15)
+
+    if args.output:
+        write_results(args.output, results, duration=args.duration, sync_writes=args.sync_writes)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Format JSON commun des résultats de benchmark et comparaison avec une référence.
+
+Chaque résultat a un nom stable et une valeur principale `value` (plus
+petit = meilleur : µs par opération, ou latence p95 pour la charge), avec
+des champs complémentaires libres.
+"""
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+
+def environment():
+    """Contexte de la mesure, pour savoir si deux fichiers sont comparables"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def write_results(path, results, **meta):
+    """Écrit {'meta': ..., 'results': {nom: {...}}} dans `path`"""
+    document = {'meta': {**environment(), **meta}, 'results': results}
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(document, output, indent=2, sort_keys=True)
+        output.write('\n')
+    return document
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def compare(current, baseline, tolerance=0.25):
+    """Affiche l'écart de chaque résultat avec la référence
+
+    Renvoie le nombre de régressions : valeur supérieure de plus de
+    `tolerance` (proportion) à celle de la référence.
+    """
+    current_results = current['results']
+    baseline_results = baseline['results']
+    regressions = 0
+
+    print(f"{'benchmark':52} | {'baseline':>11} | {'current':>11} | {'delta':>8}")
+    for name in sorted(set(current_results) | set(baseline_results)):
+        if name not in baseline_results or name not in current_results:
+            side = 'new' if name not in baseline_results else 'missing'
+            print(f"{name:52} | {side:>11} |")
+            continue
+        before = baseline_results[name]['value']
+        after = current_results[name]['value']
+        delta = (after - before) / before if before else 0.0
+        flag = ''
+        if delta > tolerance:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f"{name:52} | {before:>11.2f} | {after:>11.2f} | {delta:>+7.1%}{flag}")
+
+    print(f"\n{regressions} regression(s) above {tolerance:.0%}")
+    return regressions
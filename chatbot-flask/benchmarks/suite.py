@@ -0,0 +1,282 @@
+"""Suite de benchmarks reproductible du chatbot.
+
+Mesure les fonctions du chemin chaud (normalize_text, detect_language,
+find_best_match, chatBot...), les fonctions de database.py sur des bases de
+10 000 et 1 000 000 conversations, et les routes Flask via le client de
+test. split_into_partitions, migration ponctuelle et destructive, n'est pas
+mesurée. Les résultats (µs par opération, médiane de plusieurs séries) sont
+écrits en JSON et peuvent être comparés à une référence.
+
+Utilisation (depuis chatbot-flask/) :
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --rows 10000 --baseline baseline.json
+    python benchmarks/suite.py --compare results.json --baseline baseline.json
+"""
+import argparse
+import itertools
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from results import compare, load_results, write_results
+from workload import messages
+
+GROUPS = ('text', 'db', 'routes')
+
+# Fautes corrigées par le repli orthographique, et mots courants laissés tels quels
+TYPOS = {"wfii password": "wifi", "chek out time": "check", "where is prking": "parking",
+         "remboursemnt svp": "remboursement"}
+COMMON_MESSAGES = ["I went there", "I sent it yesterday", "cast", "what about the best one", "tout va bien"]
+# Messages qui touchent plusieurs intentions : le mode 'ranked' répond comme le mode 'first'
+MULTI_INTENT_MESSAGES = {"wifi password and parking": ("wifi", "parking"), "price of parking": ("price", "parking"),
+                         "hello, wifi password and parking": ("greeting", "wifi", "parking")}
+
+
+def measure(function, repeat=5, min_time=0.05):
+    """Médiane et minimum du temps par appel (µs), nombre d'appels calibré"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+
+    median = statistics.median(timings) * 1e6
+    return {
+        'value': round(median, 3),
+        'unit': 'us/op',
+        'min_us': round(min(timings) * 1e6, 3),
+        'ops_per_sec': round(1e6 / median, 1) if median else None,
+        'calls': number * repeat
+    }
+
+
+def cycling(function, values):
+    """Appelle `function` sur les valeurs à tour de rôle"""
+    values = itertools.cycle(values)
+    return lambda: function(next(values))
+
+
+def text_cases(app, sample):
+    """Traitement des messages, sans base de données sauf pour chatBot"""
+    normalized = [app.normalize_text(message) for message in sample]
+    analyses = [app.analyze_message(message) for message in sample]
+    for message, word in TYPOS.items():
+        corrected = app.correct_message(app.analyze_message(message))
+        assert corrected and word in corrected.tokens, message
+    for message in COMMON_MESSAGES:
+        assert app.correct_message(app.analyze_message(message)) is None, message
+    typos = [app.analyze_message(message) for message in (*TYPOS, "xyzzy qwerty")]
+    for message, intents in MULTI_INTENT_MESSAGES.items():
+        ranked = app.find_best_match(message, ranked=True, top_k=len(intents))
+        assert [category for category, _ in ranked] == list(intents), message
+        assert all(confidence >= app.MIN_MATCH_CONFIDENCE for _, confidence in ranked), message
+        assert app.find_best_match(message) == intents[0], message
+    return [
+        ('text.normalize_text', cycling(app.normalize_text, sample)),
+        ('text.detect_language', cycling(app.detect_language, sample)),
+        ('text.analyze_message', cycling(app.analyze_message, sample)),
+        ('text.find_best_match', cycling(app.find_best_match, normalized)),
+        ('text.find_best_match_ranked', cycling(lambda text: app.find_best_match(text, ranked=True), normalized)),
+        ('text.generate_response', cycling(lambda analysis: app.generate_response(analysis.normalized, analysis), analyses)),
+        ('text.correct_message', cycling(app.correct_message, typos)),
+        ('text.resolve_message', cycling(app.resolve_message, sample)),
+        ('text.chatBot', cycling(lambda message: app.chatBot(message, 'bench-session'), sample)),
+    ]
+
+
+def populate(database, app, rows, sample, chunk_size=20000):
+    """Remplit la base courante de `rows` conversations étalées sur 180 jours"""
+    languages = {message: app.detect_language(message) for message in set(sample)}
+    start = datetime.now(timezone.utc) - timedelta(days=180)
+    step = timedelta(days=180) / rows
+    for offset in range(0, rows, chunk_size):
+        database.save_conversations([
+            (
+                sample[index % len(sample)],
+                'reply',
+                languages[sample[index % len(sample)]],
+                f'session-{index % 5000}',
+                (start + step * index).strftime('%Y-%m-%d %H:%M:%S')
+            )
+            for index in range(offset, min(rows, offset + chunk_size))
+        ])
+    with database.get_connection() as conn:
+        conn.execute('ANALYZE')
+
+
+def first_chunk(database, **filters):
+    chunks = database.iter_conversations(**filters)
+    try:
+        return next(chunks, None)
+    finally:
+        chunks.close()
+
+
+def db_cases(database, rows, sample):
+    """Fonctions publiques de database.py sur une base de `rows` conversations"""
+    prefix = f'db[{rows}]'
+    with database.get_connection() as conn:
+        max_id, middle = conn.execute(
+            "SELECT MAX(id), (SELECT timestamp FROM conversations ORDER BY timestamp LIMIT 1 OFFSET ?) "
+            "FROM conversations", (rows // 2,)
+        ).fetchone()
+    deep_cursor = database.encode_cursor(middle, max_id)
+    old_cutoff = '2000-01-01 00:00:00'
+    writer = database.ConversationWriter()
+
+    cases = [
+        ('init_database', database.init_database),
+        ('save_conversation', cycling(lambda message: database.save_conversation(message, 'reply', 'en', 'bench'), sample)),
+        ('save_conversations_100', lambda: database.save_conversations([(message, 'reply', 'en', 'bench', None) for message in sample[:100]])),
+        ('ConversationWriter.submit', cycling(lambda message: writer.submit(message, 'reply', 'en', 'bench'), sample)),
+        ('get_conversation_page', lambda: database.get_conversation_page(50)),
+        ('get_conversation_page_deep_cursor', lambda: database.get_conversation_page(50, cursor=deep_cursor)),
+        ('get_conversation_page_session', lambda: database.get_conversation_page(50, session_id='session-42')),
+        ('get_conversation_page_language_since', lambda: database.get_conversation_page(50, language='fr', since=middle)),
+        ('get_conversation_history', lambda: database.get_conversation_history(50)),
+        ('iter_conversations_first_chunk', lambda: first_chunk(database, after_id=max_id - 1000)),
+        ('get_statistics', database.get_statistics),
+        ('search_conversations', lambda: database.search_conversations('price room', 20)),
+        ('search_conversations_rare', lambda: database.search_conversations('remboursement', 20)),
+        ('delete_conversations_before', lambda: database.delete_conversations_before(old_cutoff, 500)),
+        ('clear_old_conversations', lambda: database.clear_old_conversations(3650)),
+        ('drop_partitions_before', lambda: database.drop_partitions_before(old_cutoff)),
+        ('database_size', database.database_size),
+        ('compact_database', database.compact_database),
+        ('explain_query_plan', lambda: database.explain_query_plan('SELECT * FROM conversations WHERE session_id = ?', ('x',))),
+    ]
+    heavy = [
+        ('rebuild_statistics', database.rebuild_statistics),
+        ('backfill_fts', database.backfill_fts),
+    ]
+    return [(f'{prefix}.{name}', call, False) for name, call in cases] + \
+           [(f'{prefix}.{name}', call, True) for name, call in heavy], writer
+
+
+def route_cases(app, rows, sample):
+    """Routes Flask via le client de test (JSON, routage, sérialisation)"""
+    client = app.app.test_client()
+    prefix = f'routes[{rows}]'
+    batch = [{'message': message, 'session_id': 'bench'} for message in sample[:10]]
+
+    def get(path):
+        return lambda: client.get(path).close()
+
+    return [
+        (f'{prefix}.POST /chat', cycling(
+            lambda message: client.post('/chat', json={'message': message, 'session_id': 'bench'}).close(), sample)),
+        (f'{prefix}.POST /chat/batch (10)', lambda: client.post('/chat/batch', json=batch).close()),
+        (f'{prefix}.GET /api/history', get('/api/history?limit=50')),
+        (f'{prefix}.GET /api/stats', get('/api/stats')),
+        (f'{prefix}.GET /api/search', get('/api/search?q=price&limit=20')),
+        (f'{prefix}.GET /api/health', get('/api/health')),
+        (f'{prefix}.GET /metrics', get('/metrics')),
+    ]
+
+
+def run_suite(rows_list, groups, repeat):
+    # Base, journal et file d'écriture isolés dans un dossier temporaire
+    workdir = tempfile.mkdtemp(prefix='chatbot-bench-')
+    os.chdir(workdir)
+    os.environ.setdefault('CHATBOT_LOG_CONSOLE', '0')
+    import app
+    import database
+    logging.disable(logging.WARNING)
+
+    sample = messages(1000)
+    results = {}
+
+    def record(name, call, heavy=False):
+        result = measure(call, repeat=1 if heavy else repeat, min_time=0 if heavy else 0.05)
+        results[name] = result
+        print(f"{name:52} {result['value']:>12.2f} µs/op", flush=True)
+
+    def switch_database(path=None):
+        # L'écrivain de l'application doit être inactif avant de fermer ses connexions
+        if app.CONVERSATION_WRITER:
+            app.CONVERSATION_WRITER.flush()
+        database.CONNECTIONS.close_all()
+        if path:
+            database.DATABASE_NAME = path
+            database.init_database()
+
+    if 'text' in groups:
+        for name, call in text_cases(app, sample):
+            record(name, call)
+
+    for rows in rows_list:
+        if not {'db', 'routes'} & set(groups):
+            break
+        switch_database(os.path.join(workdir, f'bench-{rows}.db'))
+        started = time.perf_counter()
+        populate(database, app, rows, sample)
+        print(f"-- {rows} rows loaded in {time.perf_counter() - started:.1f} s", flush=True)
+
+        if 'db' in groups:
+            cases, writer = db_cases(database, rows, sample)
+            writer.start()
+            for name, call, heavy in cases:
+                record(name, call, heavy)
+            writer.stop()
+        if 'routes' in groups:
+            for name, call in route_cases(app, rows, sample):
+                record(name, call)
+
+    switch_database()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks du chatbot")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000],
+                        help="Tailles de base pour les benchmarks de database.py et des routes")
+    parser.add_argument('--groups', nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument('--repeat', type=int, default=5, help="Séries par benchmark (médiane)")
+    parser.add_argument('--output', help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', help="Résultats de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Écart toléré avant régression")
+    parser.add_argument('--compare', metavar='RESULTS', help="Compare un fichier existant à --baseline sans mesurer")
+    args = parser.parse_args()
+
+    if args.compare:
+        if not args.baseline:
+            parser.error('--compare requires --baseline')
+        return 1 if compare(load_results(args.compare), load_results(args.baseline), args.tolerance) else 0
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    results = run_suite(args.rows, args.groups, args.repeat)
+    document = {'results': results}
+    if output:
+        document = write_results(output, results, rows=args.rows, groups=args.groups, repeat=args.repeat)
+        print(f"\nResults written to {output}")
+
+    if baseline:
+        return 1 if compare(document, baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
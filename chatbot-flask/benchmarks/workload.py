@@ -0,0 +1,46 @@
+"""Jeu de messages réaliste partagé par la suite de benchmarks et le test de charge.
+
+Les poids reproduisent un trafic d'hôtel : beaucoup de salutations et de
+questions de prix, des messages en français, et une part de messages sans
+intention reconnue (qui contournent la réponse par défaut du cache).
+"""
+import random
+
+MESSAGE_MIX = [
+    (12, "hello"),
+    (6, "Hi there!"),
+    (8, "bonjour"),
+    (10, "What is the price of a room for two nights?"),
+    (6, "Quel est le prix d'une chambre ?"),
+    (6, "Are rooms available this weekend?"),
+    (4, "Y a-t-il des chambres disponibles demain ?"),
+    (5, "What time is check-in?"),
+    (3, "À quelle heure est le départ ?"),
+    (5, "Do you have wifi in the rooms?"),
+    (4, "Is there a restaurant or somewhere to eat nearby?"),
+    (3, "Can you call a taxi to the airport?"),
+    (3, "Which payment methods do you accept?"),
+    (2, "Je voudrais une annulation et un remboursement"),
+    (3, "Where can I park my car?"),
+    (3, "What tourist attractions can we visit?"),
+    (4, "thank you so much"),
+    (3, "merci beaucoup, au revoir"),
+    (6, "My flight was delayed by {n} hours, what should I do?"),
+    (4, "Est-ce que le {n}e étage a une vue sur la mer ?"),
+]
+
+
+def message_stream(seed=42):
+    """Générateur infini et déterministe de messages tirés selon MESSAGE_MIX"""
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in MESSAGE_MIX]
+    templates = [template for _, template in MESSAGE_MIX]
+    while True:
+        template = rng.choices(templates, weights)[0]
+        yield template.format(n=rng.randint(1, 99))
+
+
+def messages(count, seed=42):
+    """Liste de `count` messages du mélange réaliste"""
+    stream = message_stream(seed)
+    return [next(stream) for _ in range(count)]
@@ -0,0 +1,441 @@
+import heapq
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple
+
+from matcher import tokenize
+
+# Question sur le catalogue : bornes de prix, catégorie, ordre et mots du titre
+CatalogueQuery = namedtuple('CatalogueQuery', [
+    'min_price', 'max_price', 'category', 'descending', 'title_tokens', 'limit'
+])
+
+# Mots qui désignent à coup sûr le catalogue ; « book » / « livre » seuls
+# peuvent aussi être un verbe (« book a room ») ou une monnaie
+STRONG_WORDS = {'books', 'livres', 'title', 'titles', 'titre', 'titres', 'novel', 'novels',
+                'roman', 'romans', 'catalogue', 'catalog'}
+WEAK_WORDS = {'book', 'livre'}
+# Mots de l'hôtel : avec « book » seul, la question concerne une réservation
+HOTEL_WORDS = {'room', 'rooms', 'night', 'nights', 'table', 'taxi', 'cab', 'chambre', 'chambres',
+               'nuit', 'nuits', 'stay', 'séjour', 'restaurant', 'parking', 'tonight', 'tomorrow', 'today',
+               'weekend', 'reservation', 'réservation', 'soir', 'demain', 'aujourd', 'hui', 'check'}
+STOPWORDS = {
+    'a', 'an', 'the', 'of', 'for', 'about', 'with', 'by', 'do', 'does', 'you', 'have', 'any', 'is',
+    'are', 'there', 'what', 'which', 'show', 'me', 'find', 'list', 'please', 'i', 'want', 'looking',
+    'your', 'under', 'below', 'less', 'than', 'over', 'above', 'more', 'between', 'and', 'cheaper',
+    'cheap', 'cheapest', 'expensive', 'most', 'least', 'priciest', 'price', 'prices', 'pound', 'pounds',
+    'up', 'to', 'at', 'max', 'maximum', 'min', 'minimum', 'in', 'on', 'some', 'all', 'can', 'get',
+    'le', 'la', 'les', 'l', 'un', 'une', 'des', 'de', 'du', 'd', 'avez', 'vous', 'est', 'ce', 'que',
+    'qui', 'quel', 'quels', 'quelle', 'quelles', 'moins', 'plus', 'cher', 'chers', 'chère', 'chères',
+    'entre', 'et', 'sous', 'en', 'dessous', 'au', 'à', 'pour', 'sur', 'je', 'cherche', 'voudrais',
+    'titled', 'called', 'named', 'intitulé', 'appelé', 'y', 't', 'il', 'prix', 'euros', 'inférieur',
+    'supérieur', 'partir', 'jusqu', 'avec',
+    'how', 'where', 'when', 'why', 'who', 'whats', 'it', 'its', 'my', 'we', 'our', 'us', 'this', 'that',
+    'should', 'could', 'would', 'will', 'like', 'need', 'much', 'cost', 'costs', 'pay', 'possible', 'now',
+    'comment', 'où', 'quand', 'pourquoi', 'puis', 'peux', 'peut', 'faire', 'veux', 'mon', 'ma', 'mes',
+    'nous', 'ça', 'cela', 'combien', 'coûte', 'réserver', 'si', 'ne', 'pas', 'moi', 'se',
+}
+
+AMOUNT = r"£?\s*(\d+(?:[.,]\d+)?)"
+PRICE_BETWEEN = re.compile(rf"(?:between|entre)\s*{AMOUNT}\s*(?:£|€)?\s*(?:and|et|-)\s*{AMOUNT}")
+PRICE_MAX = re.compile(rf"(?:under|below|less than|cheaper than|up to|at most|max(?:imum)?|moins de|sous|"
+                       rf"en dessous de|inférieurs? à|jusqu'à)\s*{AMOUNT}")
+PRICE_MIN = re.compile(rf"(?:over|above|more than|at least|min(?:imum)?|plus de|au-dessus de|"
+                       rf"supérieurs? à|à partir de)\s*{AMOUNT}")
+CHEAPEST = re.compile(r"\b(?:cheapest|least expensive|moins chers?|moins chères?)\b")
+PRICIEST = re.compile(r"\b(?:most expensive|priciest|plus chers?|plus chères?)\b")
+
+# Préfixes trop courts ou trop fréquents : le dernier mot n'est alors cherché qu'en entier
+MIN_PREFIX_LENGTH = 3
+MAX_PREFIX_EXPANSION = 64
+
+REPLIES = {
+    'en': {
+        'found': "I found {total} book(s){criteria}:",
+        'cheapest': "The cheapest book{criteria}:", 'priciest': "The most expensive book{criteria}:",
+        'none': "Sorry, I found no book{criteria}.",
+        'more': "…and {rest} more.",
+        'under': " under £{price:.2f}", 'over': " over £{price:.2f}", 'in': " in {category}",
+        'between': " between £{low:.2f} and £{high:.2f}", 'matching': " matching \"{words}\"",
+    },
+    'fr': {
+        'found': "J'ai trouvé {total} livre(s){criteria} :",
+        'cheapest': "Le livre le moins cher{criteria} :", 'priciest': "Le livre le plus cher{criteria} :",
+        'none': "Désolé, aucun livre ne correspond{criteria}.",
+        'more': "…et {rest} autre(s).",
+        'under': " à moins de £{price:.2f}", 'over': " à plus de £{price:.2f}", 'in': " en {category}",
+        'between': " entre £{low:.2f} et £{high:.2f}", 'matching': " pour « {words} »",
+    },
+}
+
+# Mots qui font répondre en français même si le reste du message est détecté en anglais
+FRENCH_WORDS = {'livre', 'livres', 'titre', 'titres', 'roman', 'romans', 'cher', 'chers', 'chère', 'chères'}
+
+Book = namedtuple('Book', ['title', 'price', 'category', 'url'])
+
+
+def _amount(text):
+    return float(text.replace(',', '.'))
+
+
+class CatalogueIndex:
+    """Index en mémoire du catalogue extrait par WebScraping/, construit une seule fois.
+
+    Les livres sont triés par prix : un identifiant est un rang dans ce tri.
+    Les requêtes par prix (globales ou par catégorie) sont deux bisections
+    sur un tableau de prix trié ; les recherches de titre passent par un
+    index inversé jeton -> identifiants (donc déjà triés par prix) et par
+    un vocabulaire trié pour les préfixes. Aucune requête ne touche le disque.
+    """
+
+    def __init__(self, books, version=None):
+        books = sorted((Book(*book) for book in books), key=lambda book: (book.price, book.title))
+        self.version = version
+        self.titles = [book.title for book in books]
+        self.prices = [book.price for book in books]
+        self.categories = [book.category for book in books]
+        self.urls = [book.url for book in books]
+
+        by_category = {}
+        postings = {}
+        for book_id, book in enumerate(books):
+            if book.category:
+                by_category.setdefault(book.category, []).append(book_id)
+            for token in dict.fromkeys(tokenize(book.title.lower())):
+                postings.setdefault(token, []).append(book_id)
+
+        # Catégorie -> (prix triés, identifiants) ; noms de catégorie normalisés -> catégorie
+        self._by_category = {
+            category: ([self.prices[book_id] for book_id in ids], ids) for category, ids in by_category.items()
+        }
+        self.category_names = {' '.join(tokenize(category.lower())): category for category in by_category}
+        self.max_category_words = max((name.count(' ') + 1 for name in self.category_names), default=1)
+        self._postings = postings
+        self._posting_sets = {}
+        self._vocabulary = sorted(postings)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def book(self, book_id):
+        return Book(self.titles[book_id], self.prices[book_id], self.categories[book_id], self.urls[book_id])
+
+    def find_category(self, tokens):
+        """Première catégorie nommée dans les jetons, et les jetons qui la composent"""
+        for size in range(min(self.max_category_words, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                name = ' '.join(tokens[start:start + size])
+                category = self.category_names.get(name) or self.category_names.get(name.rstrip('s'))
+                if category:
+                    return category, tokens[start:start + size]
+        return None, []
+
+    def _posting_set(self, token):
+        found = self._posting_sets.get(token)
+        if found is None:
+            found = self._posting_sets[token] = frozenset(self._postings.get(token, ()))
+        return found
+
+    def _title_terms(self, tokens):
+        """(identifiants triés, ensemble) par mot ; le dernier mot vaut aussi comme préfixe"""
+        terms = []
+        for position, token in enumerate(tokens):
+            expansions = [token] if token in self._postings else []
+            if position == len(tokens) - 1 and len(token) >= MIN_PREFIX_LENGTH:
+                start = bisect_left(self._vocabulary, token)
+                end = bisect_left(self._vocabulary, token + '\uffff')
+                if end - start <= MAX_PREFIX_EXPANSION:
+                    expansions = self._vocabulary[start:end]
+            if not expansions:
+                return None
+            if len(expansions) == 1:
+                terms.append((self._postings[expansions[0]], self._posting_set(expansions[0])))
+            else:
+                lists = [self._postings[word] for word in expansions]
+                ids = frozenset().union(*lists)
+                terms.append((heapq.merge(*lists), ids))
+        return terms
+
+    def search(self, query):
+        """Renvoie (nombre total de livres trouvés, [identifiants à afficher])"""
+        low = query.min_price if query.min_price is not None else float('-inf')
+        high = query.max_price if query.max_price is not None else float('inf')
+
+        if not query.title_tokens:
+            prices, ids = (self.prices, None)
+            if query.category is not None:
+                prices, ids = self._by_category.get(query.category, ([], []))
+            start, end = bisect_left(prices, low), bisect_right(prices, high)
+            if query.descending:
+                selected = range(end - 1, max(start, end - query.limit) - 1, -1)
+            else:
+                selected = range(start, min(end, start + query.limit))
+            return end - start, [ids[i] if ids is not None else i for i in selected]
+
+        terms = self._title_terms(query.title_tokens)
+        if not terms:
+            return 0, []
+        # Parcours du plus petit ensemble de candidats, filtré par les autres
+        terms.sort(key=lambda term: len(term[1]))
+        driver, others = terms[0][0], [ids for _, ids in terms[1:]]
+        prices, categories = self.prices, self.categories
+        total = 0
+        shown = deque(maxlen=query.limit) if query.descending else []
+        seen = None if isinstance(driver, list) else set()
+        for book_id in driver:
+            if seen is not None:
+                if book_id in seen:
+                    continue
+                seen.add(book_id)
+            if not low <= prices[book_id] <= high:
+                continue
+            if query.category is not None and categories[book_id] != query.category:
+                continue
+            if any(book_id not in ids for ids in others):
+                continue
+            total += 1
+            if query.descending or len(shown) < query.limit:
+                shown.append(book_id)
+        return total, list(reversed(shown)) if query.descending else shown
+
+    def stats(self):
+        return {
+            'books': len(self),
+            'categories': len(self._by_category),
+            'title_tokens': len(self._vocabulary),
+            'version': self.version
+        }
+
+
+EMPTY_INDEX = CatalogueIndex([])
+
+
+def parse_question(user_input, tokens, index):
+    """Reconnaît une question sur le catalogue ; renvoie (CatalogueQuery, certaine) ou None
+
+    Une question « certaine » cite explicitement des livres. Avec « book »
+    ou « livre » seul (aussi « réserver » ou une monnaie), il faut en plus
+    un critère : prix, superlatif, catégorie ou mots de titre ; sinon le
+    message reste à la base de connaissances, comme quand rien n'est trouvé.
+    """
+    words = set(tokens)
+    strong = not words.isdisjoint(STRONG_WORDS)
+    if not strong and (words.isdisjoint(WEAK_WORDS) or not words.isdisjoint(HOTEL_WORDS)):
+        return None
+
+    text = user_input.lower()
+    min_price = max_price = None
+    amounts = []
+    between = PRICE_BETWEEN.search(text)
+    if between:
+        amounts = [between.group(1), between.group(2)]
+        min_price, max_price = sorted(map(_amount, amounts))
+    else:
+        below = PRICE_MAX.search(text)
+        above = PRICE_MIN.search(text)
+        max_price = _amount(below.group(1)) if below else None
+        min_price = _amount(above.group(1)) if above else None
+        amounts = [match.group(1) for match in (below, above) if match]
+
+    descending = bool(PRICIEST.search(text))
+    superlative = descending or bool(CHEAPEST.search(text))
+    category, category_tokens = index.find_category(tokens)
+    # Les nombres d'un prix (« 12.50 » devient « 12 50 » une fois normalisé) ne sont pas des mots du titre
+    price_digits = {digits for amount in amounts for digits in re.findall(r'\d+', amount)}
+    ignored = STOPWORDS | STRONG_WORDS | WEAK_WORDS | set(category_tokens) | price_digits
+    title_tokens = [token for token in tokens if token not in ignored and (len(token) > 1 or token.isdigit())]
+
+    if not strong and not (superlative or category or title_tokens
+                           or min_price is not None or max_price is not None):
+        return None
+
+    query = CatalogueQuery(min_price, max_price, category, descending, title_tokens, 1 if superlative else 5)
+    return query, strong
+
+
+def reply_language(tokens, language):
+    """Langue de la réponse : le français l'emporte dès qu'un mot du catalogue est français"""
+    return 'fr' if not FRENCH_WORDS.isdisjoint(tokens) else language
+
+
+def describe(query, language):
+    replies = REPLIES.get(language, REPLIES['en'])
+    criteria = ''
+    if query.title_tokens:
+        criteria += replies['matching'].format(words=' '.join(query.title_tokens))
+    if query.category:
+        criteria += replies['in'].format(category=query.category)
+    if query.min_price is not None and query.max_price is not None:
+        criteria += replies['between'].format(low=query.min_price, high=query.max_price)
+    elif query.min_price is not None:
+        criteria += replies['over'].format(price=query.min_price)
+    elif query.max_price is not None:
+        criteria += replies['under'].format(price=query.max_price)
+    return criteria
+
+
+def format_answer(index, query, total, book_ids, language):
+    """Réponse en texte : nombre de livres trouvés puis un livre par ligne"""
+    replies = REPLIES.get(language, REPLIES['en'])
+    criteria = describe(query, language)
+    if not total:
+        return replies['none'].format(criteria=criteria)
+    if query.limit == 1:
+        heading = replies['priciest' if query.descending else 'cheapest'].format(criteria=criteria)
+    else:
+        heading = replies['found'].format(total=total, criteria=criteria)
+    lines = [heading]
+    for book_id in book_ids:
+        book = index.book(book_id)
+        lines.append(f"• {book.title} — £{book.price:.2f}")
+    if total > len(book_ids) and len(book_ids) > 1:
+        lines.append(replies['more'].format(rest=total - len(book_ids)))
+    return '\n'.join(lines)
+
+
+def default_source(base_dir):
+    """Base SQLite du scraper (--store books.db) si elle existe, sinon son export books.txt"""
+    scraping_dir = os.path.join(os.path.dirname(base_dir), 'WebScraping')
+    database = os.path.join(scraping_dir, 'books.db')
+    return database if os.path.exists(database) else os.path.join(scraping_dir, 'books.txt')
+
+
+def _read_database(path):
+    """Livres et dernier passage terminé d'une base produite par WebScraping/book_store.py"""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(books)')}
+        category = 'category' if 'category' in columns else 'NULL'
+        books = conn.execute(f'SELECT title, price, {category}, url FROM books').fetchall()
+        return books, _last_run(conn)
+    finally:
+        conn.close()
+
+
+def _last_run(conn):
+    return conn.execute('SELECT MAX(id) FROM runs WHERE finished_at IS NOT NULL').fetchone()[0]
+
+
+def _read_text(path):
+    """Livres de l'export books.txt (« Accepted  | £  42.96 | Titre »), sans catégorie"""
+    books = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            parts = line.rstrip('\n').split(' | ', 2)
+            if len(parts) == 3:
+                try:
+                    books.append((parts[2], float(parts[1].lstrip('£ ')), None, None))
+                except ValueError:
+                    continue
+    return books
+
+
+class CatalogueStore:
+    """Index courant du catalogue, reconstruit quand un nouveau passage du scraper se termine
+
+    Le nouvel index est entièrement construit dans le thread de
+    surveillance puis publié par une simple affectation ; les requêtes ne
+    lisent que l'index publié.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._index = EMPTY_INDEX
+        self._signature = None
+        self._run = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        return self._index
+
+    def load(self):
+        """Charge la source si elle existe ; renvoie l'index publié"""
+        self.refresh()
+        return self._index
+
+    def refresh(self):
+        """Reconstruit l'index si la source a changé ; renvoie True si un nouvel index est publié"""
+        try:
+            with self._lock:
+                signature = self._source_signature()
+                if signature is None or signature == self._signature:
+                    return False
+                self._signature = signature
+
+                started = time.perf_counter()
+                if self.source.endswith('.txt'):
+                    books, run = _read_text(self.source), None
+                else:
+                    # Un passage en cours n'est publié qu'une fois terminé
+                    conn = sqlite3.connect(f'file:{self.source}?mode=ro', uri=True)
+                    try:
+                        run = _last_run(conn)
+                    finally:
+                        conn.close()
+                    if run is None or run == self._run:
+                        return False
+                    books, run = _read_database(self.source)
+
+                index = CatalogueIndex(books, version=run or signature[0])
+                self._run = run
+                if self._index is not EMPTY_INDEX:
+                    self.reloads += 1
+                self._index = index
+            logging.info(
+                f"📚 Catalogue chargé : {len(index)} livres, {index.stats()['categories']} catégories "
+                f"({(time.perf_counter() - started) * 1000:.0f} ms)"
+            )
+            return True
+        except Exception as e:
+            self.failed_reloads += 1
+            logging.error(f"❌ Chargement du catalogue impossible : {str(e)}")
+            return False
+
+    def stats(self):
+        return {
+            'source': self.source,
+            **self._index.stats(),
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads
+        }
+
+    def start(self, interval):
+        """Surveille la source toutes les `interval` secondes dans un thread"""
+        if interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run_watcher, args=(interval,), name='catalogue-reloader', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run_watcher(self, interval):
+        while not self._stop.wait(interval):
+            self.refresh()
+
+    def _source_signature(self):
+        """Taille et date du fichier (et de son journal WAL) ; None s'il n'existe pas"""
+        signature = []
+        for path in (self.source, self.source + '-wal'):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if path == self.source:
+                    return None
+                continue
+            signature += [stat.st_mtime_ns, stat.st_size]
+        return tuple(signature)
@@ -0,0 +1,46 @@
+"""Mots courants de l'anglais et du français, jamais corrigés par le repli orthographique.
+
+Le vocabulaire des motifs est trop petit pour savoir si un mot est mal
+orthographié : « went » ou « sent » sont à une lettre de « rent ». Un jeton
+présent dans ces listes est considéré comme un vrai mot et laissé tel quel.
+"""
+
+ENGLISH = frozenset('''
+a about above after again against all almost also always am an and another any anyone anything are
+around as ask asked at away back bad be became because become been before being below best better
+between big both bring brought but buy by call came can cannot case cast cat catch caught change
+child children city close come comes coming could day days did different do does doing done door down
+during each early easy eat else end enough even evening ever every everyone everything eye face fact
+fall far fast feel felt few find fine first five for found four free friend from full gave get gets
+getting give given go goes going gone good got great group had hand hard has have having he head hear
+heard help her here him his hold home hope house how however i if in into is it its itself just keep
+kept kind knew know known last late later least leave left less let life like line little live long
+look looking lost lot made make makes making man many may maybe me mean meant men might mind more
+morning most much must my name near need needed never new next nice night no none not nothing now
+number of off often old on once one only open or other our out over own part people place play please
+point put quite rather read real really right said same saw say says second see seem seen sent set
+she should show side since small so some someone something sometimes soon sort start still stop such
+sure take taken tell than thank thanks that the their them then there these they thing things think
+this those though thought three through time to today together told tomorrow too took two under
+until up upon us use used very wait want wanted was way we week well went were what when where which
+while who whole why will with within without word work world would year yes yesterday yet you young
+your
+'''.split())
+
+FRENCH = frozenset('''
+à afin ai aie ainsi alors après as assez au aucun aujourd aussi autre autres aux avait avant avec
+avez avoir avons bas beaucoup bien bon bonne c ça car ce cela celle celui ces cet cette chaque chez
+ci comme comment dans de depuis des deux dire dit doit donc dont du elle elles en encore entre es est
+et été être eu fait faire fais faut fois font gens grand ici il ils j je jour jours juste l la là le
+les leur leurs lui m ma mais me même mes moi moins mon n ne ni nos notre nous on ont ou où par parce
+pas peu peut peux plus pour pourquoi pouvez pouvons prendre près puis qu quand que quel quelle quelque
+qui quoi rien s sa sans se sera ses si soir son sont sous sur t ta te tes toi ton tous tout toute
+toutes très trop tu un une veux vos votre voudrais vous vu y
+'''.split())
+
+COMMON_WORDS = {'en': ENGLISH, 'fr': FRENCH}
+
+
+def is_common_word(token):
+    """Indique si le jeton est un mot courant, quelle que soit la langue détectée"""
+    return any(token in words for words in COMMON_WORDS.values())
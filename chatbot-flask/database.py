@@ -1,44 +1,408 @@
+import base64
+import gzip
+import json
+import os
 import sqlite3
-from datetime import datetime
+import queue
+import re
+import shutil
+from contextlib import contextmanager
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 import logging
 
+import metrics
+from log_config import MESSAGE_LOGGER
+
 DATABASE_NAME = 'chatbot.db'
+MESSAGE_LOG = logging.getLogger(MESSAGE_LOGGER)
+
+# Pragmas appliqués à chaque nouvelle connexion (modifiables via configure_connections)
+CONNECTION_PRAGMAS = {
+    # Doit précéder journal_mode : n'a d'effet que sur une base encore vide
+    'auto_vacuum': 'INCREMENTAL',
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -16000,       # en Kio lorsque négatif (~16 Mo)
+    'mmap_size': 268435456,     # 256 Mo
+    'temp_store': 'MEMORY'
+}
+
+def utc_timestamp():
+    """Horodatage UTC au format de CURRENT_TIMESTAMP"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def normalize_question(text):
+    """Clé de regroupement des questions : minuscules, espaces réduits"""
+    return ' '.join((text or '').lower().split())
+
+class ConnectionManager:
+    """Gestionnaire de connexions SQLite réutilisées par thread
+
+    Chaque thread (worker gunicorn/waitress, écrivain en arrière-plan) garde
+    ses propres connexions ouvertes et configurées, une par fichier de base
+    (base principale et partitions), au lieu de payer l'ouverture et la
+    lecture du schéma à chaque appel.
+    """
+    
+    def __init__(self, pragmas=None):
+        self.pragmas = dict(CONNECTION_PRAGMAS if pragmas is None else pragmas)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+        # Génération par fichier, augmentée quand le fichier est supprimé
+        self._generations = {}
+        self.opened = 0
+        self.closed = 0
+    
+    def _open(self, database):
+        conn = sqlite3.connect(database, check_same_thread=False)
+        conn.create_function('normalize_question', 1, normalize_question, deterministic=True)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+    
+    def open_dedicated(self, database=None):
+        """Ouvre une connexion hors du cache par thread (lectures longues en flux)"""
+        return self._open(database or DATABASE_NAME)
+    
+    def get(self, database=None):
+        """Renvoie la connexion du thread courant à la base, ouverte au besoin"""
+        database = database or DATABASE_NAME
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        
+        generation = self._generations.get(database, 0)
+        cached = connections.get(database)
+        if cached is not None:
+            if cached[1] == generation:
+                return cached[0]
+            # Fichier supprimé depuis l'ouverture : ne pas continuer sur l'ancien
+            self.close(database)
+        
+        conn = self._open(database)
+        connections[database] = (conn, generation)
+        with self._lock:
+            self._prune()
+            self._connections[(threading.get_ident(), database)] = (threading.current_thread(), conn)
+            self.opened += 1
+        return conn
+    
+    @contextmanager
+    def connection(self, database=None):
+        """Fournit la connexion du thread et valide (ou annule) la transaction"""
+        conn = self.get(database)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    def _prune(self):
+        """Ferme les connexions des threads terminés (appelé sous verrou)"""
+        for key, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                del self._connections[key]
+                conn.close()
+                self.closed += 1
+    
+    def close(self, database=None):
+        """Ferme les connexions du thread courant (toutes, ou celle d'une base)"""
+        connections = getattr(self._local, 'connections', None) or {}
+        for path in [database] if database else list(connections):
+            cached = connections.pop(path, None)
+            if cached is None:
+                continue
+            conn = cached[0]
+            with self._lock:
+                self._connections.pop((threading.get_ident(), path), None)
+            conn.close()
+            self.closed += 1
+    
+    def retire(self, database):
+        """Invalide les connexions de tous les threads à un fichier avant sa suppression
+
+        La connexion du thread courant est fermée ; les autres threads
+        ferment la leur et rouvrent le fichier au prochain get().
+        """
+        with self._lock:
+            self._generations[database] = self._generations.get(database, 0) + 1
+        self.close(database)
+    
+    def close_all(self):
+        """Ferme toutes les connexions (arrêt ou changement de configuration)"""
+        with self._lock:
+            entries = list(self._connections.values())
+            self._connections.clear()
+        for _, conn in entries:
+            conn.close()
+            self.closed += 1
+        self._local = threading.local()
+    
+    def size(self):
+        """Nombre de connexions ouvertes"""
+        with self._lock:
+            self._prune()
+            return len(self._connections)
+    
+    def health(self):
+        """État du gestionnaire pour le réglage et la supervision"""
+        try:
+            conn = self.get()
+            conn.execute('SELECT 1').fetchone()
+            journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+            status = 'ok'
+        except Exception as e:
+            logging.error(f"❌ Base de données indisponible : {str(e)}")
+            metrics.db_error('health')
+            journal_mode = None
+            status = 'error'
+        
+        return {
+            'status': status,
+            'database': DATABASE_NAME,
+            'journal_mode': journal_mode,
+            'open_connections': self.size(),
+            'opened': self.opened,
+            'closed': self.closed,
+            'pragmas': dict(self.pragmas)
+        }
+
+CONNECTIONS = ConnectionManager()
+
+def get_connection(database=None):
+    """Connexion du thread courant avec gestion de transaction"""
+    return CONNECTIONS.connection(database)
+
+def configure_connections(**pragmas):
+    """Modifie les pragmas et rouvre les connexions avec la nouvelle configuration"""
+    CONNECTIONS.pragmas.update(pragmas)
+    CONNECTIONS.close_all()
+
+CONVERSATIONS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS conversations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_message TEXT NOT NULL,
+        bot_response TEXT NOT NULL,
+        language TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        session_id TEXT
+    )
+'''
+
+# Migrations versionnées : (version, description, étapes). Une étape est une
+# requête SQL ou une fonction recevant la connexion. La version courante est
+# conservée dans PRAGMA user_version.
+MIGRATIONS = [
+    (1, "Index sur l'horodatage, la session et la langue", [
+        'CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations (timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations (session_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_conversations_language ON conversations (language)',
+        'CREATE INDEX IF NOT EXISTS idx_conversations_question ON conversations (LOWER(user_message))'
+    ]),
+    (2, "Tables de statistiques maintenues à l'écriture", [
+        '''CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT NOT NULL,
+            language TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, language)
+        ) WITHOUT ROWID''',
+        '''CREATE TABLE IF NOT EXISTS language_stats (
+            language TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID''',
+        '''CREATE TABLE IF NOT EXISTS session_stats (
+            session_id TEXT PRIMARY KEY,
+            messages INTEGER NOT NULL DEFAULT 0,
+            first_seen DATETIME,
+            last_seen DATETIME
+        ) WITHOUT ROWID''',
+        '''CREATE TABLE IF NOT EXISTS question_stats (
+            question TEXT PRIMARY KEY,
+            sample TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_question_stats_count ON question_stats (count DESC)',
+        # Le regroupement des questions passe désormais par question_stats
+        'DROP INDEX IF EXISTS idx_conversations_question',
+        lambda conn: _rebuild_statistics(conn)
+    ]),
+    (3, "Index plein texte FTS5 des conversations", [
+        lambda conn: _create_fts_index(conn)
+    ]),
+    (4, "Index de pagination par langue", [
+        'CREATE INDEX IF NOT EXISTS idx_conversations_language_timestamp ON conversations (language, timestamp)',
+        # Le regroupement par langue passe désormais par language_stats
+        'DROP INDEX IF EXISTS idx_conversations_language'
+    ]),
+    (5, "Tables de la base de connaissances", [
+        '''CREATE TABLE IF NOT EXISTS knowledge_intents (
+            category TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            patterns TEXT NOT NULL,
+            responses TEXT NOT NULL
+        )''',
+        '''CREATE TABLE IF NOT EXISTS knowledge_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID'''
+    ])
+]
+
+# Taille de page maximale de l'historique
+MAX_PAGE_SIZE = 200
+
+def get_schema_version(conn):
+    """Renvoie la version du schéma appliquée à la base"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
 
+def apply_migrations(conn):
+    """Applique dans l'ordre les migrations qui ne l'ont pas encore été"""
+    current = get_schema_version(conn)
+    applied = []
+    
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        with conn:
+            # BEGIN explicite : sans lui, les requêtes DDL seraient validées une à une
+            conn.execute('BEGIN')
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f'PRAGMA user_version = {version}')
+        applied.append(version)
+        logging.info(f"🧱 Migration {version} appliquée : {description}")
+    
+    return applied
+
+def explain_query_plan(sql, params=()):
+    """Renvoie les étapes de EXPLAIN QUERY PLAN pour une requête"""
+    with get_connection() as conn:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    return [row[-1] for row in rows]
+
+# Partitionnement des conversations : None (une seule base) ou 'monthly'
+# (un fichier par mois, ex. chatbot-2026-10.db). Les tables de statistiques
+# restent dans la base principale.
+PARTITION_MODE = os.environ.get('CHATBOT_PARTITION_MODE') or None
+
+# Chaque partition réserve une plage d'ids : les ids restent uniques et
+# croissants d'une partition à l'autre (export et curseurs inchangés).
+PARTITION_ID_STRIDE = 10 ** 9
+
+PARTITION_SCHEMA = [
+    CONVERSATIONS_TABLE,
+    'CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations (timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations (session_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_conversations_language_timestamp ON conversations (language, timestamp)'
+]
+
+_initialized_partitions = set()
+_partition_lock = threading.Lock()
+
+def partitioning_enabled():
+    """Indique si les conversations sont réparties dans des fichiers mensuels"""
+    return PARTITION_MODE == 'monthly'
+
+def partition_key(timestamp):
+    """Clé de partition (AAAA-MM) d'un horodatage"""
+    return timestamp[:7]
+
+def partition_path(key):
+    """Chemin du fichier de la partition `key`, à côté de la base principale"""
+    base, extension = os.path.splitext(DATABASE_NAME)
+    return f'{base}-{key}{extension or ".db"}'
+
+def list_partitions():
+    """Renvoie [(clé, chemin)] des partitions existantes, de la plus ancienne à la plus récente"""
+    directory = os.path.dirname(os.path.abspath(DATABASE_NAME))
+    base, extension = os.path.splitext(os.path.basename(DATABASE_NAME))
+    pattern = re.compile(re.escape(base) + r'-(\d{4}-\d{2})' + re.escape(extension or '.db') + '$')
+    
+    partitions = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            # Même chemin que partition_path : une seule clé de connexion par fichier
+            partitions.append((match.group(1), partition_path(match.group(1))))
+    return sorted(partitions)
+
+def ensure_partition(key):
+    """Crée au besoin le fichier et le schéma de la partition, renvoie son chemin"""
+    path = partition_path(key)
+    if path in _initialized_partitions:
+        return path
+    
+    with _partition_lock:
+        if path not in _initialized_partitions:
+            year, month = (int(part) for part in key.split('-'))
+            with get_connection(path) as conn:
+                conn.execute('BEGIN')
+                for statement in PARTITION_SCHEMA:
+                    conn.execute(statement)
+                # Premier id de la partition : plage réservée au mois
+                conn.execute('''
+                    INSERT INTO sqlite_sequence (name, seq)
+                    SELECT 'conversations', ?
+                    WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'conversations')
+                ''', ((year * 12 + month - 1) * PARTITION_ID_STRIDE,))
+                if not has_fts_index(conn):
+                    _create_fts_index(conn)
+            _initialized_partitions.add(path)
+    return path
+
+def conversation_sources(since=None, until=None, newest_first=False):
+    """Fichiers contenant des conversations pour une plage de dates
+
+    Sans partitionnement, seule la base principale. Sinon les partitions
+    dont le mois recoupe [since, until), et la base principale, dont la
+    table conversations (données d'avant le partitionnement) est considérée
+    comme plus ancienne que toutes les partitions.
+    """
+    if not partitioning_enabled():
+        return [DATABASE_NAME]
+    
+    sources = [
+        path for key, path in list_partitions()
+        if (not since or key >= since[:7]) and (not until or key <= until[:7])
+    ]
+    sources.insert(0, DATABASE_NAME)
+    return sources[::-1] if newest_first else sources
+
+@metrics.db_operation
 def init_database():
     """Initialise la base de données avec les tables nécessaires"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        # Table pour les conversations
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_message TEXT NOT NULL,
-                bot_response TEXT NOT NULL,
-                language TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                session_id TEXT
-            )
-        ''')
-        
-        # Table pour les statistiques
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS statistics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                total_messages INTEGER DEFAULT 0,
-                total_sessions INTEGER DEFAULT 0,
-                last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Table pour les conversations
+            cursor.execute(CONVERSATIONS_TABLE)
+            
+            # Table pour les statistiques
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS statistics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    total_messages INTEGER DEFAULT 0,
+                    total_sessions INTEGER DEFAULT 0,
+                    last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Initialiser les stats si vide
+            cursor.execute('SELECT COUNT(*) FROM statistics')
+            if cursor.fetchone()[0] == 0:
+                cursor.execute('INSERT INTO statistics (total_messages, total_sessions) VALUES (0, 0)')
         
-        # Initialiser les stats si vide
-        cursor.execute('SELECT COUNT(*) FROM statistics')
-        if cursor.fetchone()[0] == 0:
-            cursor.execute('INSERT INTO statistics (total_messages, total_sessions) VALUES (0, 0)')
-        
-        conn.commit()
-        conn.close()
+        apply_migrations(CONNECTIONS.get())
         
         logging.info("✅ Base de données initialisée avec succès")
         
@@ -46,115 +410,596 @@ def init_database():
         logging.error(f"❌ Erreur lors de l'initialisation de la base de données : {str(e)}")
         raise
 
+@metrics.db_operation
 def save_conversation(user_message, bot_response, language='en', session_id=None):
     """Sauvegarde une conversation dans la base de données"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO conversations (user_message, bot_response, language, session_id)
-            VALUES (?, ?, ?, ?)
-        ''', (user_message, bot_response, language, session_id))
-        
-        # Mettre à jour les statistiques
-        cursor.execute('''
-            UPDATE statistics 
-            SET total_messages = total_messages + 1,
-                last_updated = CURRENT_TIMESTAMP
-            WHERE id = 1
-        ''')
-        
-        conn.commit()
-        conn.close()
+        save_conversations([(user_message, bot_response, language, session_id, None)])
         
-        logging.info(f"💾 Conversation sauvegardée : {user_message[:30]}...")
+        MESSAGE_LOG.info("💾 Conversation sauvegardée : %.30s...", user_message, extra={'session_id': session_id})
         
     except Exception as e:
         logging.error(f"❌ Erreur lors de la sauvegarde : {str(e)}")
 
-def get_conversation_history(limit=50):
-    """Récupère l'historique des conversations"""
+@metrics.db_operation
+def save_conversations(records):
+    """Sauvegarde un lot de conversations dans une seule transaction
+
+    Chaque enregistrement est un tuple (user_message, bot_response, language,
+    session_id, timestamp) ; un timestamp None prend l'heure courante. Les
+    tables de statistiques sont mises à jour dans la même transaction (avec
+    le partitionnement : une transaction par partition, puis les statistiques).
+    """
+    if not records:
+        return 0
+    
+    now = utc_timestamp()
+    records = [
+        record if record[4] else record[:4] + (now,)
+        for record in records
+    ]
+    
+    insert = '''
+        INSERT INTO conversations (user_message, bot_response, language, session_id, timestamp)
+        VALUES (?, ?, ?, ?, ?)
+    '''
+    
+    if not partitioning_enabled():
+        with get_connection() as conn:
+            conn.executemany(insert, records)
+            _record_statistics(conn, records)
+        return len(records)
+    
+    # Une transaction par partition touchée, puis les statistiques dans la base principale
+    by_partition = {}
+    for record in records:
+        by_partition.setdefault(partition_key(record[4]), []).append(record)
+    for key, partition_records in by_partition.items():
+        with get_connection(ensure_partition(key)) as conn:
+            conn.executemany(insert, partition_records)
+    with get_connection() as conn:
+        _record_statistics(conn, records)
+    
+    return len(records)
+
+def _summarize(records):
+    """Agrégats (jour, langue, question, session) d'un lot de conversations"""
+    by_day = Counter()
+    by_language = Counter()
+    questions = {}
+    sessions = {}
+    
+    for user_message, _, language, session_id, timestamp in records:
+        language = language or 'unknown'
+        by_day[(timestamp[:10], language)] += 1
+        by_language[language] += 1
+        
+        question = normalize_question(user_message)
+        sample, count = questions.get(question, (user_message, 0))
+        questions[question] = (sample, count + 1)
+        
+        if session_id:
+            messages, first_seen, last_seen = sessions.get(session_id, (0, timestamp, timestamp))
+            sessions[session_id] = (messages + 1, min(first_seen, timestamp), max(last_seen, timestamp))
+    
+    return by_day, by_language, questions, sessions
+
+def _record_statistics(conn, records):
+    """Incrémente les compteurs de résumé pour un lot de conversations"""
+    by_day, by_language, questions, sessions = _summarize(records)
+    
+    conn.executemany('''
+        INSERT INTO daily_stats (day, language, count) VALUES (?, ?, ?)
+        ON CONFLICT (day, language) DO UPDATE SET count = count + excluded.count
+    ''', [(day, language, count) for (day, language), count in by_day.items()])
+    
+    conn.executemany('''
+        INSERT INTO language_stats (language, count) VALUES (?, ?)
+        ON CONFLICT (language) DO UPDATE SET count = count + excluded.count
+    ''', list(by_language.items()))
+    
+    conn.executemany('''
+        INSERT INTO question_stats (question, sample, count) VALUES (?, ?, ?)
+        ON CONFLICT (question) DO UPDATE SET count = count + excluded.count
+    ''', [(question, sample, count) for question, (sample, count) in questions.items()])
+    
+    new_sessions = 0
+    for session_id, (messages, first_seen, last_seen) in sessions.items():
+        inserted = conn.execute('''
+            INSERT OR IGNORE INTO session_stats (session_id, messages, first_seen, last_seen)
+            VALUES (?, ?, ?, ?)
+        ''', (session_id, messages, first_seen, last_seen)).rowcount
+        if inserted:
+            new_sessions += 1
+        else:
+            conn.execute('''
+                UPDATE session_stats
+                SET messages = messages + ?,
+                    last_seen = MAX(last_seen, ?)
+                WHERE session_id = ?
+            ''', (messages, last_seen, session_id))
+    
+    conn.execute('''
+        UPDATE statistics 
+        SET total_messages = total_messages + ?,
+            total_sessions = total_sessions + ?,
+            last_updated = CURRENT_TIMESTAMP
+        WHERE id = 1
+    ''', (len(records), new_sessions))
+
+def _forget_statistics(conn, by_day, by_language, questions, sessions):
+    """Décrémente les compteurs de résumé pour des conversations supprimées
+
+    Les lignes retombées à zéro sont supprimées ; first_seen d'une session
+    encore présente n'est pas recalculé (voir rebuild_statistics).
+    """
+    conn.executemany(
+        'UPDATE daily_stats SET count = count - ? WHERE day = ? AND language = ?',
+        [(count, day, language) for (day, language), count in by_day.items()]
+    )
+    conn.executemany(
+        'DELETE FROM daily_stats WHERE day = ? AND language = ? AND count <= 0', list(by_day)
+    )
+    conn.executemany(
+        'UPDATE language_stats SET count = count - ? WHERE language = ?',
+        [(count, language) for language, count in by_language.items()]
+    )
+    conn.executemany(
+        'DELETE FROM language_stats WHERE language = ? AND count <= 0', [(language,) for language in by_language]
+    )
+    conn.executemany(
+        'UPDATE question_stats SET count = count - ? WHERE question = ?',
+        [(count, question) for question, (_, count) in questions.items()]
+    )
+    conn.executemany(
+        'DELETE FROM question_stats WHERE question = ? AND count <= 0', [(question,) for question in questions]
+    )
+    conn.executemany(
+        'UPDATE session_stats SET messages = messages - ? WHERE session_id = ?',
+        [(messages, session_id) for session_id, (messages, _, _) in sessions.items()]
+    )
+    removed_sessions = conn.executemany(
+        'DELETE FROM session_stats WHERE session_id = ? AND messages <= 0', [(session_id,) for session_id in sessions]
+    ).rowcount
+    
+    conn.execute('''
+        UPDATE statistics
+        SET total_messages = MAX(0, total_messages - ?),
+            total_sessions = MAX(0, total_sessions - ?),
+            last_updated = CURRENT_TIMESTAMP
+        WHERE id = 1
+    ''', (sum(by_language.values()), max(0, removed_sessions)))
+
+def _aggregate_conversations(conn, by_day, by_language, sessions, questions):
+    """Ajoute aux agrégats les conversations d'une base (principale ou partition)"""
+    for day, language, count in conn.execute('''
+        SELECT DATE(timestamp), COALESCE(language, 'unknown'), COUNT(*)
+        FROM conversations
+        GROUP BY 1, 2
+    '''):
+        by_day[(day, language)] += count
+        by_language[language] += count
+    
+    for session_id, messages, first_seen, last_seen in conn.execute('''
+        SELECT session_id, COUNT(*), MIN(timestamp), MAX(timestamp)
+        FROM conversations
+        WHERE session_id IS NOT NULL AND session_id != ''
+        GROUP BY session_id
+    '''):
+        known = sessions.get(session_id)
+        if known:
+            messages, first_seen, last_seen = (
+                known[0] + messages, min(known[1], first_seen), max(known[2], last_seen)
+            )
+        sessions[session_id] = (messages, first_seen, last_seen)
+    
+    for question, sample, count in conn.execute('''
+        SELECT normalize_question(user_message), MIN(user_message), COUNT(*)
+        FROM conversations
+        GROUP BY 1
+    '''):
+        known = questions.get(question)
+        if known:
+            sample, count = min(known[0], sample), known[1] + count
+        questions[question] = (sample, count)
+
+def _rebuild_statistics(conn):
+    """Recalcule les tables de résumé à partir des conversations brutes
+
+    Avec le partitionnement, les conversations de chaque partition sont
+    agrégées avec celles de la base principale ; les totaux combinés sont
+    écrits dans la transaction de `conn` (base principale).
+    """
+    by_day = Counter()
+    by_language = Counter()
+    sessions = {}
+    questions = {}
+    
+    _aggregate_conversations(conn, by_day, by_language, sessions, questions)
+    for source in conversation_sources():
+        if source != DATABASE_NAME:
+            with get_connection(source) as partition:
+                _aggregate_conversations(partition, by_day, by_language, sessions, questions)
+    
+    for table in ('daily_stats', 'language_stats', 'session_stats', 'question_stats'):
+        conn.execute(f'DELETE FROM {table}')
+    
+    conn.executemany(
+        'INSERT INTO daily_stats (day, language, count) VALUES (?, ?, ?)',
+        [(day, language, count) for (day, language), count in by_day.items()]
+    )
+    conn.executemany('INSERT INTO language_stats (language, count) VALUES (?, ?)', list(by_language.items()))
+    conn.executemany(
+        'INSERT INTO session_stats (session_id, messages, first_seen, last_seen) VALUES (?, ?, ?, ?)',
+        [(session_id,) + values for session_id, values in sessions.items()]
+    )
+    conn.executemany(
+        'INSERT INTO question_stats (question, sample, count) VALUES (?, ?, ?)',
+        [(question, sample, count) for question, (sample, count) in questions.items()]
+    )
+    conn.execute('''
+        UPDATE statistics
+        SET total_messages = ?,
+            total_sessions = ?,
+            last_updated = CURRENT_TIMESTAMP
+        WHERE id = 1
+    ''', (sum(by_language.values()), len(sessions)))
+
+@metrics.db_operation
+def rebuild_statistics():
+    """Recalcule les statistiques de résumé lorsqu'elles ont dérivé des données"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
+        with get_connection() as conn:
+            # Verrou d'écriture pris d'emblée : aucun lot n'est compté pendant le recalcul
+            conn.execute('BEGIN IMMEDIATE')
+            _rebuild_statistics(conn)
+            total = conn.execute('SELECT total_messages, total_sessions FROM statistics WHERE id = 1').fetchone()
         
-        cursor.execute('''
-            SELECT user_message, bot_response, language, timestamp
-            FROM conversations
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (limit,))
+        logging.info(f"📊 Statistiques recalculées : {total[0]} messages, {total[1]} sessions")
+        return {'total_messages': total[0], 'total_sessions': total[1]}
         
-        conversations = cursor.fetchall()
-        conn.close()
+    except Exception as e:
+        logging.error(f"❌ Erreur lors du recalcul des statistiques : {str(e)}")
+        raise
+
+_STOP = object()
+
+class ConversationWriter:
+    """Écrivain en arrière-plan qui regroupe les sauvegardes de conversations
+
+    Les requêtes déposent leurs enregistrements dans une file bornée ; un
+    thread les écrit par lots (taille ou délai atteint) avec save_conversations.
+    Quand la file est pleine, la politique 'block' attend jusqu'à put_timeout
+    secondes avant d'abandonner l'enregistrement, la politique 'drop'
+    l'abandonne immédiatement.
+    """
+    
+    def __init__(self, max_queue_size=10000, batch_size=200, flush_interval=0.5,
+                 policy='block', put_timeout=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._counter_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+    
+    def start(self):
+        """Démarre le thread d'écriture"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='conversation-writer', daemon=True)
+            self._thread.start()
+        return self
+    
+    def submit(self, user_message, bot_response, language='en', session_id=None):
+        """Met une conversation en file ; renvoie False si elle a été abandonnée"""
+        record = (user_message, bot_response, language, session_id, utc_timestamp())
+        try:
+            if self.policy == 'drop':
+                self._queue.put_nowait(record)
+            else:
+                self._queue.put(record, timeout=self.put_timeout)
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+            logging.warning(f"⚠️ File d'écriture pleine, conversation abandonnée : {user_message[:30]}...")
+            return False
         
-        return [
-            {
-                'user_message': conv[0],
-                'bot_response': conv[1],
-                'language': conv[2],
-                'timestamp': conv[3]
-            }
-            for conv in conversations
-        ]
+        with self._counter_lock:
+            self.enqueued += 1
+        return True
+    
+    def flush(self, timeout=None):
+        """Attend que tout ce qui a été mis en file soit écrit"""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def stop(self, timeout=10.0):
+        """Vide la file puis arrête le thread d'écriture"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        logging.info(f"💾 Écrivain arrêté ({self.written} conversations écrites, {self.dropped} abandonnées)")
+    
+    def stats(self):
+        """Compteurs de l'écrivain"""
+        return {
+            'queued': self._queue.qsize(),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches
+        }
+    
+    def _run(self):
+        batch = []
+        deadline = None
+        
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if isinstance(item, tuple):
+                batch.append(item)
+                if len(batch) == 1:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            
+            if batch:
+                self._write(batch)
+                batch = []
+            
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+    
+    def _write(self, batch):
+        try:
+            save_conversations(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logging.error(f"❌ Erreur lors de l'écriture d'un lot de {len(batch)} conversations : {str(e)}")
+
+def encode_cursor(timestamp, conversation_id):
+    """Curseur opaque pointant après la conversation donnée"""
+    raw = json.dumps([timestamp, conversation_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Décode un curseur ; lève ValueError s'il est invalide"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, conversation_id = json.loads(raw)
+        if not isinstance(timestamp, str) or not isinstance(conversation_id, int):
+            raise ValueError
+        return timestamp, conversation_id
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+def normalize_time_bound(value):
+    """Normalise une borne de date ISO au format des horodatages stockés"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r}")
+    if len(value) <= 10:
+        return parsed.strftime('%Y-%m-%d')
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+@metrics.db_operation
+def get_conversation_page(limit=50, cursor=None, session_id=None, language=None, since=None, until=None):
+    """Récupère une page de l'historique (voir _conversation_page)"""
+    return _conversation_page(limit, cursor, session_id, language, since, until)
+
+def _conversation_page(limit=50, cursor=None, session_id=None, language=None, since=None, until=None):
+    """Récupère une page de l'historique, des plus récentes aux plus anciennes
+
+    La pagination se fait par clé (timestamp, id) : chaque page coûte le même
+    prix quelle que soit sa profondeur. `since` est inclusif, `until`
+    exclusif. Renvoie {'items': [...], 'next_cursor': curseur ou None} ;
+    lève ValueError pour un curseur ou une date invalide.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    conditions = []
+    params = []
+    
+    if session_id:
+        conditions.append('session_id = ?')
+        params.append(session_id)
+    if language:
+        conditions.append('language = ?')
+        params.append(language)
+    since = normalize_time_bound(since)
+    if since:
+        conditions.append('timestamp >= ?')
+        params.append(since)
+    until = normalize_time_bound(until)
+    if until:
+        conditions.append('timestamp < ?')
+        params.append(until)
+    upper_bound = until
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor)
+        conditions.append('(timestamp, id) < (?, ?)')
+        params.extend((cursor_timestamp, cursor_id))
+        upper_bound = min(upper_bound or cursor_timestamp, cursor_timestamp)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f'''
+        SELECT id, user_message, bot_response, language, timestamp, session_id
+        FROM conversations
+        {where}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    '''
+    
+    try:
+        # Des partitions les plus récentes aux plus anciennes, jusqu'à remplir la page
+        rows = []
+        for source in conversation_sources(since, upper_bound, newest_first=True):
+            with get_connection(source) as conn:
+                rows.extend(conn.execute(query, params + [limit + 1 - len(rows)]).fetchall())
+            if len(rows) > limit:
+                break
         
     except Exception as e:
         logging.error(f"❌ Erreur lors de la récupération de l'historique : {str(e)}")
-        return []
+        metrics.db_error('get_conversation_page')
+        return {'items': [], 'next_cursor': None}
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return {
+        'items': [
+            {
+                'id': row[0],
+                'user_message': row[1],
+                'bot_response': row[2],
+                'language': row[3],
+                'timestamp': row[4],
+                'session_id': row[5]
+            }
+            for row in rows
+        ],
+        'next_cursor': encode_cursor(rows[-1][4], rows[-1][0]) if has_more else None
+    }
+
+def iter_conversations(since=None, until=None, session_id=None, after_id=None, chunk_size=1000):
+    """Parcourt les conversations par ordre d'id, par blocs de chunk_size
+
+    Renvoie un générateur de listes de dictionnaires : seul un bloc est en
+    mémoire à la fois. Une connexion dédiée est utilisée pour que la lecture
+    puisse s'étaler sur toute la durée d'une réponse en flux. after_id permet
+    de reprendre un export interrompu. Les filtres sont validés immédiatement
+    (ValueError), avant le premier bloc.
+    """
+    conditions = []
+    params = []
+    
+    since = normalize_time_bound(since)
+    if since:
+        conditions.append('timestamp >= ?')
+        params.append(since)
+    until = normalize_time_bound(until)
+    if until:
+        conditions.append('timestamp < ?')
+        params.append(until)
+    if session_id:
+        conditions.append('session_id = ?')
+        params.append(session_id)
+    if after_id is not None:
+        conditions.append('id > ?')
+        params.append(int(after_id))
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f'''
+        SELECT id, user_message, bot_response, language, timestamp, session_id
+        FROM conversations
+        {where}
+        ORDER BY id
+    '''
+    
+    sources = conversation_sources(since, until)
+    
+    def chunks():
+        # Partitions dans l'ordre chronologique : les ids y sont croissants
+        for source in sources:
+            conn = CONNECTIONS.open_dedicated(source)
+            try:
+                cursor = conn.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [
+                        {
+                            'id': row[0],
+                            'user_message': row[1],
+                            'bot_response': row[2],
+                            'language': row[3],
+                            'timestamp': row[4],
+                            'session_id': row[5]
+                        }
+                        for row in rows
+                    ]
+            finally:
+                conn.close()
+    
+    return chunks()
 
+@metrics.db_operation
+def get_conversation_history(limit=50, **filters):
+    """Récupère l'historique des conversations (voir get_conversation_page pour les filtres)"""
+    # Page lue sans repasser par la mesure de get_conversation_page
+    return _conversation_page(limit, **filters)['items']
+
+@metrics.db_operation
 def get_statistics():
-    """Récupère les statistiques d'utilisation"""
+    """Récupère les statistiques d'utilisation depuis les tables de résumé"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        # Stats générales
-        cursor.execute('SELECT total_messages, last_updated FROM statistics WHERE id = 1')
-        stats = cursor.fetchone()
-        
-        # Messages par langue
-        cursor.execute('''
-            SELECT language, COUNT(*) as count
-            FROM conversations
-            GROUP BY language
-        ''')
-        messages_by_language = dict(cursor.fetchall())
-        
-        # Messages aujourd'hui
-        cursor.execute('''
-            SELECT COUNT(*)
-            FROM conversations
-            WHERE DATE(timestamp) = DATE('now')
-        ''')
-        messages_today = cursor.fetchone()[0]
-        
-        # Messages cette semaine
-        cursor.execute('''
-            SELECT COUNT(*)
-            FROM conversations
-            WHERE DATE(timestamp) >= DATE('now', '-7 days')
-        ''')
-        messages_this_week = cursor.fetchone()[0]
-        
-        # Top 5 des questions (mots-clés)
-        cursor.execute('''
-            SELECT user_message, COUNT(*) as count
-            FROM conversations
-            GROUP BY LOWER(user_message)
-            ORDER BY count DESC
-            LIMIT 5
-        ''')
-        top_questions = [
-            {'question': q[0], 'count': q[1]}
-            for q in cursor.fetchall()
-        ]
-        
-        conn.close()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Stats générales
+            cursor.execute('SELECT total_messages, total_sessions, last_updated FROM statistics WHERE id = 1')
+            stats = cursor.fetchone()
+            
+            # Messages par langue
+            cursor.execute('SELECT language, count FROM language_stats')
+            messages_by_language = dict(cursor.fetchall())
+            
+            # Messages aujourd'hui
+            cursor.execute('''
+                SELECT COALESCE(SUM(count), 0)
+                FROM daily_stats
+                WHERE day = DATE('now')
+            ''')
+            messages_today = cursor.fetchone()[0]
+            
+            # Messages cette semaine
+            cursor.execute('''
+                SELECT COALESCE(SUM(count), 0)
+                FROM daily_stats
+                WHERE day >= DATE('now', '-7 days')
+            ''')
+            messages_this_week = cursor.fetchone()[0]
+            
+            # Top 5 des questions (mots-clés)
+            cursor.execute('''
+                SELECT sample, count
+                FROM question_stats
+                ORDER BY count DESC
+                LIMIT 5
+            ''')
+            top_questions = [
+                {'question': q[0], 'count': q[1]}
+                for q in cursor.fetchall()
+            ]
         
         return {
             'total_messages': stats[0] if stats else 0,
-            'last_updated': stats[1] if stats else None,
+            'total_sessions': stats[1] if stats else 0,
+            'last_updated': stats[2] if stats else None,
             'messages_by_language': messages_by_language,
             'messages_today': messages_today,
             'messages_this_week': messages_this_week,
@@ -163,28 +1008,130 @@ def get_statistics():
         
     except Exception as e:
         logging.error(f"❌ Erreur lors de la récupération des statistiques : {str(e)}")
+        metrics.db_error('get_statistics')
         return {
             'total_messages': 0,
+            'total_sessions': 0,
             'messages_by_language': {},
             'messages_today': 0,
             'messages_this_week': 0,
             'top_questions': []
         }
 
-def clear_old_conversations(days=30):
-    """Supprime les conversations plus anciennes que X jours"""
+def retention_cutoff(days):
+    """Date (UTC) avant laquelle les conversations sont expirées"""
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d')
+
+@metrics.db_operation
+def delete_conversations_before(cutoff, batch_size=500, archive=None, database=None):
+    """Supprime au plus batch_size conversations antérieures à cutoff
+
+    Chaque lot est une transaction courte pour ne pas bloquer les écrivains.
+    Si `archive` est fourni, il reçoit les lignes du lot avant leur
+    suppression. `database` désigne une partition (base principale par
+    défaut). Les statistiques de résumé sont décrémentées dans la
+    transaction du lot, ou juste après pour une partition. Renvoie le
+    nombre de lignes supprimées.
+    """
+    with get_connection(database) as conn:
+        rows = conn.execute('''
+            SELECT id, user_message, bot_response, language, timestamp, session_id
+            FROM conversations
+            WHERE timestamp < ?
+            ORDER BY timestamp
+            LIMIT ?
+        ''', (cutoff, batch_size)).fetchall()
+        
+        if not rows:
+            return 0
+        
+        if archive:
+            archive([
+                {
+                    'id': row[0],
+                    'user_message': row[1],
+                    'bot_response': row[2],
+                    'language': row[3],
+                    'timestamp': row[4],
+                    'session_id': row[5]
+                }
+                for row in rows
+            ])
+        
+        conn.executemany('DELETE FROM conversations WHERE id = ?', [(row[0],) for row in rows])
+        
+        # Base principale : statistiques décrémentées dans la transaction du lot
+        summary = _summarize([(row[1], row[2], row[3], row[5], row[4]) for row in rows])
+        if not database or database == DATABASE_NAME:
+            _forget_statistics(conn, *summary)
+    
+    # Partition : puis dans la base principale, comme pour save_conversations
+    if database and database != DATABASE_NAME:
+        with get_connection() as conn:
+            _forget_statistics(conn, *summary)
+    
+    return len(rows)
+
+@metrics.db_operation
+def drop_partitions_before(cutoff, archive_dir=None):
+    """Supprime en bloc les fichiers de partition entièrement antérieurs à cutoff
+
+    Avec archive_dir, chaque fichier est d'abord copié compressé (gzip).
+    Ses agrégats sont retirés des statistiques de résumé. Renvoie la liste des partitions supprimées avec leur nombre de lignes.
+    """
+    dropped = []
+    for key, path in list_partitions():
+        if key >= cutoff[:7]:
+            break
+        
+        conn = CONNECTIONS.get(path)
+        rows = conn.execute('SELECT COUNT(*) FROM conversations').fetchone()[0]
+        by_day, by_language, sessions, questions = Counter(), Counter(), {}, {}
+        _aggregate_conversations(conn, by_day, by_language, sessions, questions)
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+        CONNECTIONS.retire(path)
+        
+        archive = None
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+            archive = os.path.join(archive_dir, os.path.basename(path) + '.gz')
+            with open(path, 'rb') as source, gzip.open(archive, 'wb') as target:
+                shutil.copyfileobj(source, target)
+        
+        # Les autres threads voient la nouvelle génération et n'utilisent plus
+        # leur connexion à l'ancien fichier (retire ci-dessus).
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        _initialized_partitions.discard(path)
+        with get_connection() as main:
+            _forget_statistics(main, by_day, by_language, questions, sessions)
+        
+        dropped.append({'partition': key, 'rows': rows, 'archive': archive})
+        logging.info(f"🗑️ Partition {key} supprimée ({rows} conversations)")
+    
+    return dropped
+
+@metrics.db_operation
+def clear_old_conversations(days=30, batch_size=500):
+    """Supprime les conversations plus anciennes que X jours, par petits lots
+
+    Avec le partitionnement, les mois entièrement expirés sont supprimés
+    fichier par fichier ; seul le mois de la date limite est purgé par lots.
+    """
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
+        cutoff = retention_cutoff(days)
+        deleted_count = 0
         
-        cursor.execute('''
-            DELETE FROM conversations
-            WHERE DATE(timestamp) < DATE('now', '-' || ? || ' days')
-        ''', (days,))
+        if partitioning_enabled():
+            deleted_count += sum(p['rows'] for p in drop_partitions_before(cutoff))
         
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        for source in conversation_sources(until=cutoff):
+            while True:
+                deleted = delete_conversations_before(cutoff, batch_size, database=source)
+                deleted_count += deleted
+                if deleted < batch_size:
+                    break
         
         logging.info(f"🗑️ {deleted_count} anciennes conversations supprimées")
         return deleted_count
@@ -193,32 +1140,303 @@ def clear_old_conversations(days=30):
         logging.error(f"❌ Erreur lors de la suppression : {str(e)}")
         return 0
 
-def search_conversations(keyword, limit=20):
-    """Recherche dans les conversations"""
+def database_size():
+    """Taille sur disque de la base, de ses partitions et de leurs journaux WAL, en octets"""
+    paths = [DATABASE_NAME] + [path for _, path in list_partitions()]
+    return sum(
+        os.path.getsize(path + suffix)
+        for path in paths
+        for suffix in ('', '-wal')
+        if os.path.exists(path + suffix)
+    )
+
+@metrics.db_operation
+def compact_database(max_pages=None, full_vacuum=False, database=None):
+    """Récupère l'espace libéré : vacuum incrémental puis checkpoint du WAL
+
+    Une base créée avant l'activation de auto_vacuum=INCREMENTAL ne peut
+    être convertie que par un VACUUM complet (bloquant), fait seulement si
+    full_vacuum est vrai.
+    """
+    conn = CONNECTIONS.get(database)
+    auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    
+    if auto_vacuum == 2:
+        pages = '' if max_pages is None else f'({int(max_pages)})'
+        conn.execute(f'PRAGMA incremental_vacuum{pages}').fetchall()
+    elif full_vacuum:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        auto_vacuum = 2
+    else:
+        logging.warning("⚠️ auto_vacuum inactif : espace non récupéré (VACUUM complet requis une fois)")
+    
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+    return auto_vacuum == 2
+
+@metrics.db_operation
+def split_into_partitions(chunk_size=5000):
+    """Déplace les conversations de la base principale vers les partitions mensuelles
+
+    Les lignes sont copiées par blocs en conservant leurs ids, puis la table
+    de la base principale est vidée une fois toutes les partitions validées.
+    Les statistiques, déjà globales, ne changent pas. Renvoie {mois: lignes}.
+    """
+    moved = Counter()
+    source = CONNECTIONS.open_dedicated()
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT user_message, bot_response, timestamp
+        cursor = source.execute('''
+            SELECT id, user_message, bot_response, language, timestamp, session_id
             FROM conversations
-            WHERE user_message LIKE ? OR bot_response LIKE ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (f'%{keyword}%', f'%{keyword}%', limit))
+            ORDER BY id
+        ''')
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            by_partition = {}
+            for row in rows:
+                by_partition.setdefault(partition_key(row[4]), []).append(row)
+            for key, partition_rows in by_partition.items():
+                with get_connection(ensure_partition(key)) as conn:
+                    conn.executemany('''
+                        INSERT OR IGNORE INTO conversations
+                            (id, user_message, bot_response, language, timestamp, session_id)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', partition_rows)
+                moved[key] += len(partition_rows)
+    finally:
+        source.close()
+    
+    with get_connection() as conn:
+        conn.execute('DELETE FROM conversations')
+    
+    logging.info(f"📦 {sum(moved.values())} conversations réparties dans {len(moved)} partitions")
+    return dict(moved)
+
+@metrics.db_operation
+def load_knowledge_document():
+    """Relit la base de connaissances stockée en base, ou None si elle est vide
+
+    Les intentions sont renvoyées dans l'ordre de `position` (priorité du
+    matcher) ; lexicons, default_responses, default_language et vocabularies
+    viennent de knowledge_settings (valeurs JSON).
+    """
+    with get_connection() as conn:
+        intents = conn.execute('''
+            SELECT category, patterns, responses
+            FROM knowledge_intents
+            ORDER BY position, category
+        ''').fetchall()
+        settings = dict(conn.execute('SELECT key, value FROM knowledge_settings').fetchall())
+    
+    if not intents:
+        return None
+    
+    document = {key: json.loads(value) for key, value in settings.items()}
+    document['intents'] = {
+        category: {'patterns': json.loads(patterns), 'responses': json.loads(responses)}
+        for category, patterns, responses in intents
+    }
+    return document
+
+@metrics.db_operation
+def save_knowledge_document(document):
+    """Remplace la base de connaissances stockée, en une transaction"""
+    with get_connection() as conn:
+        conn.execute('DELETE FROM knowledge_intents')
+        conn.execute('DELETE FROM knowledge_settings')
+        conn.executemany(
+            'INSERT INTO knowledge_intents (category, position, patterns, responses) VALUES (?, ?, ?, ?)',
+            [
+                (category, position, json.dumps(intent['patterns'], ensure_ascii=False),
+                 json.dumps(intent['responses'], ensure_ascii=False))
+                for position, (category, intent) in enumerate(document['intents'].items())
+            ]
+        )
+        conn.executemany(
+            'INSERT INTO knowledge_settings (key, value) VALUES (?, ?)',
+            [
+                (key, json.dumps(document[key], ensure_ascii=False))
+                for key in ('default_language', 'lexicons', 'default_responses', 'vocabularies')
+                if key in document
+            ]
+        )
+    
+    logging.info(f"📚 Base de connaissances enregistrée ({len(document['intents'])} intentions)")
+    return len(document['intents'])
+
+def fts5_supported(conn):
+    """Indique si la version de SQLite fournit le module FTS5"""
+    try:
+        conn.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(content)')
+        conn.execute('DROP TABLE temp.fts5_probe')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def has_fts_index(conn):
+    """Indique si la table conversations_fts existe dans la base"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'conversations_fts'"
+    ).fetchone()
+    return row is not None
+
+def _create_fts_index(conn):
+    """Crée l'index FTS5 (contenu externe) et ses déclencheurs de synchronisation"""
+    if not fts5_supported(conn):
+        logging.warning("⚠️ FTS5 indisponible : la recherche utilisera LIKE")
+        return False
+    
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+            user_message,
+            bot_response,
+            content='conversations',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+            INSERT INTO conversations_fts (rowid, user_message, bot_response)
+            VALUES (new.id, new.user_message, new.bot_response);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+            INSERT INTO conversations_fts (conversations_fts, rowid, user_message, bot_response)
+            VALUES ('delete', old.id, old.user_message, old.bot_response);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE ON conversations BEGIN
+            INSERT INTO conversations_fts (conversations_fts, rowid, user_message, bot_response)
+            VALUES ('delete', old.id, old.user_message, old.bot_response);
+            INSERT INTO conversations_fts (rowid, user_message, bot_response)
+            VALUES (new.id, new.user_message, new.bot_response);
+        END
+    ''')
+    conn.execute("INSERT INTO conversations_fts (conversations_fts) VALUES ('rebuild')")
+    return True
+
+@metrics.db_operation
+def backfill_fts():
+    """Crée l'index plein texte si besoin et le reconstruit depuis les conversations
+
+    Avec le partitionnement, l'index de chaque partition est reconstruit
+    (une transaction par fichier). Renvoie le nombre de conversations
+    indexées, ou None si FTS5 est indisponible.
+    """
+    try:
+        indexed = 0
+        for source in conversation_sources():
+            with get_connection(source) as conn:
+                conn.execute('BEGIN')
+                if not _create_fts_index(conn):
+                    return None
+                indexed += conn.execute('SELECT COUNT(*) FROM conversations').fetchone()[0]
         
-        results = cursor.fetchall()
-        conn.close()
+        logging.info(f"🔎 Index plein texte reconstruit ({indexed} conversations)")
+        return indexed
         
-        return [
-            {
-                'user_message': r[0],
-                'bot_response': r[1],
-                'timestamp': r[2]
-            }
-            for r in results
-        ]
+    except Exception as e:
+        logging.error(f"❌ Erreur lors de la reconstruction de l'index plein texte : {str(e)}")
+        metrics.db_error('backfill_fts')
+        raise
+
+def _search_fts(conn, query, limit, by_date=False):
+    """Recherche MATCH classée par bm25 (ou par date) avec extraits surlignés"""
+    cursor = conn.execute(f'''
+        SELECT c.user_message, c.bot_response, c.timestamp,
+               snippet(conversations_fts, -1, '<mark>', '</mark>', '…', 12),
+               bm25(conversations_fts) AS rank
+        FROM conversations_fts
+        JOIN conversations c ON c.id = conversations_fts.rowid
+        WHERE conversations_fts MATCH ?
+        ORDER BY {'c.timestamp DESC' if by_date else 'rank'}
+        LIMIT ?
+    ''', (query, limit))
+    
+    return [
+        {
+            'user_message': r[0],
+            'bot_response': r[1],
+            'timestamp': r[2],
+            'snippet': r[3],
+            'score': round(-r[4], 4)
+        }
+        for r in cursor.fetchall()
+    ]
+
+def build_fts_query(keyword):
+    """Traduit la saisie utilisateur en requête MATCH FTS5
+
+    Les expressions entre guillemets deviennent des phrases, un mot terminé
+    par * une recherche par préfixe ; les autres mots sont combinés en ET.
+    La syntaxe FTS5 brute n'est jamais transmise telle quelle.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', keyword):
+        if phrase.strip():
+            terms.append('"' + phrase.strip().replace('"', '""') + '"')
+            continue
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '')
+        if word:
+            terms.append('"' + word + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+def _search_source(conn, keyword, query, limit, by_date=False):
+    """Recherche dans une base : FTS5 si l'index existe, LIKE sinon"""
+    if query and has_fts_index(conn):
+        try:
+            return _search_fts(conn, query, limit, by_date)
+        except sqlite3.OperationalError as e:
+            logging.warning(f"⚠️ Requête plein texte invalide ({str(e)}), repli sur LIKE")
+    
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT user_message, bot_response, timestamp
+        FROM conversations
+        WHERE user_message LIKE ? OR bot_response LIKE ?
+        ORDER BY timestamp DESC
+        LIMIT ?
+    ''', (f'%{keyword}%', f'%{keyword}%', limit))
+    
+    return [
+        {
+            'user_message': r[0],
+            'bot_response': r[1],
+            'timestamp': r[2]
+        }
+        for r in cursor.fetchall()
+    ]
+
+@metrics.db_operation
+def search_conversations(keyword, limit=20):
+    """Recherche dans les conversations (FTS5 classé par bm25, LIKE sinon)
+
+    Avec le partitionnement, les scores bm25 de deux partitions ne sont pas
+    comparables (statistiques de fréquence propres à chaque index) : chaque
+    partition renvoie ses résultats les plus récents, fusionnés par date, et
+    le score n'indique plus que la pertinence au sein de sa partition.
+    """
+    try:
+        query = build_fts_query(keyword)
+        sources = conversation_sources()
+        if len(sources) == 1:
+            with get_connection(sources[0]) as conn:
+                return _search_source(conn, keyword, query, limit)
+        
+        results = []
+        for source in sources:
+            with get_connection(source) as conn:
+                results.extend(_search_source(conn, keyword, query, limit, by_date=True))
+        return sorted(results, key=lambda r: r['timestamp'], reverse=True)[:limit]
         
     except Exception as e:
         logging.error(f"❌ Erreur lors de la recherche : {str(e)}")
-        return []
\ No newline at end of file
+        metrics.db_error('search_conversations')
+        return []
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import zlib
+
+from database import iter_conversations
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+CSV_COLUMNS = ['id', 'timestamp', 'session_id', 'language', 'user_message', 'bot_response']
+
+
+def ndjson_chunks(chunks):
+    """Une ligne JSON par conversation, un bloc de texte par lot lu"""
+    for rows in chunks:
+        yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+
+
+def csv_chunks(chunks):
+    """CSV avec en-tête, un bloc de texte par lot lu"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    # En-tête seul si aucun lot n'a été lu
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compresse un flux d'octets au format gzip au fil de l'eau"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def parse_export_cursor(cursor):
+    """Id de la dernière conversation reçue, pour reprendre un export ; lève ValueError s'il est invalide"""
+    if cursor is None or cursor == '':
+        return None
+    if not cursor.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return int(cursor)
+
+
+def stream_export(export_format='ndjson', compress=False, chunk_size=1000, **filters):
+    """Générateur d'octets pour un export complet des conversations
+
+    Les filtres (since, until, session_id, after_id) sont ceux de
+    iter_conversations et sont validés avant le début du flux : la mémoire
+    utilisée ne dépend que de chunk_size, pas du nombre de lignes exportées.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format!r}")
+
+    chunks = iter_conversations(chunk_size=chunk_size, **filters)
+    encoded = ndjson_chunks(chunks) if export_format == 'ndjson' else csv_chunks(chunks)
+    return gzip_chunks(encoded) if compress else encoded
@@ -0,0 +1,291 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+
+from language import LanguageDetector
+from matcher import FuzzyIndex, PatternMatcher, TokenIndex, tokenize
+
+# Incrémenté quand la structure compilée change : les anciens instantanés sont ignorés
+SNAPSHOT_FORMAT = 2
+
+# Source 'db' : tables knowledge_intents / knowledge_settings de la base principale
+DATABASE_SOURCE = 'db'
+
+# Base de connaissances compilée ; jamais modifiée, remplacée en bloc au rechargement
+KnowledgeSnapshot = namedtuple('KnowledgeSnapshot', [
+    'version', 'source', 'compiled_at', 'default_language', 'lexicons', 'intents',
+    'default_responses', 'matcher', 'token_index', 'detector', 'fuzzy'
+])
+
+
+def load_document(source):
+    """Lit le document de la base de connaissances (JSON, YAML ou base de données)
+
+    Format : {'default_language', 'lexicons', 'default_responses',
+    'intents': {catégorie: {'patterns': [...], 'responses': {langue: texte}}}}.
+    L'ordre des intentions est l'ordre de priorité du matcher. Une clé
+    optionnelle 'vocabularies' ({langue: [mots]}) complète le vocabulaire de
+    la correction orthographique.
+    """
+    if source == DATABASE_SOURCE:
+        import database
+        document = database.load_knowledge_document()
+        if document is None:
+            raise ValueError("The knowledge base tables are empty (run manage.py kb-import)")
+        return validate_document(document)
+
+    extension = os.path.splitext(source)[1].lower()
+    with open(source, encoding='utf-8') as handle:
+        if extension in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required to load a YAML knowledge base (pip install pyyaml)")
+            document = yaml.safe_load(handle)
+        else:
+            document = json.load(handle)
+    return validate_document(document)
+
+
+def validate_document(document):
+    """Vérifie la structure du document ; lève ValueError s'il est invalide"""
+    if not isinstance(document, dict) or not isinstance(document.get('intents'), dict):
+        raise ValueError("The knowledge base must define an 'intents' mapping")
+
+    default_language = document.setdefault('default_language', 'en')
+    document.setdefault('lexicons', {})
+    vocabularies = document.get('vocabularies', {})
+    if not isinstance(vocabularies, dict) or not all(isinstance(words, list) for words in vocabularies.values()):
+        raise ValueError("'vocabularies' must map each language to a list of words")
+    default_responses = document.get('default_responses') or {}
+    if default_language not in default_responses:
+        raise ValueError(f"Missing default response for {default_language!r}")
+
+    for category, intent in document['intents'].items():
+        if not isinstance(intent, dict) or not isinstance(intent.get('patterns'), list):
+            raise ValueError(f"Intent {category!r} must define a list of patterns")
+        if default_language not in (intent.get('responses') or {}):
+            raise ValueError(f"Intent {category!r} has no {default_language!r} response")
+    return document
+
+
+def document_version(document):
+    """Empreinte du contenu : identique tant que la base ne change pas"""
+    canonical = json.dumps([SNAPSHOT_FORMAT, document], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def build_vocabularies(document, detector):
+    """Vocabulaire des motifs par langue, pour la correction orthographique
+
+    Chaque motif est rangé dans la langue détectée sur son propre texte (la
+    langue par défaut si aucun mot de lexique n'y figure).
+    """
+    vocabularies = {}
+    for intent in document['intents'].values():
+        for pattern in intent['patterns']:
+            detection = detector.detect(pattern.lower())
+            vocabularies.setdefault(detection.language, []).extend(detection.tokens)
+    for language, words in document.get('vocabularies', {}).items():
+        vocabularies.setdefault(language, []).extend(
+            token for word in words for token in tokenize(word.lower())
+        )
+    return vocabularies
+
+
+def compile_knowledge(document, source=None, version=None, fuzzy_distance=2):
+    """Construit toutes les structures de correspondance d'un document validé
+
+    fuzzy_distance = 0 ne construit pas les index de correction orthographique.
+    """
+    intents = {
+        category: {'patterns': list(intent['patterns']), 'responses': dict(intent['responses'])}
+        for category, intent in document['intents'].items()
+    }
+    default_language = document['default_language']
+    detector = LanguageDetector(document['lexicons'], default_language)
+    fuzzy = {}
+    if fuzzy_distance > 0:
+        fuzzy = {
+            language: FuzzyIndex(words, fuzzy_distance)
+            for language, words in build_vocabularies(document, detector).items()
+        }
+    return KnowledgeSnapshot(
+        version=version or document_version(document),
+        source=source,
+        compiled_at=time.time(),
+        default_language=default_language,
+        lexicons={language: list(words) for language, words in document['lexicons'].items()},
+        intents=intents,
+        default_responses=dict(document['default_responses']),
+        matcher=PatternMatcher(intents),
+        token_index=TokenIndex(intents),
+        detector=detector,
+        fuzzy=fuzzy
+    )
+
+
+def save_snapshot(snapshot, path):
+    """Écrit l'instantané compilé (pickle), de façon atomique"""
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as handle:
+        pickle.dump((SNAPSHOT_FORMAT, snapshot), handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def load_snapshot(path, version):
+    """Relit un instantané compilé s'il correspond à `version`, sinon None
+
+    Le fichier est produit par save_snapshot : ne jamais pointer vers un
+    fichier d'origine inconnue (pickle exécute du code au chargement).
+    """
+    try:
+        with open(path, 'rb') as handle:
+            snapshot_format, snapshot = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"⚠️ Instantané de la base de connaissances illisible ({str(e)}), recompilation")
+        return None
+    if snapshot_format != SNAPSHOT_FORMAT or snapshot.version != version:
+        return None
+    return snapshot
+
+
+def fuzzy_distance(snapshot):
+    """Distance maximale avec laquelle les index de correction ont été construits"""
+    return max((index.max_distance for index in snapshot.fuzzy.values()), default=0)
+
+
+class KnowledgeStore:
+    """Base de connaissances courante, rechargée à chaud quand sa source change
+
+    Le nouvel instantané est entièrement compilé avant d'être publié par une
+    simple affectation : une requête lit current() une fois et garde le même
+    instantané jusqu'à sa réponse, même si un rechargement a lieu entre-temps.
+    """
+
+    def __init__(self, source, snapshot_path=None, on_swap=None, fuzzy_distance=2):
+        self.source = source
+        self.fuzzy_distance = fuzzy_distance
+        self.snapshot_path = snapshot_path
+        self.on_swap = on_swap
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._snapshot = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        """Instantané à utiliser pour toute la durée d'une requête"""
+        return self._snapshot
+
+    def load(self):
+        """Charge la source (ou l'instantané compilé à jour) et le publie"""
+        with self._lock:
+            signature = self._source_signature()
+            document = load_document(self.source)
+            version = document_version(document)
+            self._publish(self._build(document, version))
+            self._signature = signature
+        return self._snapshot
+
+    def swap(self, document, source=None):
+        """Publie une base fournie directement (tests, administration)"""
+        document = validate_document(document)
+        with self._lock:
+            self._publish(compile_knowledge(document, source or self.source, fuzzy_distance=self.fuzzy_distance))
+        return self._snapshot
+
+    def refresh(self):
+        """Recharge si la source a changé ; renvoie True si un nouvel instantané est publié
+
+        En cas d'erreur (fichier invalide, base indisponible), l'instantané
+        courant reste en service.
+        """
+        try:
+            with self._lock:
+                signature = self._source_signature()
+                if signature is not None and signature == self._signature:
+                    return False
+                # Un fichier invalide n'est réessayé qu'après sa prochaine modification
+                self._signature = signature
+                document = load_document(self.source)
+                version = document_version(document)
+                if self._snapshot is not None and version == self._snapshot.version:
+                    return False
+                self._publish(self._build(document, version))
+            return True
+        except Exception as e:
+            self.failed_reloads += 1
+            logging.error(f"❌ Rechargement de la base de connaissances impossible : {str(e)}")
+            return False
+
+    def stats(self):
+        """État exposé par /api/stats"""
+        snapshot = self._snapshot
+        return {
+            'source': self.source,
+            'version': snapshot.version if snapshot else None,
+            'intents': len(snapshot.intents) if snapshot else 0,
+            'patterns': len(snapshot.matcher) if snapshot else 0,
+            'fuzzy_vocabulary': {language: len(index) for language, index in snapshot.fuzzy.items()} if snapshot else {},
+            'compiled_at': snapshot.compiled_at if snapshot else None,
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads
+        }
+
+    def start(self, interval):
+        """Surveille la source toutes les `interval` secondes dans un thread"""
+        if interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name='knowledge-reloader', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self.refresh()
+
+    def _build(self, document, version):
+        if self.snapshot_path:
+            snapshot = load_snapshot(self.snapshot_path, version)
+            if snapshot is not None and fuzzy_distance(snapshot) == self.fuzzy_distance:
+                return snapshot._replace(source=self.source)
+        snapshot = compile_knowledge(document, self.source, version, self.fuzzy_distance)
+        if self.snapshot_path:
+            save_snapshot(snapshot, self.snapshot_path)
+        return snapshot
+
+    def _publish(self, snapshot):
+        previous = self._snapshot
+        self._snapshot = snapshot
+        if previous is not None:
+            self.reloads += 1
+            if self.on_swap:
+                self.on_swap(snapshot)
+        logging.info(
+            f"🔄 Base de connaissances {snapshot.version} chargée "
+            f"({len(snapshot.intents)} intentions, {len(snapshot.matcher)} motifs)"
+        )
+
+    def _source_signature(self):
+        """Signature bon marché de la source (fichier : taille et date) ; None pour la base"""
+        if self.source == DATABASE_SOURCE:
+            return None
+        stat = os.stat(self.source)
+        return (stat.st_mtime_ns, stat.st_size)
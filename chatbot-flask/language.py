@@ -0,0 +1,51 @@
+from collections import namedtuple
+
+from matcher import tokenize
+
+Detection = namedtuple('Detection', ['language', 'tokens'])
+
+
+class LanguageDetector:
+    """Détecteur de langue construit une seule fois à partir de lexiques.
+
+    Les lexiques sont fusionnés dans une table jeton -> langues : le message
+    est découpé une seule fois en jetons et chaque jeton coûte une recherche
+    dans la table, quel que soit le nombre de mots ou de langues. La
+    comparaison se fait sur des mots entiers ('none' ne compte plus pour 'non').
+    """
+
+    def __init__(self, lexicons, default_language='en'):
+        self.languages = list(lexicons.keys())
+        self.default_language = default_language
+        self.max_ngram = 1
+        self._table = {}
+
+        for language, words in lexicons.items():
+            for word in words:
+                tokens = tokenize(word.lower())
+                if not tokens:
+                    continue
+                self.max_ngram = max(self.max_ngram, len(tokens))
+                entry = ' '.join(tokens)
+                languages = self._table.setdefault(entry, ())
+                if language not in languages:
+                    self._table[entry] = languages + (language,)
+
+    def detect(self, normalized_text):
+        """Renvoie la langue et les jetons d'un texte déjà normalisé"""
+        tokens = tokenize(normalized_text)
+        table, max_ngram = self._table, self.max_ngram
+        counts = {}
+
+        for start in range(len(tokens)):
+            for size in range(1, min(max_ngram, len(tokens) - start) + 1):
+                entry = tokens[start] if size == 1 else ' '.join(tokens[start:start + size])
+                for language in table.get(entry, ()):
+                    counts[language] = counts.get(language, 0) + 1
+
+        if not counts:
+            return Detection(self.default_language, tokens)
+
+        # Plus grand nombre de mots reconnus, puis ordre de déclaration des lexiques
+        language = max(self.languages, key=lambda lang: (counts.get(lang, 0), -self.languages.index(lang)))
+        return Detection(language, tokens)
@@ -0,0 +1,150 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime, timezone
+
+# Journaux émis pour chaque message traité (échantillonnés)
+MESSAGE_LOGGER = 'chatbot.messages'
+
+LOG_FILE = os.environ.get('CHATBOT_LOG_FILE', 'chatbot.log')
+LOG_LEVEL = os.environ.get('CHATBOT_LOG_LEVEL', 'INFO').upper()
+# 'json' (une ligne JSON par enregistrement) ou 'text'
+LOG_FORMAT = os.environ.get('CHATBOT_LOG_FORMAT', 'json')
+# Proportion des journaux INFO par message conservés (1 = tous, 0 = aucun)
+LOG_SAMPLE_RATE = float(os.environ.get('CHATBOT_LOG_SAMPLE_RATE', '0.1'))
+# Rotation par taille, ou par période si CHATBOT_LOG_ROTATE_WHEN est défini (ex. 'midnight')
+LOG_MAX_BYTES = int(os.environ.get('CHATBOT_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get('CHATBOT_LOG_BACKUP_COUNT', '5'))
+LOG_ROTATE_WHEN = os.environ.get('CHATBOT_LOG_ROTATE_WHEN') or None
+LOG_CONSOLE = os.environ.get('CHATBOT_LOG_CONSOLE', '1') == '1'
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Attributs standard d'un LogRecord : le reste vient de `extra` et est sérialisé
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, champs `extra` inclus"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Ne laisse passer qu'une proportion `rate` des enregistrements INFO et en dessous
+
+    Les avertissements et erreurs sont toujours conservés.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.INFO or self.rate >= 1 or random.random() < self.rate
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui laisse tout le formatage au thread d'écriture
+
+    Le QueueHandler standard formate le message dans le thread appelant ;
+    ici seuls les arguments sont figés (str) pour que l'enregistrement reste
+    valable après la requête.
+    """
+
+    def prepare(self, record):
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def file_handler(path=None):
+    """Gestionnaire de fichier avec rotation par taille ou par période"""
+    path = path or LOG_FILE
+    if LOG_ROTATE_WHEN:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def configure_logging(level=None, sample_rate=None, path=None):
+    """Installe le pipeline de journalisation non bloquant
+
+    Les threads de requête ne font que déposer les enregistrements dans une
+    file ; un QueueListener les formate et les écrit (fichier avec rotation,
+    console en option). Renvoie le listener, arrêté proprement à la sortie.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handlers = [file_handler(path)]
+    if LOG_CONSOLE:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(console)
+
+    # Optimisations documentées : ni fichier/ligne d'appel ni processus dans les journaux
+    logging._srcfile = None
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(level or LOG_LEVEL)
+
+    # Échantillonnage avant la file : les journaux écartés ne coûtent presque rien
+    messages = logging.getLogger(MESSAGE_LOGGER)
+    for existing in list(messages.filters):
+        messages.removeFilter(existing)
+    messages.addFilter(SamplingFilter(LOG_SAMPLE_RATE if sample_rate is None else sample_rate))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Vide la file puis arrête le thread d'écriture des journaux"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
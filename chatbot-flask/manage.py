@@ -0,0 +1,255 @@
+"""Commandes d'administration de la base du chatbot.
+
+Utilisation (depuis chatbot-flask/) :
+    python manage.py migrate
+    python manage.py check-plans
+    python manage.py rebuild-stats
+    python manage.py backfill-fts
+    python manage.py export --format csv --gzip --output conversations.csv.gz
+    python manage.py retention --days 30 --archive-dir archive
+    python manage.py split-partitions
+    python manage.py kb-import knowledge_base.json
+    python manage.py kb-compile knowledge_base.json --output knowledge.pickle
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import database
+import knowledge
+from retention import RetentionJob
+from export import EXPORT_FORMATS, stream_export
+
+
+@contextmanager
+def scratch_database(rows):
+    """Base temporaire initialisée et peuplée de `rows` conversations"""
+    previous = database.DATABASE_NAME
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, 'plans.db')
+        try:
+            database.init_database()
+            database.save_conversations([
+                (f'question {i % 50}', 'answer', 'fr' if i % 3 else 'en', f'session-{i % 20}', None)
+                for i in range(rows)
+            ])
+            with database.get_connection() as conn:
+                conn.execute('ANALYZE')
+            yield
+        finally:
+            database.CONNECTIONS.close_all()
+            database.DATABASE_NAME = previous
+
+
+# Tables bornées (schéma, ligne unique, une ligne par langue) : un parcours est acceptable
+SMALL_TABLES = ('sqlite_master', 'statistics', 'language_stats', 'CONSTANT')
+
+
+def hot_queries():
+    """Fonctions du chemin chaud dont les requêtes doivent utiliser un index"""
+    return [
+        ('get_conversation_history', lambda: database.get_conversation_history(50)),
+        ('get_conversation_page', lambda: [
+            database.get_conversation_page(50, cursor=database.encode_cursor('2100-01-01 00:00:00', 1)),
+            database.get_conversation_page(50, session_id='session-1'),
+            database.get_conversation_page(50, language='fr', since='2000-01-01'),
+        ]),
+        ('get_statistics', database.get_statistics),
+        ('search_conversations', lambda: database.search_conversations('question', 20)),
+        ('clear_old_conversations', lambda: database.clear_old_conversations(30)),
+    ]
+
+
+def capture_statements(call):
+    """Exécute `call` et renvoie les requêtes SQL émises sur la connexion du thread"""
+    statements = []
+    conn = database.CONNECTIONS.get()
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [
+        sql for sql in statements
+        if sql.lstrip().upper().startswith(('SELECT', 'DELETE', 'UPDATE'))
+    ]
+
+
+def full_scans(plan):
+    """Étapes du plan qui parcourent une table entière sans index"""
+    return [
+        detail for detail in plan
+        if detail.startswith('SCAN ') and ' USING ' not in detail
+        and 'VIRTUAL TABLE INDEX' not in detail
+        and detail.split()[1] not in SMALL_TABLES
+    ]
+
+
+def command_migrate(args):
+    database.init_database()
+    with database.get_connection() as conn:
+        version = database.get_schema_version(conn)
+    print(f"Schema version: {version}")
+    return 0
+
+
+def command_rebuild_stats(args):
+    database.init_database()
+    totals = database.rebuild_statistics()
+    print(f"Statistics rebuilt: {totals['total_messages']} messages, {totals['total_sessions']} sessions")
+    return 0
+
+
+def command_backfill_fts(args):
+    database.init_database()
+    indexed = database.backfill_fts()
+    if indexed is None:
+        print("FTS5 is not available in this SQLite build; search keeps using LIKE")
+        return 1
+    print(f"Full-text index rebuilt: {indexed} conversations")
+    return 0
+
+
+def command_export(args):
+    database.init_database()
+    chunks = stream_export(
+        args.format,
+        args.gzip,
+        chunk_size=args.chunk_size,
+        since=args.since,
+        until=args.until,
+        session_id=args.session_id,
+        after_id=args.after_id
+    )
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+def command_retention(args):
+    database.init_database()
+    job = RetentionJob(
+        retention_days=args.days,
+        batch_size=args.batch_size,
+        archive_dir=args.archive_dir,
+        full_vacuum=args.full_vacuum
+    )
+    report = job.run_once()
+    for key, value in report.items():
+        print(f"{key:16}: {value}")
+    return 0
+
+
+def command_split_partitions(args):
+    database.init_database()
+    database.PARTITION_MODE = 'monthly'
+    moved = database.split_into_partitions(args.chunk_size)
+    for key, rows in sorted(moved.items()):
+        print(f"{key}: {rows} conversations")
+    print("Set CHATBOT_PARTITION_MODE=monthly so the app reads the partitions")
+    return 0
+
+
+def command_kb_import(args):
+    database.init_database()
+    document = knowledge.load_document(args.source)
+    count = database.save_knowledge_document(document)
+    print(f"Knowledge base {knowledge.document_version(document)} imported: {count} intents")
+    print("Set CHATBOT_KB_SOURCE=db so the app reads it from the database")
+    return 0
+
+
+def command_kb_compile(args):
+    if args.source == knowledge.DATABASE_SOURCE:
+        database.init_database()
+    document = knowledge.load_document(args.source)
+    snapshot = knowledge.compile_knowledge(document, args.source)
+    knowledge.save_snapshot(snapshot, args.output)
+    print(f"Snapshot {snapshot.version} written to {args.output}: "
+          f"{len(snapshot.intents)} intents, {len(snapshot.matcher)} patterns")
+    return 0
+
+
+def command_check_plans(args):
+    failures = 0
+    with scratch_database(args.rows):
+        for name, call in hot_queries():
+            for sql in capture_statements(call):
+                plan = database.explain_query_plan(sql)
+                scans = full_scans(plan)
+                status = 'FULL SCAN' if scans else 'ok'
+                failures += bool(scans)
+                print(f"[{status:9}] {name}: {' '.join(sql.split())[:90]}")
+                for detail in plan:
+                    print(f"              {detail}")
+    print(f"\n{failures} hot query plan(s) without index")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Administration de la base du chatbot")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('migrate', help="Applique les migrations de schéma")
+
+    plans = subparsers.add_parser('check-plans', help="Vérifie que les requêtes chaudes utilisent un index")
+    plans.add_argument('--rows', type=int, default=1000, help="Lignes générées dans la base temporaire")
+
+    subparsers.add_parser('rebuild-stats', help="Recalcule les tables de statistiques depuis les conversations")
+
+    subparsers.add_parser('backfill-fts', help="Crée et remplit l'index plein texte des conversations")
+
+    export = subparsers.add_parser('export', help="Exporte les conversations en flux (NDJSON ou CSV)")
+    export.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='ndjson')
+    export.add_argument('--gzip', action='store_true', help="Compresse la sortie")
+    export.add_argument('--since', help="Date de début incluse (ISO)")
+    export.add_argument('--until', help="Date de fin exclue (ISO)")
+    export.add_argument('--session-id', help="Limite l'export à une session")
+    export.add_argument('--after-id', type=int, help="Reprend après cet id de conversation")
+    export.add_argument('--chunk-size', type=int, default=1000, help="Lignes lues par bloc")
+    export.add_argument('--output', help="Fichier de sortie (sortie standard par défaut)")
+
+    retention = subparsers.add_parser('retention', help="Supprime (et archive) les conversations expirées")
+    retention.add_argument('--days', type=int, default=30, help="Durée de rétention en jours")
+    retention.add_argument('--batch-size', type=int, default=500, help="Lignes supprimées par transaction")
+    retention.add_argument('--archive-dir', help="Archive les lignes supprimées dans ce dossier")
+    retention.add_argument('--full-vacuum', action='store_true',
+                           help="Autorise un VACUUM complet pour activer le vacuum incrémental")
+
+    split = subparsers.add_parser('split-partitions',
+                                  help="Répartit les conversations existantes en partitions mensuelles")
+    split.add_argument('--chunk-size', type=int, default=5000, help="Lignes copiées par bloc")
+
+    kb_import = subparsers.add_parser('kb-import', help="Importe une base de connaissances JSON/YAML dans la base")
+    kb_import.add_argument('source', help="Fichier JSON ou YAML")
+
+    kb_compile = subparsers.add_parser('kb-compile', help="Compile la base de connaissances en instantané")
+    kb_compile.add_argument('source', help="Fichier JSON/YAML, ou 'db'")
+    kb_compile.add_argument('--output', required=True, help="Fichier de l'instantané (CHATBOT_KB_SNAPSHOT)")
+
+    args = parser.parse_args(argv)
+    commands = {
+        'migrate': command_migrate,
+        'check-plans': command_check_plans,
+        'rebuild-stats': command_rebuild_stats,
+        'backfill-fts': command_backfill_fts,
+        'export': command_export,
+        'retention': command_retention,
+        'split-partitions': command_split_partitions,
+        'kb-import': command_kb_import,
+        'kb-compile': command_kb_compile,
+    }
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
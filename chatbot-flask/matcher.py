@@ -0,0 +1,295 @@
+import math
+import re
+from collections import deque
+
+NO_MATCH = float('inf')
+
+# Un jeton est une suite de caractères de mot, les traits d'union internes inclus
+TOKEN_PATTERN = re.compile(r"\w+(?:-\w+)*")
+
+
+def tokenize(text):
+    """Découpe un texte déjà normalisé en jetons"""
+    return TOKEN_PATTERN.findall(text)
+
+
+class PatternMatcher:
+    """Automate Aho-Corasick compilé une seule fois à partir de la base de connaissances.
+
+    Toutes les occurrences de tous les motifs sont trouvées en un seul passage
+    sur le texte normalisé. La catégorie renvoyée est celle que donnerait le
+    parcours linéaire historique : la première catégorie (dans l'ordre de la
+    base) dont au moins un motif apparaît dans le texte.
+    """
+
+    def __init__(self, knowledge_base):
+        self.categories = list(knowledge_base.keys())
+        self.patterns = []
+        self.pattern_ranks = []
+
+        # Tables de l'automate : transitions, liens d'échec, sorties
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._output_link = [0]
+        self._best = [NO_MATCH]
+
+        for rank, category in enumerate(self.categories):
+            for pattern in knowledge_base[category]['patterns']:
+                self._add_pattern(pattern, rank)
+
+        self._build_links()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _add_pattern(self, pattern, rank):
+        """Ajoute un motif au trie"""
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self.pattern_ranks.append(rank)
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._output_link.append(0)
+                self._best.append(NO_MATCH)
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._outputs[state].append(pattern_id)
+        if rank < self._best[state]:
+            self._best[state] = rank
+
+    def _build_links(self):
+        """Calcule les liens d'échec en largeur et propage le meilleur rang"""
+        queue = deque()
+        for child in self._goto[0].values():
+            queue.append(child)
+            # Un motif vide correspond à n'importe quel texte
+            self._best[child] = min(self._best[child], self._best[0])
+
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+
+                link = self._fail[child]
+                self._output_link[child] = link if self._outputs[link] else self._output_link[link]
+                self._best[child] = min(self._best[child], self._best[link])
+
+    def iter_matches(self, text):
+        """Renvoie (position de fin, motif) pour chaque occurrence trouvée"""
+        goto, fail = self._goto, self._fail
+        outputs, output_link = self._outputs, self._output_link
+
+        for pattern_id in outputs[0]:
+            yield 0, self.patterns[pattern_id]
+
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            node = state
+            while node:
+                for pattern_id in outputs[node]:
+                    yield index + 1, self.patterns[pattern_id]
+                node = output_link[node]
+
+    def match(self, text):
+        """Renvoie la première catégorie (ordre de la base) présente dans le texte"""
+        goto, fail, best_by_state = self._goto, self._fail, self._best
+
+        best = best_by_state[0]
+        if best == 0:
+            return self.categories[0]
+
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            rank = best_by_state[state]
+            if rank < best:
+                best = rank
+                if best == 0:
+                    break
+
+        return None if best == NO_MATCH else self.categories[best]
+
+
+class TokenIndex:
+    """Index inversé jeton / n-gramme -> catégories, construit une seule fois.
+
+    Chaque motif de la base est découpé en jetons et indexé comme un n-gramme.
+    Seules les catégories dont un n-gramme apparaît dans le message sont
+    notées ; le coût dépend donc de la longueur du message et non de la
+    taille de la base. Un n-gramme présent dans peu de catégories et composé
+    de plusieurs jetons pèse davantage.
+    """
+
+    def __init__(self, knowledge_base):
+        self.categories = list(knowledge_base.keys())
+        self.max_ngram = 1
+
+        postings = {}
+        for rank, category in enumerate(self.categories):
+            for pattern in knowledge_base[category]['patterns']:
+                tokens = tokenize(pattern.lower())
+                if not tokens:
+                    continue
+                self.max_ngram = max(self.max_ngram, len(tokens))
+                postings.setdefault(' '.join(tokens), set()).add(rank)
+
+        total = len(self.categories)
+        self._index = {}
+        for ngram, ranks in postings.items():
+            weight = ngram.count(' ') + 1
+            idf = math.log(1 + total / len(ranks))
+            self._index[ngram] = tuple((rank, weight * idf) for rank in sorted(ranks))
+
+    def __len__(self):
+        return len(self._index)
+
+    def score(self, tokens):
+        """Renvoie {rang de catégorie: score brut} pour les n-grammes du message"""
+        index, max_ngram = self._index, self.max_ngram
+        seen = set()
+        scores = {}
+
+        for start in range(len(tokens)):
+            for size in range(1, min(max_ngram, len(tokens) - start) + 1):
+                ngram = ' '.join(tokens[start:start + size])
+                if ngram in seen:
+                    continue
+                seen.add(ngram)
+                for rank, weight in index.get(ngram, ()):
+                    scores[rank] = scores.get(rank, 0.0) + weight
+
+        return scores
+
+    def rank(self, tokens, top_k=3):
+        """Renvoie les top_k catégories avec un score de confiance entre 0 et 1
+
+        La confiance est absolue : le score rapporté à celui d'un mot propre à
+        une seule catégorie, plafonné à 1. Un message qui touche deux
+        intentions garde donc la confiance de chacune.
+        """
+        scores = self.score(tokens)
+        if not scores:
+            return []
+
+        unique_weight = math.log(1 + len(self.categories))
+        # Tri par score décroissant, puis par ordre de la base en cas d'égalité
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            (self.categories[rank], round(min(1.0, score / unique_weight), 4))
+            for rank, score in ranked[:top_k]
+        ]
+
+
+def edit_distance(source, target, max_distance):
+    """Distance d'édition avec transpositions (OSA), ou max_distance + 1 au-delà"""
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous_row = None
+    row = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        before, previous_row = previous_row, row
+        row = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]:
+                row[j] = min(row[j], before[j - 2] + 1)
+        if min(row) > max_distance:
+            return max_distance + 1
+    return row[-1]
+
+
+def _deletions(word, max_distance):
+    """Toutes les variantes de `word` obtenues en supprimant jusqu'à max_distance caractères"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:index] + candidate[index + 1:]
+            for candidate in frontier if len(candidate) > 1
+            for index in range(len(candidate))
+        } - variants
+        variants |= frontier
+    return variants
+
+
+class FuzzyIndex:
+    """Dictionnaire de suppressions (à la SymSpell) sur un vocabulaire, construit une seule fois.
+
+    Chaque mot du vocabulaire est indexé sous toutes ses variantes à
+    max_distance suppressions près. Une recherche génère les suppressions du
+    mot inconnu et ne calcule la distance d'édition qu'avec les mots qui
+    partagent une variante : le coût dépend de la longueur du mot et de la
+    distance, pas de la taille du vocabulaire.
+    """
+
+    def __init__(self, words, max_distance=2):
+        self.max_distance = max_distance
+        self.frequencies = {}
+        for word in words:
+            self.frequencies[word] = self.frequencies.get(word, 0) + 1
+
+        self._deletes = {}
+        for word in self.frequencies:
+            for variant in _deletions(word, max_distance):
+                self._deletes.setdefault(variant, []).append(word)
+
+    def __contains__(self, word):
+        return word in self.frequencies
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    def lookup(self, word, max_distance=None, unique=False):
+        """Renvoie (mot du vocabulaire, distance) le plus proche, ou None
+
+        À distance égale, le mot le plus fréquent dans les motifs l'emporte ;
+        avec unique=True, plusieurs mots à la meilleure distance donnent None.
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if word in self.frequencies:
+            return word, 0
+        if max_distance <= 0:
+            return None
+
+        best = None
+        ties = 0
+        seen = set()
+        for variant in _deletions(word, max_distance):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = edit_distance(word, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                key = (distance, -self.frequencies[candidate], candidate)
+                if best is None or distance < best[0]:
+                    best, ties = key, 1
+                elif distance == best[0]:
+                    best, ties = min(best, key), ties + 1
+        if best is None or (unique and ties > 1):
+            return None
+        return best[2], best[0]
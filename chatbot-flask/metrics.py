@@ -0,0 +1,179 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# CHATBOT_METRICS=0 désactive toute l'instrumentation : les décorateurs
+# renvoient alors la fonction d'origine, sans enveloppe.
+ENABLED = os.environ.get('CHATBOT_METRICS', '1') == '1'
+
+# Bornes des histogrammes de latence, en secondes
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Compteur monotone, éventuellement étiqueté"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def total(self):
+        """Somme sur toutes les étiquettes"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield self.name + _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Histogramme à bornes fixes (somme, nombre et comptes cumulés par borne)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [comptes par intervalle (+Inf en dernier), somme]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield self.name + '_bucket' + _format_labels(self.labelnames, labels, f'le="{le}"'), cumulative
+            yield self.name + '_sum' + _format_labels(self.labelnames, labels), total
+            yield self.name + '_count' + _format_labels(self.labelnames, labels), cumulative
+
+
+REQUESTS = Counter('chatbot_requests_total', "Requêtes HTTP traitées", ('endpoint', 'status'))
+REQUEST_LATENCY = Histogram('chatbot_request_duration_seconds', "Durée des requêtes HTTP", ('endpoint',))
+STAGE_LATENCY = Histogram('chatbot_stage_duration_seconds', "Durée des étapes du traitement d'un message", ('stage',))
+UNMATCHED = Counter('chatbot_unmatched_total', "Messages sans intention reconnue, même après correction", ('language',))
+FUZZY_ATTEMPTS = Counter('chatbot_fuzzy_attempts_total', "Messages dont des mots ont été corrigés (cache compris)", ('language',))
+FUZZY_RESCUES = Counter('chatbot_fuzzy_rescues_total', "Messages reconnus grâce à la correction orthographique (cache compris)", ('language',))
+DB_LATENCY = Histogram('chatbot_db_duration_seconds', "Durée des opérations de base de données", ('operation',))
+DB_ERRORS = Counter('chatbot_db_errors_total', "Erreurs de base de données", ('operation',))
+
+
+def timed(histogram, *labels):
+    """Décorateur qui mesure la durée de chaque appel dans `histogram`"""
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels)
+        return wrapper
+    return decorator
+
+
+def stage(name):
+    """Mesure une étape du traitement d'un message"""
+    return timed(STAGE_LATENCY, name)
+
+
+def db_operation(function):
+    """Mesure une fonction de database.py et compte les exceptions qu'elle laisse passer"""
+    if not ENABLED:
+        return function
+
+    operation = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(operation)
+            raise
+        finally:
+            DB_LATENCY.observe(time.perf_counter() - start, operation)
+    return wrapper
+
+
+def db_error(operation):
+    """Compte une erreur de base de données interceptée par l'appelant"""
+    if ENABLED:
+        DB_ERRORS.inc(operation)
+
+
+def observe_request(endpoint, status, duration):
+    """Compte une requête HTTP et sa durée"""
+    REQUESTS.inc(endpoint, str(status))
+    REQUEST_LATENCY.observe(duration, endpoint)
+
+
+def render():
+    """Toutes les métriques au format texte d'exposition Prometheus"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(f'{name} {_format_value(value)}' for name, value in metric.samples())
+    return '\n'.join(lines) + '\n'
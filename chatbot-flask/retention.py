@@ -0,0 +1,156 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import database
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RetentionJob:
+    """Tâche de rétention des conversations exécutée en arrière-plan
+
+    À chaque passage : archive éventuelle des lignes expirées dans un fichier
+    NDJSON compressé, suppression par petits lots (une courte transaction par
+    lot, avec une pause entre les lots pour laisser passer les écrivains),
+    (les statistiques de résumé sont décrémentées avec chaque lot), puis
+    vacuum incrémental et checkpoint du WAL. Avec le partitionnement, les
+    mois entièrement expirés sont supprimés fichier par fichier.
+
+    Avec plusieurs processus (workers uvicorn), `lock_path` désigne un
+    verrou fichier : seul le processus qui le détient exécute les passages,
+    un autre prend le relais s'il s'arrête.
+    """
+
+    def __init__(self, retention_days=30, interval=3600, batch_size=500,
+                 batch_pause=0.05, archive_dir=None, full_vacuum=False, lock_path=None):
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.archive_dir = archive_dir
+        self.full_vacuum = full_vacuum
+        self.lock_path = lock_path
+        self.last_report = None
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """Exécute un passage complet et renvoie son rapport"""
+        started = time.perf_counter()
+        cutoff = database.retention_cutoff(self.retention_days)
+        size_before = database.database_size()
+
+        archive_path = None
+        archive_file = None
+        if self.archive_dir:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            archive_path = os.path.join(self.archive_dir, f'conversations-before-{cutoff}-{stamp}.ndjson.gz')
+
+        def archive(rows):
+            nonlocal archive_file
+            if archive_file is None:
+                archive_file = gzip.open(archive_path, 'at', encoding='utf-8')
+            archive_file.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+            archive_file.flush()
+
+        dropped = []
+        if database.partitioning_enabled():
+            dropped = database.drop_partitions_before(cutoff, self.archive_dir)
+
+        rows_removed = sum(partition['rows'] for partition in dropped)
+        batches = 0
+        sources = database.conversation_sources(until=cutoff)
+        try:
+            for source in sources:
+                while not self._stop.is_set():
+                    deleted = database.delete_conversations_before(
+                        cutoff, self.batch_size, archive if archive_path else None, database=source
+                    )
+                    rows_removed += deleted
+                    batches += bool(deleted)
+                    if deleted < self.batch_size:
+                        break
+                    time.sleep(self.batch_pause)
+        finally:
+            if archive_file is not None:
+                archive_file.close()
+
+        compacted = all([
+            database.compact_database(full_vacuum=self.full_vacuum, database=source)
+            for source in sources
+        ])
+        size_after = database.database_size()
+
+        self.last_report = {
+            'cutoff': cutoff,
+            'rows_removed': rows_removed,
+            'batches': batches,
+            'partitions_dropped': [partition['partition'] for partition in dropped],
+            'archive': archive_path if archive_file is not None else None,
+            'bytes_before': size_before,
+            'bytes_after': size_after,
+            'bytes_reclaimed': max(0, size_before - size_after),
+            'compacted': compacted,
+            'duration': round(time.perf_counter() - started, 3),
+            'finished_at': datetime.now().isoformat()
+        }
+        logging.info(
+            f"🧹 Rétention : {rows_removed} conversations supprimées, "
+            f"{self.last_report['bytes_reclaimed']} octets récupérés en {self.last_report['duration']} s"
+        )
+        return self.last_report
+
+    def start(self, initial_delay=0):
+        """Démarre les passages périodiques dans un thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(initial_delay,), name='retention-job', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        """Arrête le thread après le lot en cours et libère le verrou"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def acquire_lock(self):
+        """Prend le verrou inter-processus sans attendre ; True si ce processus le détient"""
+        if self.lock_path is None or fcntl is None or self._lock_file is not None:
+            return True
+        handle = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock_file = handle
+        logging.info(f"🔒 Rétention assurée par ce processus (pid {os.getpid()})")
+        return True
+
+    def _run(self, initial_delay):
+        if self._stop.wait(initial_delay):
+            return
+        while True:
+            try:
+                if self.acquire_lock():
+                    self.run_once()
+            except Exception as e:
+                logging.error(f"❌ Erreur lors de la rétention : {str(e)}")
+            if self._stop.wait(self.interval):
+                return